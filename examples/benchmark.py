@@ -3,6 +3,39 @@ pyspartn Performance benchmarking utility
 
 Usage (kwargs optional): python3 benchmark.py cycles=10000
 
+The framing benchmark compares the buffered framing engine (reads of up
+to `chunksize` bytes) with the unbuffered path (chunksize=0, one small
+stream read per frame field) on a single file of `cycles` x 20 messages,
+with CRC validation disabled so that framing costs are not masked.
+
+The batch benchmark compares per-message iteration with
+SPARTNReader.iter_batches() on a file of `cycles` x 20 messages.
+
+The framing, header-only, zero-copy and batch benchmarks time each mode
+`repeats` times (3) in turn, and report the best time for each.
+
+The compressed benchmark compares framing a gzip-compressed file of
+`cycles` x 20 messages via gzip.open(), via CompressedWrapper and via
+an uncompressed file, against the raw decompression time.
+
+The resync benchmark reports the number of valid frames recovered, and the
+throughput, from a stream in which each message is preceded by random junk
+(as on a noisy L-band link), with and without message identity validation.
+
+The archive benchmark compares SPARTNArchiveReader (memory-mapped file,
+zero-copy memoryview frames) with open(...,'rb') + SPARTNReader on a
+synthetic file of `archivecycles` x 20 messages, with CRC validation.
+
+The parallel benchmark reports wall-clock throughput of
+SPARTNReader.iter_parallel() decoding `parallelcycles` x 20 messages
+with 1, 2, 4 and 8 worker processes, against sequential decoding.
+
+The socket benchmark compares SocketWrapper with socket.makefile() when
+reading `cycles` x 20 messages sent over a loopback TCP connection.
+
+The CRC benchmark reports the cost per kB of each of the four SPARTN
+CRC types (crcType 0-3).
+
 Created on 18 Feb 2022
 
 :author: semuadmin (Steve Smith)
@@ -12,14 +45,30 @@ Created on 18 Feb 2022
 
 # pylint: disable=line-too-long
 
-from io import BytesIO
+import gzip
+import os
+import random
+import zlib
 from datetime import datetime
+from io import BytesIO
 from platform import python_version
 from platform import version as osver
+from socket import create_connection, create_server
 from sys import argv
-from time import process_time_ns
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter_ns, process_time_ns
 
-from pyspartn import SPARTNReader
+from pyspartn import (
+    ERRIGNORE,
+    VALCRC,
+    VALMSGID,
+    VALNONE,
+    CompressedWrapper,
+    SPARTNArchiveReader,
+    SPARTNReader,
+    valid_crc,
+)
 from pyspartn import version as spartnver
 
 KEY = "930d847b779b126863c8b3b2766ae7cc"
@@ -116,6 +165,420 @@ def benchmark(**kwargs) -> float:
     return txs, kbs
 
 
+def benchmark_modes(
+    name: str, label: str, modes: dict, iterate: object = None, **kwargs
+) -> dict:
+    """
+    Time SPARTNReader on a temporary file of `cycles` copies of the test
+    messages for each mode, and print the speedup of the last mode
+    relative to the first. Modes are timed in turn `repeats` times and
+    the best time for each is reported, to reduce the effect of noise.
+
+    :param str name: benchmark name
+    :param str label: name of parameter varied by mode
+    :param dict modes: dict of SPARTNReader keyword arguments for each mode
+    :param object iterate: function taking (reader, mode) and returning the
+        iterable to be consumed (None = iterate reader)
+    :param int cycles: (kwarg) number of copies of test messages in file (5,000)
+    :param int repeats: (kwarg) number of times each mode is timed (3)
+    :returns: dict of txns/second for each mode
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("cycles", 5000))
+    repeats = int(kwargs.get("repeats", 3))
+    txnt = len(SPARTNMESSAGES) * cyc
+    durations = {}
+
+    with TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "benchmark.log")
+        with open(fname, "wb") as outfile:
+            outfile.write(SPARTNBYTES * cyc)
+
+        for _ in range(repeats):
+            for mode, readerargs in modes.items():
+                start = process_time_ns()
+                with open(fname, "rb") as stream:
+                    spr = SPARTNReader(stream, **readerargs)
+                    for _ in spr if iterate is None else iterate(spr, mode):
+                        pass
+                duration = process_time_ns() - start
+                durations[mode] = min(duration, durations.get(mode, duration))
+
+    results = {}
+    for mode, duration in durations.items():
+        results[mode] = round(txnt * 1e9 / duration, 2)
+        print(
+            f"\n{name} benchmark ({label}={mode}): {txnt:,} messages "
+            f"processed in {duration/1e9:,.3f} seconds = {results[mode]:,.2f} txns/second."
+        )
+    first, *_, last = results
+    print(f"\n{name} speedup: {results[last] / results[first]:.2f}x\n")
+    return results
+
+
+def benchmark_framing(**kwargs) -> dict:
+    """
+    pyspartn framing benchmark - buffered vs unbuffered stream reads.
+
+    :param int cycles: (kwarg) number of copies of test messages in file (5,000)
+    :param int chunksize: (kwarg) buffered read size in bytes (262144)
+    :returns: dict of txns/second for each chunksize
+    :rtype: dict
+    """
+
+    chunksize = int(kwargs.get("chunksize", 262144))
+    return benchmark_modes(
+        "Framing",
+        "chunksize",
+        {chunk: {"validate": VALNONE, "chunksize": chunk} for chunk in (0, chunksize)},
+        **kwargs,
+    )
+
+
+def benchmark_headeronly(**kwargs) -> dict:
+    """
+    pyspartn relay benchmark - SPARTNMessage vs header-only reads.
+
+    :param int cycles: (kwarg) number of copies of test messages in file (5,000)
+    :returns: dict of txns/second for each mode
+    :rtype: dict
+    """
+
+    return benchmark_modes(
+        "Relay",
+        "headeronly",
+        {headeronly: {"headeronly": headeronly} for headeronly in (False, True)},
+        **kwargs,
+    )
+
+
+def benchmark_zerocopy(**kwargs) -> dict:
+    """
+    pyspartn zero-copy benchmark - bytes vs memoryview raw data and payloads.
+
+    :param int cycles: (kwarg) number of copies of test messages in file (5,000)
+    :returns: dict of txns/second for each mode
+    :rtype: dict
+    """
+
+    return benchmark_modes(
+        "Zero-copy",
+        "zerocopy",
+        {zerocopy: {"zerocopy": zerocopy} for zerocopy in (False, True)},
+        lambda spr, _: (parsed.payload for _, parsed in spr),
+        **kwargs,
+    )
+
+
+def benchmark_batches(**kwargs) -> dict:
+    """
+    pyspartn batched read benchmark - per-message iteration vs iter_batches().
+
+    :param int cycles: (kwarg) number of copies of test messages in file (5,000)
+    :param int batchsize: (kwarg) number of messages per batch (256)
+    :returns: dict of txns/second for each batch size (1 = per-message iteration)
+    :rtype: dict
+    """
+
+    batchsize = int(kwargs.get("batchsize", 256))
+    return benchmark_modes(
+        "Batch",
+        "batch size",
+        {size: {} for size in (1, batchsize)},
+        lambda spr, size: spr if size == 1 else spr.iter_batches(size),
+        **kwargs,
+    )
+
+
+def benchmark_parsemany(**kwargs) -> dict:
+    """
+    pyspartn pre-framed message benchmark - per-message parse() vs parse_many().
+
+    :param int cycles: (kwarg) number of copies of test messages (5,000)
+    :returns: dict of txns/second for parse() and parse_many()
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("cycles", 5000))
+    messages = SPARTNMESSAGES * cyc
+    txnt = len(messages)
+    results = {}
+
+    for method in ("parse", "parse_many"):
+        start = process_time_ns()
+        if method == "parse":
+            for msg in messages:
+                SPARTNReader.parse(msg)
+        else:
+            SPARTNReader.parse_many(messages)
+        duration = process_time_ns() - start
+        results[method] = round(txnt * 1e9 / duration, 2)
+        print(
+            f"\nPre-framed benchmark ({method}): {txnt:,} messages "
+            f"processed in {duration/1e9:,.3f} seconds = {results[method]:,.2f} txns/second."
+        )
+
+    print(f"\nparse_many() speedup: {results['parse_many'] / results['parse']:.2f}x\n")
+    return results
+
+
+def benchmark_compressed(**kwargs) -> dict:
+    """
+    pyspartn compressed archive benchmark - gzip.open() vs CompressedWrapper
+    vs uncompressed file.
+
+    :param int cycles: (kwarg) number of copies of test messages in file (5,000)
+    :returns: dict of txns/second for each input method
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("cycles", 5000))
+    txnt = len(SPARTNMESSAGES) * cyc
+    results = {}
+
+    with TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "benchmark.log")
+        with open(fname, "wb") as outfile:
+            outfile.write(SPARTNBYTES * cyc)
+        with open(fname + ".gz", "wb") as outfile:
+            outfile.write(gzip.compress(SPARTNBYTES * cyc))
+
+        start = process_time_ns()
+        with open(fname + ".gz", "rb") as infile:
+            zlib.decompress(infile.read(), 16 + zlib.MAX_WBITS)
+        duration = process_time_ns() - start
+        print(f"\nRaw gzip decompression: {duration/1e9:,.3f} seconds")
+
+        for name, opener in (
+            ("uncompressed", lambda: open(fname, "rb")),
+            ("gzip.open", lambda: gzip.open(fname + ".gz", "rb")),
+            ("CompressedWrapper", lambda: CompressedWrapper(fname + ".gz")),
+        ):
+            start = process_time_ns()
+            with opener() as stream:
+                spr = SPARTNReader(stream)
+                for _, _ in spr:
+                    pass
+            duration = process_time_ns() - start
+            results[name] = round(txnt * 1e9 / duration, 2)
+            print(
+                f"\nCompressed benchmark ({name}): {txnt:,} messages "
+                f"processed in {duration/1e9:,.3f} seconds = {results[name]:,.2f} txns/second."
+            )
+
+    return results
+
+
+def benchmark_archive(**kwargs) -> dict:
+    """
+    pyspartn archive benchmark - memory-mapped SPARTNArchiveReader vs
+    open(...,'rb') + SPARTNReader on a large synthetic file.
+
+    :param int archivecycles: (kwarg) number of copies of test messages in file (50,000)
+    :returns: dict of txns/second for each reader
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("archivecycles", 50000))
+    txnt = len(SPARTNMESSAGES) * cyc
+    results = {}
+
+    with TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "archive.log")
+        with open(fname, "wb") as outfile:
+            outfile.write(SPARTNBYTES * cyc)
+        print(
+            f"\nArchive benchmark: {txnt:,} messages, "
+            f"{os.path.getsize(fname) / 2**20:,.1f} MB"
+        )
+
+        for name in ("SPARTNReader", "SPARTNArchiveReader"):
+            start = process_time_ns()
+            if name == "SPARTNReader":
+                with open(fname, "rb") as stream:
+                    for _, _ in SPARTNReader(stream):
+                        pass
+            else:
+                with SPARTNArchiveReader(fname) as spr:
+                    for _, _ in spr:
+                        pass
+            duration = process_time_ns() - start
+            results[name] = round(txnt * 1e9 / duration, 2)
+            print(
+                f"{name}: {txnt:,} messages processed in {duration/1e9:,.3f} seconds "
+                f"= {results[name]:,.2f} txns/second."
+            )
+
+    print(
+        f"Archive reader speedup: "
+        f"{results['SPARTNArchiveReader'] / results['SPARTNReader']:.2f}x\n"
+    )
+    return results
+
+
+def benchmark_parallel(**kwargs) -> dict:
+    """
+    pyspartn parallel decode benchmark - sequential vs iter_parallel() with
+    1, 2, 4 and 8 worker processes (wall-clock time).
+
+    :param int parallelcycles: (kwarg) number of copies of test messages in stream (500)
+    :returns: dict of txns/second for each number of workers (0 = sequential)
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("parallelcycles", 500))
+    txnt = len(SPARTNMESSAGES) * cyc
+    data = SPARTNBYTES * cyc
+    results = {}
+
+    print(
+        f"\nParallel decode benchmark: {txnt:,} messages, decode=True, "
+        f"{os.cpu_count()} CPUs available"
+    )
+    for workers in (0, 1, 2, 4, 8):
+        start = perf_counter_ns()
+        spr = SPARTNReader(BytesIO(data), decode=True, key=KEY, basedate=BASEDATE)
+        for _, _ in spr.iter_parallel(workers) if workers else spr:
+            pass
+        duration = perf_counter_ns() - start
+        results[workers] = round(txnt * 1e9 / duration, 2)
+        print(
+            f"workers={workers or 'sequential'}: {txnt:,} messages processed in "
+            f"{duration/1e9:,.3f} seconds = {results[workers]:,.2f} txns/second, "
+            f"{results[workers] / results[0]:.2f}x"
+        )
+
+    return results
+
+
+def benchmark_resync(**kwargs) -> dict:
+    """
+    pyspartn resynchronisation benchmark - valid frames recovered from
+    a stream containing random junk between messages.
+
+    :param int resynccycles: (kwarg) number of messages in stream (1,000)
+    :param int junk: (kwarg) number of junk bytes preceding each message (200)
+    :returns: dict of (frames recovered, txns/second) for each validate and resync option
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("resynccycles", 1000))
+    junklen = int(kwargs.get("junk", 200))
+    rng = random.Random(0)
+    data = b""
+    for i in range(cyc):
+        data += rng.randbytes(junklen) + SPARTNMESSAGES[i % len(SPARTNMESSAGES)]
+    results = {}
+
+    print(f"\nResync benchmark: {cyc:,} messages each preceded by {junklen} junk bytes")
+    for validate in (VALCRC, VALCRC | VALMSGID):
+        start = process_time_ns()
+        spr = SPARTNReader(BytesIO(data), validate=validate, quitonerror=ERRIGNORE)
+        count = sum(1 for _ in spr)
+        duration = process_time_ns() - start
+        results[validate] = (count, round(count * 1e9 / duration, 2))
+        print(
+            f"validate={validate}: {count:,} of {cyc:,} messages recovered in "
+            f"{duration/1e9:,.3f} seconds = {results[validate][1]:,.2f} txns/second, "
+            f"{len(data) * 1e9 / duration / 2**10:,.2f} kB/second."
+        )
+
+    # error reported for each discarded byte vs exception-free resync
+    for resync in (False, True):
+        start = process_time_ns()
+        spr = SPARTNReader(
+            BytesIO(data),
+            validate=VALCRC | VALMSGID,
+            errorhandler=lambda err: None,
+            resync=resync,
+        )
+        count = sum(1 for _ in spr)
+        duration = process_time_ns() - start
+        results[f"resync={resync}"] = (count, round(count * 1e9 / duration, 2))
+        print(
+            f"resync={resync}: {count:,} of {cyc:,} messages recovered in "
+            f"{duration/1e9:,.3f} seconds, {len(data) * 1e9 / duration / 2**10:,.2f} "
+            f"kB/second, {spr.stats}"
+        )
+
+    return results
+
+
+def benchmark_socket(**kwargs) -> dict:
+    """
+    pyspartn socket benchmark - SocketWrapper vs socket.makefile() reading
+    messages sent over a loopback TCP connection (wall-clock time).
+
+    :param int cycles: (kwarg) number of copies of test messages sent (5,000)
+    :returns: dict of txns/second for each socket stream
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("cycles", 5000))
+    txnt = len(SPARTNMESSAGES) * cyc
+    results = {}
+
+    for name in ("makefile", "SocketWrapper"):
+        with create_server(("127.0.0.1", 0)) as server:
+
+            def send():
+                conn, _ = server.accept()
+                with conn:
+                    conn.sendall(SPARTNBYTES * cyc)
+
+            sender = Thread(target=send, daemon=True)
+            sender.start()
+            with create_connection(server.getsockname()) as sock:
+                sock.settimeout(5)
+                start = perf_counter_ns()
+                stream = sock.makefile("rb") if name == "makefile" else sock
+                spr = SPARTNReader(stream, bufsize=65536)
+                for _, _ in spr:
+                    pass
+                duration = perf_counter_ns() - start
+            sender.join()
+        results[name] = round(txnt * 1e9 / duration, 2)
+        print(
+            f"\nSocket benchmark ({name}): {txnt:,} messages "
+            f"processed in {duration/1e9:,.3f} seconds = {results[name]:,.2f} txns/second."
+        )
+
+    print(
+        f"\nSocketWrapper speedup: "
+        f"{results['SocketWrapper'] / results['makefile']:.2f}x\n"
+    )
+    return results
+
+
+def benchmark_crc(**kwargs) -> dict:
+    """
+    pyspartn CRC micro-benchmark - cost per kB of each SPARTN CRC type.
+
+    :param int crccycles: (kwarg) number of kB to process per CRC type (2,000)
+    :returns: dict of microseconds/kB for each crcType
+    :rtype: dict
+    """
+
+    cyc = int(kwargs.get("crccycles", 2000))
+    data = os.urandom(1024)
+    results = {}
+
+    print(f"\nCRC benchmark: {cyc:,} x 1 kB per CRC type")
+    for crctype, name in enumerate(
+        ("CRC-8/0x07", "CRC-16/0x1021", "CRC-24/0x864CFB", "CRC-32/0x04C11DB7")
+    ):
+        valid_crc(data, 0, crctype)  # build lookup table outside timed loop
+        start = process_time_ns()
+        for _ in range(cyc):
+            valid_crc(data, 0, crctype)
+        duration = process_time_ns() - start
+        results[crctype] = round(duration / cyc / 1e3, 2)
+        print(f"crcType {crctype} {name}: {results[crctype]:,.2f} microseconds/kB")
+
+    return results
+
+
 def main():
     """
     CLI Entry point.
@@ -123,7 +586,19 @@ def main():
     args as benchmark() method
     """
 
-    benchmark(**dict(arg.split("=") for arg in argv[1:]))
+    kwargs = dict(arg.split("=") for arg in argv[1:])
+    benchmark(**kwargs)
+    benchmark_framing(**kwargs)
+    benchmark_headeronly(**kwargs)
+    benchmark_zerocopy(**kwargs)
+    benchmark_batches(**kwargs)
+    benchmark_parsemany(**kwargs)
+    benchmark_compressed(**kwargs)
+    benchmark_archive(**kwargs)
+    benchmark_parallel(**kwargs)
+    benchmark_resync(**kwargs)
+    benchmark_socket(**kwargs)
+    benchmark_crc(**kwargs)
 
 
 if __name__ == "__main__":
@@ -21,9 +21,7 @@ Created on 18 Feb 2023
 
 from sys import argv
 
-from pyubx2 import UBXReader
-
-from pyspartn import ERRIGNORE, ERRLOG, SPARTNMessage, SPARTNReader
+from pyspartn import ERRIGNORE, RXMPMPWrapper, SPARTNMessage, SPARTNReader
 
 
 def main(**kwargs):
@@ -40,17 +38,13 @@ def main(**kwargs):
     print(f"Consolidating data from NEO-D9S output log {infile}...")
     with open(outfile, "wb") as out:
         with open(infile, "rb") as stream:
-            ubr = UBXReader(stream, quitonerror=ERRLOG)
-            for _, parsed in ubr:
-                if parsed.identity == "RXM-PMP":
-                    counts["PMP"] += 1
-                    # print(parsed)
-                    payload = b""
-                    for i in range(parsed.numBytesUserData):
-                        payload += getattr(parsed, f"userData_{i+1:02}").to_bytes(
-                            1, "big"
-                        )
-                    out.write(payload)
+            pmp = RXMPMPWrapper(stream)
+            while True:
+                payload = pmp.read1(65536)
+                if not payload:
+                    break
+                out.write(payload)
+            counts["PMP"] = pmp.pmpcount
 
     # Parse the output file for SPARTN messages
     print(f"\n\nParsing consolidated data from {counts['PMP']} RXM-PMP payloads...")
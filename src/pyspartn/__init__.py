@@ -7,6 +7,7 @@ Created on 10 Feb 2023
 """
 
 from pyspartn._version import __version__
+from pyspartn.compressed_wrapper import CompressedWrapper
 from pyspartn.exceptions import (
     ParameterError,
     SPARTNDecryptionError,
@@ -15,9 +16,16 @@ from pyspartn.exceptions import (
     SPARTNStreamError,
     SPARTNTypeError,
 )
+from pyspartn.rxmpmp_wrapper import RXMPMPWrapper
 from pyspartn.socket_wrapper import SocketWrapper
+from pyspartn.spartnarchive import SPARTNArchiveReader
+from pyspartn.spartnasyncreader import AsyncSPARTNReader
+from pyspartn.spartnheader import SPARTNHeader
 from pyspartn.spartnhelpers import *
+from pyspartn.spartnmerger import SPARTNMerger
 from pyspartn.spartnmessage import SPARTNMessage
+from pyspartn.spartnmultiplexer import SPARTNMultiplexer
+from pyspartn.spartnparser import SPARTNParser
 from pyspartn.spartnreader import SPARTNReader
 from pyspartn.spartntables import *
 from pyspartn.spartntypes_core import *
@@ -8,4 +8,4 @@ Created on 10 Feb 2023
 :license: BSD 3-Clause
 """
 
-__version__ = "1.0.9"
+__version__ = "1.1.0"
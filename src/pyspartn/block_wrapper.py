@@ -0,0 +1,78 @@
+"""
+block_wrapper.py
+
+Base class for stream wrappers which produce their output in blocks
+(e.g. blocks of decompressed data, or the userData extracted from
+UBX RXM-PMP messages), providing basic stream-like read(bytes) and
+read1(bytes) methods over those blocks.
+
+Subclasses implement `_next_block()`.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+
+class BlockWrapper:
+    """
+    Block stream base class.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self._buffer = b""  # current block
+        self._pos = 0
+
+    def _next_block(self) -> bytes:
+        """
+        Get the next block of data. Implemented by subclasses.
+
+        :return: block of data (b"" if end of stream)
+        :rtype: bytes
+        """
+
+        raise NotImplementedError
+
+    def read(self, num: int) -> bytes:
+        """
+        Read specified number of bytes.
+        NB: always check length of return data.
+
+        :param int num: number of bytes to read
+        :return: bytes read (which may be less than num at end of stream)
+        :rtype: bytes
+        """
+
+        data = self.read1(num)
+        while 0 < len(data) < num:
+            more = self.read1(num - len(data))
+            if not more:
+                break
+            data += more
+        return data
+
+    def read1(self, num: int) -> bytes:
+        """
+        Read up to specified number of bytes, getting at most one further
+        block (and only if no data remains in the current block).
+
+        :param int num: maximum number of bytes to read
+        :return: bytes read (b"" if end of stream)
+        :rtype: bytes
+        """
+
+        if self._pos >= len(self._buffer):
+            self._buffer = self._next_block()
+            self._pos = 0
+        if self._pos == 0 and num >= len(self._buffer):
+            data = self._buffer
+        else:
+            data = self._buffer[self._pos : self._pos + num]
+        self._pos += len(data)
+        return data
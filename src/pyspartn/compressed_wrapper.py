@@ -0,0 +1,154 @@
+"""
+compressed_wrapper.py
+
+A stream wrapper which provides basic stream-like read(bytes) and
+read1(bytes) methods for compressed (gzip, bz2 or xz/lzma) SPARTN
+archive files.
+
+The compression codec is detected from the magic bytes at the start
+of the file, and the file is decompressed in large blocks, so that
+SPARTNReader can frame messages from the decompressed data in large
+chunks. Uncompressed files are passed through unchanged. Concatenated
+(multi-member) compressed files are supported.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from bz2 import BZ2Decompressor
+from lzma import LZMADecompressor
+from os import PathLike
+from zlib import MAX_WBITS, decompressobj
+
+from pyspartn.block_wrapper import BlockWrapper
+
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "lzma",
+}
+
+
+def compression(data: bytes) -> str:
+    """
+    Identify compression codec from magic bytes at start of data.
+
+    :param bytes data: first (up to 6) bytes of file
+    :return: codec ("gzip", "bz2" or "lzma"), or None if not compressed
+    :rtype: str
+    """
+
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if data[: len(magic)] == magic:
+            return codec
+    return None
+
+
+class CompressedWrapper(BlockWrapper):
+    """
+    Compressed file stream class.
+    """
+
+    def __init__(self, source: object, blocksize: int = 1048576):
+        """
+        Constructor.
+
+        :param object source: path to file, or binary file object
+        :param int blocksize: size of each compressed read from file, and maximum
+            size of each block of decompressed data (1048576)
+        """
+
+        super().__init__()
+        if isinstance(source, (str, PathLike)):
+            self._file = open(source, "rb")  # pylint: disable=consider-using-with
+            self._owned = True
+        else:
+            self._file = source
+            self._owned = False
+        self._blocksize = blocksize
+        self._input = self._file.read(blocksize)  # compressed data not yet used
+        self._codec = compression(self._input)
+        self._decomp = self._decompressor()
+
+    def __enter__(self):
+        """
+        Context manager enter routine.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Context manager exit routine.
+        """
+
+        self.close()
+
+    def _decompressor(self) -> object:
+        """
+        Create decompressor for codec.
+
+        :return: decompressor object, or None if not compressed
+        :rtype: object
+        """
+
+        if self._codec == "gzip":
+            return decompressobj(16 + MAX_WBITS)
+        if self._codec == "bz2":
+            return BZ2Decompressor()
+        if self._codec == "lzma":
+            return LZMADecompressor()
+        return None
+
+    def _next_block(self) -> bytes:
+        """
+        Read and decompress the next block of data from the file.
+
+        :return: up to blocksize bytes of decompressed data (b"" if end of file)
+        :rtype: bytes
+        """
+
+        if self._decomp is None:  # uncompressed
+            data = self._input or self._file.read(self._blocksize)
+            self._input = b""
+            return data
+        while True:
+            if self._decomp.eof:  # end of member, look for another
+                data = self._decomp.unused_data + self._input
+                if not data:
+                    data = self._file.read(self._blocksize)
+                    if not data:
+                        return b""
+                self._decomp = self._decompressor()
+                self._input = data
+            elif not self._input and getattr(self._decomp, "needs_input", True):
+                self._input = self._file.read(self._blocksize)
+                if not self._input:  # file truncated
+                    return b""
+            data = self._decomp.decompress(self._input, self._blocksize)
+            # zlib retains unused input as unconsumed_tail, bz2 & lzma internally
+            self._input = getattr(self._decomp, "unconsumed_tail", b"")
+            if data:
+                return data
+
+    def close(self):
+        """
+        Close file, if opened by wrapper.
+        """
+
+        if self._owned:
+            self._file.close()
+
+    @property
+    def codec(self) -> str:
+        """
+        Getter for compression codec.
+
+        :return: codec ("gzip", "bz2" or "lzma"), or None if not compressed
+        :rtype: str
+        """
+
+        return self._codec
@@ -42,3 +42,13 @@ class SPARTNTypeError(Exception):
     """
     SPARTN Undefined payload attribute type.
     """
+
+
+SPARTN_ERRORS = (
+    SPARTNParseError,
+    SPARTNMessageError,
+    SPARTNTypeError,
+    SPARTNStreamError,
+    SPARTNDecryptionError,
+)
+""" SPARTN parsing and streaming errors handled according to quitonerror """
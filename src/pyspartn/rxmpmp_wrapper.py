@@ -0,0 +1,148 @@
+"""
+rxmpmp_wrapper.py
+
+A stream wrapper which extracts the SPARTN data carried in the userData
+of UBX RXM-PMP messages (e.g. from a u-blox NEO-D9S L-Band correction
+receiver) and provides basic stream-like read(bytes) and read1(bytes)
+methods, so that SPARTNReader can frame SPARTN messages directly from
+a UBX data stream or log file.
+
+Both RXM-PMP message versions are supported:
+
+- version 0x00: fixed 504-byte userData at payload offset 20
+- version 0x01: numBytesUserData-byte userData at payload offset 24
+
+UBX messages are framed directly from large blocks of input data, and
+the userData of each RXM-PMP message is sliced as a memoryview. Other
+UBX messages and non-UBX data are skipped. Streams without a read1()
+method (e.g. serial ports) are instead read one UBX header or message
+at a time, so that data is not held back waiting for a full block.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from socket import socket
+
+from pyspartn.block_wrapper import BlockWrapper
+from pyspartn.socket_wrapper import SocketWrapper
+from pyspartn.spartnhelpers import ubx_checksum
+from pyspartn.spartntypes_core import UBX_HDR, VALCRC
+
+RXMPMP_ID = b"\x02\x72"
+""" UBX RXM-PMP message class and id """
+
+
+class RXMPMPWrapper(BlockWrapper):
+    """
+    RXM-PMP stream class.
+    """
+
+    def __init__(self, stream: object, blocksize: int = 65536, validate: int = VALCRC):
+        """
+        Constructor.
+
+        :param object stream: UBX data stream, e.g. binary file, serial port or socket
+        :param int blocksize: maximum size of each read from stream (65536)
+        :param int validate: VALCRC (1) = ignore UBX messages with invalid
+            checksum, VALNONE (0) = no validation (1)
+        """
+
+        super().__init__()
+        if isinstance(stream, socket):
+            stream = SocketWrapper(stream, bufsize=blocksize)
+        self._stream = stream
+        self._read1 = getattr(stream, "read1", None)
+        self._blocksize = blocksize
+        self._validate = validate
+        self._input = b""  # UBX data not yet framed
+        self._need = 6  # bytes required to complete next header or message
+        self._pmpcount = 0
+
+    def _next_block(self) -> bytes:
+        """
+        Read data from the stream until at least one complete RXM-PMP
+        message has been framed, and extract its userData.
+
+        Streams with a read1() method are read in blocks of up to blocksize
+        bytes. Other streams (e.g. serial ports, whose read() waits for the
+        requested number of bytes) are read only as far as the end of the
+        next UBX header or message, as given by its length field.
+
+        :return: userData of RXM-PMP messages (b"" if end of stream)
+        :rtype: bytes
+        """
+
+        while True:
+            if self._read1 is None:
+                data = self._stream.read(self._need)
+            else:
+                data = self._read1(self._blocksize)
+            if not data:  # EOF - any incomplete message is discarded
+                return b""
+            buf = self._input + data
+            buflen = len(buf)
+            view = memoryview(buf)
+            userdata = []
+            pos = 0
+            while True:
+                pos = buf.find(UBX_HDR, pos)
+                if pos == -1:  # retain any partial header
+                    pos = buflen - 1 if buf[-1] == UBX_HDR[0] else buflen
+                    self._need = pos + 6 - buflen
+                    break
+                if pos + 6 > buflen:
+                    self._need = pos + 6 - buflen
+                    break
+                size = 8 + int.from_bytes(buf[pos + 4 : pos + 6], "little")
+                if pos + size > buflen:
+                    self._need = pos + size - buflen
+                    break
+                if (
+                    self._validate & VALCRC
+                    and ubx_checksum(view[pos + 2 : pos + size - 2])
+                    != buf[pos + size - 2 : pos + size]
+                ):
+                    pos += 1  # false header, resume search at next byte
+                    continue
+                if buf[pos + 2 : pos + 4] == RXMPMP_ID:
+                    chunk = self._userdata(view[pos + 6 : pos + size - 2])
+                    if chunk is not None:
+                        userdata.append(chunk)
+                        self._pmpcount += 1
+                pos += size
+            self._input = buf[pos:]
+            if userdata:
+                return b"".join(userdata)
+
+    @staticmethod
+    def _userdata(payload: memoryview) -> memoryview:
+        """
+        Get userData from RXM-PMP message payload.
+
+        :param memoryview payload: RXM-PMP payload
+        :return: userData, or None if payload is invalid
+        :rtype: memoryview
+        """
+
+        if payload[0] == 0 and len(payload) == 528:  # version 0
+            return payload[20:524]
+        if payload[0] == 1 and len(payload) >= 24:  # version 1
+            num = int.from_bytes(payload[2:4], "little")
+            if len(payload) == 24 + num:
+                return payload[24:]
+        return None
+
+    @property
+    def pmpcount(self) -> int:
+        """
+        Getter for number of RXM-PMP messages extracted.
+
+        :return: number of messages
+        :rtype: int
+        """
+
+        return self._pmpcount
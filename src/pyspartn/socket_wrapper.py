@@ -2,11 +2,20 @@
 socket_wrapper.py
 
 A skeleton socket wrapper which provides basic stream-like
-read(bytes) and readline() methods.
-
-NB: this will read from a socket indefinitely. It is the
-responsibility of the calling application to monitor
-data returned and implement appropriate socket error,
+read(bytes) and read1(bytes) methods.
+
+Data is received into a preallocated compacting buffer using
+sock.recv_into(), so reads do not copy the remainder of the buffer.
+The buffer grows (up to `maxbufsize`) if a receive fills it, i.e.
+under burst load, or if a read requires it.
+
+NB: this will read from a socket indefinitely. By default, a socket
+timeout, error or closure is reported as the end of the stream (b"").
+Optionally, a timeout (i.e. an idle period) can instead be raised as
+a TimeoutError, leaving any buffered data intact, and a reconnect
+function can be provided which supplies a replacement socket if the
+connection is closed or fails. It is otherwise the responsibility of
+the calling application to implement appropriate socket error,
 timeout or inactivity procedures.
 
 Created on 4 Apr 2022
@@ -18,6 +27,8 @@ Created on 4 Apr 2022
 
 from socket import socket
 
+from pyspartn.exceptions import ParameterError
+
 
 class SocketWrapper:
     """
@@ -29,38 +40,117 @@ class SocketWrapper:
         Constructor.
 
         :param sock socket: socket object
-        :param int bufsize: (kwarg) internal buffer size (4096)
+        :param int bufsize: (kwarg) initial internal buffer size (4096)
+        :param int maxbufsize: (kwarg) maximum internal buffer size to which
+            the buffer will grow under burst load (1048576)
+        :param bool raisetimeout: (kwarg) raise TimeoutError if the socket times
+            out with no data, rather than treating it as end of stream (False)
+        :param object reconnect: (kwarg) function called with no arguments if the
+            socket is closed by the peer or fails, returning a new connected socket
+            to receive from, or None to end the stream. The old socket is not
+            closed by the wrapper (None)
         """
 
         self._socket = sock
         self._bufsize = kwargs.get("bufsize", 4096)
-        self._buffer = bytearray()
-        self._recv()  # populate initial buffer
+        self._maxbufsize = max(kwargs.get("maxbufsize", 1048576), self._bufsize)
+        self._buffer = bytearray(self._bufsize)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # start of unread data in buffer
+        self._end = 0  # end of unread data in buffer
+        self._raisetimeout = kwargs.get("raisetimeout", False)
+        self._reconnect = kwargs.get("reconnect", None)
+        self._reconnects = 0
+        try:
+            self._recv()  # populate initial buffer
+        except TimeoutError:
+            pass
 
-    def _recv(self) -> bool:
+    def _recv(self, num: int = 1) -> bool:
         """
-        Read bytes from socket into internal buffer.
+        Read bytes from socket into internal buffer, making room for
+        at least the specified number of unread bytes.
 
+        :param int num: minimum buffer capacity required for unread data
         :return: return code (0 = failure, 1 = success)
         :rtype: bool
+        :raises: TimeoutError if socket timed out and raisetimeout is True
+        :raises: ParameterError if num exceeds maximum buffer size
         """
 
-        try:
-            self._buffer += self._socket.recv(self._bufsize)
-        except (OSError, TimeoutError):
-            return False
+        if num > self._maxbufsize:
+            raise ParameterError(
+                f"Read of {num} bytes exceeds maximum buffer size {self._maxbufsize}"
+            )
+        avail = self._end - self._start
+        if self._end == len(self._buffer) or len(self._buffer) < num:
+            size = min(max(num, 2 * len(self._buffer)), self._maxbufsize)
+            if size > len(self._buffer) and (
+                len(self._buffer) < num or avail > len(self._buffer) // 2
+            ):
+                self._grow(size)
+            elif self._start:  # compact unread data to start of buffer
+                self._view[:avail] = self._view[self._start : self._end]
+                self._start, self._end = 0, avail
+        while True:
+            try:
+                nbytes = self._socket.recv_into(self._view[self._end :])
+            except (TimeoutError, BlockingIOError) as err:  # no data yet
+                if self._raisetimeout:
+                    raise TimeoutError("No data received from socket") from err
+                return False
+            except OSError:
+                nbytes = 0
+            if nbytes:
+                break
+            # socket closed by peer or failed
+            sock = None if self._reconnect is None else self._reconnect()
+            if sock is None:
+                return False
+            self._socket = sock
+            self._reconnects += 1
+        self._end += nbytes
+        # buffer filled by a single receive, so grow it for the next burst
+        if self._end == len(self._buffer) and len(self._buffer) < self._maxbufsize:
+            self._grow(min(2 * len(self._buffer), self._maxbufsize))
         return True
 
+    def _grow(self, size: int):
+        """
+        Replace internal buffer with a larger one, preserving unread data.
+
+        :param int size: new buffer size
+        """
+
+        avail = self._end - self._start
+        buf = bytearray(size)
+        buf[:avail] = self._view[self._start : self._end]
+        self._view.release()
+        self._buffer = buf
+        self._view = memoryview(buf)
+        self._start, self._end = 0, avail
+
     @property
     def buffer(self) -> bytearray:
         """
         Getter for buffer.
 
-        :return: buffer
+        :return: copy of unread data in buffer
         :rtype: bytearray
         """
 
-        return self._buffer
+        return self._buffer[self._start : self._end]
+
+    @property
+    def reconnects(self) -> int:
+        """
+        Getter for number of times socket has been replaced via reconnect function.
+
+        :return: number of reconnections
+        :rtype: int
+        """
+
+        return self._reconnects
 
     def read(self, num: int) -> bytes:
         """
@@ -70,15 +160,46 @@ class SocketWrapper:
         :param int num: number of bytes to read
         :return: bytes read (which may be less than num)
         :rtype: bytes
+        :raises: TimeoutError if socket timed out and raisetimeout is True
+        :raises: ParameterError if num exceeds maximum buffer size
         """
 
         # if at end of internal buffer, top it up from socket
-        while len(self._buffer) < num:
+        while self._end - self._start < num:
+            if not self._recv(num):
+                return b""
+        return self._take(num)
+
+    def read1(self, num: int) -> bytes:
+        """
+        Read up to specified number of bytes from buffer, receiving
+        from the socket at most once (and only if the buffer is empty).
+
+        :param int num: maximum number of bytes to read
+        :return: bytes read (b"" if socket error or closed)
+        :rtype: bytes
+        :raises: TimeoutError if socket timed out and raisetimeout is True
+        """
+
+        if self._end == self._start:
             if not self._recv():
                 return b""
-        data = self._buffer[:num]
-        self._buffer = self._buffer[num:]
-        return bytes(data)
+        return self._take(min(num, self._end - self._start))
+
+    def _take(self, num: int) -> bytes:
+        """
+        Remove specified number of bytes from start of unread data.
+
+        :param int num: number of bytes
+        :return: bytes
+        :rtype: bytes
+        """
+
+        data = bytes(self._view[self._start : self._start + num])
+        self._start += num
+        if self._start == self._end:  # buffer empty, so rewind
+            self._start = self._end = 0
+        return data
 
     # Not relevant for SPARTN message streams
     # def readline(self) -> bytes:
@@ -0,0 +1,634 @@
+"""
+SPARTNArchiveReader class.
+
+Reads SPARTN messages from a log file via a read-only memory map,
+returning each raw frame as a zero-copy memoryview slice of the
+mapped file.
+
+Optionally uses a persistent sidecar index of frame offsets and header
+fields, so that repeated runs over the same file need not re-frame
+or re-validate it, and individual frames can be accessed at random,
+either by frame number or by time.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=invalid-name, too-many-arguments, too-many-positional-arguments
+# pylint: disable=too-many-locals, too-many-instance-attributes
+
+from bisect import bisect_left
+from datetime import datetime
+from mmap import ACCESS_READ, mmap
+from os import fstat, path, stat
+from struct import Struct
+
+from pyspartn.compressed_wrapper import compression
+from pyspartn.exceptions import ParameterError, SPARTNParseError
+from pyspartn.spartnheader import SPARTNHeader
+from pyspartn.spartnhelpers import (
+    convert_timetag,
+    date2timetag,
+    naive2aware,
+    timetag2date,
+    timetag2utc,
+)
+from pyspartn.spartnreader import SPARTNReader
+from pyspartn.spartntypes_core import (
+    ERRIGNORE,
+    ERRLOG,
+    SPARTN_MSGIDS,
+    TIMEBASE,
+    VALCRC,
+    VALMSGID,
+)
+
+INDEX_HEADER = Struct("<8sQQ")
+"""Index file header - magic, log file size, log file modification time (ns)"""
+INDEX_MAGIC = b"SPTNIDX2"
+INDEX_RECORD = Struct("<QHBBBIBB")
+"""Index record - offset, length, msgType, msgSubtype, timeTagtype, gnssTimeTag,
+eaf, crcvalid"""
+TIMEINDEX_STEP = 64
+"""Number of indexed frames between entries in the sparse time index"""
+
+
+class SPARTNArchiveReader(SPARTNReader):
+    """
+    SPARTNArchiveReader class.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        validate: int = VALCRC,
+        quitonerror: int = ERRLOG,
+        decode: bool = False,
+        key: str = None,
+        basedate: object = None,
+        errorhandler: object = None,
+        timetags: dict = None,
+        resync: bool = False,
+        statshandler: object = None,
+        include: object = None,
+        exclude: object = None,
+        filterraw: bool = False,
+        demux: bool = False,
+        passthrough: bool = False,
+        headeronly: bool = False,
+        indexfile: object = None,
+        zerocopy: bool = False,
+    ):
+        """Constructor.
+
+        Raw frames (and the transport passed to each SPARTNMessage) are
+        memoryview slices of the mapped file. Use `bytes(raw_data)` to take
+        a copy which outlives the reader. If `zerocopy` is True, each
+        SPARTNMessage payload is also returned as a slice of the mapped file.
+
+        :param str filename: path to SPARTN log file
+        :param int validate: VALCRC (1) = validate frameCrc and CRC, VALMSGID (2) = validate
+            msgType and msgSubtype, VALNONE (0) = no validation (1)
+        :param int quitonerror: ERROR_IGNORE (0) = ignore,  ERROR_LOG (1) = log and continue,
+            ERROR_RAISE (2) = (re)raise (1)
+        :param bool decode: decrypt and decode payload (False)
+        :param str key: decryption key as hexadecimal string (None)
+        :param object basedate: decryption basedate as datetime or 32-bit gnssTimeTag as
+           integer (None). If basedate = TIMEBASE, SPARTNMessage will use timetags argument
+        :param int errorhandler: error handling object or function (None)
+        :param dict timetags: dict of decryption timetags in format {0: 442626332, 1: 449347321,
+            2: 412947745} where key = msgSubtype (0=GPS, 1=GLO, etc) and value = gnssTimeTag (None)
+        :param bool resync: skip non-SPARTN data and frames failing validation
+            silently, recording them in `stats` (False)
+        :param object statshandler: function called with a copy of `stats` at the
+            end of each resynchronisation event (None)
+        :param object include: collection of message identities (e.g. "SPARTN-1X-OCB-GPS")
+            and/or (msgType, msgSubtype) tuples to be parsed; all others are filtered out (None)
+        :param object exclude: collection of message identities and/or (msgType, msgSubtype)
+            tuples to be filtered out (None)
+        :param bool filterraw: return filtered-out messages as (raw_data, None) rather than
+            skipping them (False)
+        :param bool demux: recognise UBX, RTCM3 and NMEA frames in a mixed stream and
+            skip them by their declared length, rather than as unknown data (False)
+        :param bool passthrough: in demux mode, return UBX, RTCM3 and NMEA frames as
+            (raw_data, None) rather than skipping them (False)
+        :param bool headeronly: return each SPARTN message as (raw_data, SPARTNHeader),
+            without building a SPARTNMessage or copying the payload (False)
+        :param object indexfile: path to sidecar index file, True to use
+            `filename + ".idx"`, or None to frame the file directly. A missing or
+            stale index is (re)created (None)
+        :param bool zerocopy: keep SPARTNMessage payloads as memoryview slices
+            of the mapped file rather than copying them to bytes (False)
+        :raises: OSError if file cannot be opened
+        :raises: ParameterError if file is compressed
+        """
+
+        self._file = open(filename, "rb")  # pylint: disable=consider-using-with
+        try:
+            # an empty file cannot be mapped
+            if fstat(self._file.fileno()).st_size:
+                self._mmap = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+            else:
+                self._mmap = b""
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        codec = compression(self._mmap[:6])
+        if codec is not None:  # cannot be memory-mapped as frames
+            if isinstance(self._mmap, mmap):
+                self._mmap.close()
+            self._file.close()
+            raise ParameterError(
+                f"{codec} compressed file not supported - use SPARTNReader"
+            )
+        super().__init__(
+            self._file,
+            validate=validate,
+            quitonerror=quitonerror,
+            decode=decode,
+            key=key,
+            basedate=basedate,
+            errorhandler=errorhandler,
+            timetags=timetags,
+            chunksize=0,
+            resync=resync,
+            statshandler=statshandler,
+            include=include,
+            exclude=exclude,
+            filterraw=filterraw,
+            demux=demux,
+            passthrough=passthrough,
+            headeronly=headeronly,
+            zerocopy=zerocopy,
+        )
+        self._buffer = self._mmap
+        self._view = memoryview(self._mmap)
+        self._index = None
+        self._nframes = 0
+        self._frame = 0
+        self._rescanend = 0  # end of last frame rejected from index
+        self._counts = None
+        self._timeindex = None
+        self._inittimetags = dict(self._timetags)
+        if indexfile is not None:
+            if indexfile is True:
+                indexfile = filename + ".idx"
+            self._index = self._load_index(filename, indexfile)
+            if self._index is None:
+                self.create_index(filename, indexfile)
+                self._index = self._load_index(filename, indexfile)
+            self._nframes = (len(self._index) - INDEX_HEADER.size) // INDEX_RECORD.size
+
+    def __enter__(self):
+        """
+        Context manager enter routine.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Context manager exit routine.
+        """
+
+        self.close()
+
+    def __getitem__(self, frame: int) -> tuple:
+        """
+        Random access to indexed frame, using the current timetags.
+
+        :param int frame: frame number
+        :return: tuple of (raw_data as memoryview, parsed_data as SPARTNMessage)
+        :rtype: tuple
+        :raises: ParameterError if no index
+        :raises: IndexError if frame out of range
+        :raises: SPARTN...Error if unable to parse message
+        """
+
+        offset, length, _, _, _, _, _, crcvalid = self.entry(frame)
+        raw_data = self._view[offset : offset + length]
+        if self._headeronly:
+            return (raw_data, SPARTNHeader(raw_data, bool(crcvalid)))
+        return (
+            raw_data,
+            self.parse(
+                raw_data,
+                validate=self._validate,
+                decode=self._decode,
+                key=self._key,
+                basedate=self._basedate,
+                timetags=self.timetags,
+                header=SPARTNHeader(raw_data, bool(crcvalid)),
+                zerocopy=self._zerocopy,
+            ),
+        )
+
+    def _read_frame(self, rejectcrc: bool = True) -> tuple:
+        """
+        Return the next frame from the index or, if there is no
+        index, frame the next message in the file.
+
+        :param bool rejectcrc: reject frames with invalid CRC (True)
+        :return: tuple of (raw_data as memoryview, crcvalid as bool)
+        :rtype: tuple
+        :raises: EOFError if end of index or file
+        :raises: SPARTNParseError if CRC invalid or false preamble
+        """
+
+        if self._index is None:
+            return super()._read_frame(rejectcrc)
+
+        while True:
+            if self._frame >= self._nframes:
+                raise EOFError()
+            (
+                offset,
+                length,
+                msgType,
+                msgSubtype,
+                timeTagtype,
+                gnssTimeTag,
+                _,
+                crcvalid,
+            ) = INDEX_RECORD.unpack_from(
+                self._index, INDEX_HEADER.size + self._frame * INDEX_RECORD.size
+            )
+            self._frame += 1
+            if offset < self._pos:  # found within a frame already returned
+                continue
+            raw_data = self._view[offset : offset + length]
+            # as when framing, search resumes within a rejected frame
+            rescan = offset < self._rescanend
+            if self._validate & VALCRC and not crcvalid and rejectcrc:
+                self._pos = offset + 1
+                self._rescanend = max(self._rescanend, offset + length)
+                self._stats["crcfailures"] += 1
+                if self._resync or rescan:
+                    continue
+                crclen = ((raw_data[3] >> 4) & 0x03) + 1
+                crc = int.from_bytes(raw_data[-crclen:], "big")
+                raise SPARTNParseError(f"Invalid CRC {crc}")
+            if self._validate & VALMSGID and (msgType, msgSubtype) not in SPARTN_MSGIDS:
+                self._pos = offset + 1
+                self._rescanend = max(self._rescanend, offset + length)
+                self._stats["headerfailures"] += 1
+                if self._resync or rescan:
+                    continue
+                raise SPARTNParseError(
+                    f"Unknown message type {msgType} subtype {msgSubtype}"
+                )
+            self._pos = offset + length
+            if timeTagtype:
+                self._timetags[msgSubtype] = gnssTimeTag
+            self._stats["frames"] += 1
+            if rescan:
+                self._stats["recovered"] += 1
+            return (raw_data, bool(crcvalid))
+
+    def _check_index(self):
+        """
+        Check index is loaded.
+
+        :raises: ParameterError if no index
+        """
+
+        if self._index is None:
+            raise ParameterError("No index - specify indexfile")
+
+    @staticmethod
+    def _load_index(filename: str, indexfile: str) -> bytes:
+        """
+        Load sidecar index file, if it exists and matches the log file.
+
+        :param str filename: path to SPARTN log file
+        :param str indexfile: path to index file
+        :return: index contents, or None if index missing or stale
+        :rtype: bytes
+        """
+
+        if not path.exists(indexfile):
+            return None
+        with open(indexfile, "rb") as infile:
+            index = infile.read()
+        if (
+            len(index) < INDEX_HEADER.size
+            or (len(index) - INDEX_HEADER.size) % INDEX_RECORD.size
+            or INDEX_HEADER.unpack_from(index) != (INDEX_MAGIC, *_file_stat(filename))
+        ):
+            return None
+        return index
+
+    @staticmethod
+    def create_index(filename: str, indexfile: str = None) -> int:
+        """
+        Scan SPARTN log file once and write sidecar index file containing
+        the offset, length, msgType, msgSubtype, timeTagtype, gnssTimeTag,
+        eaf and CRC validity of each frame.
+
+        Frames with an invalid CRC are indexed (with crcvalid = 0) so that
+        the index can be read with or without CRC validation. The bytes
+        of such frames, and of frames with an unknown message identity,
+        are then searched for genuine frames, which are also indexed.
+        Valid UBX, RTCM3 and NMEA frames are skipped by length (and not
+        indexed), so SPARTN preambles within them are not mistaken for frames.
+
+        :param str filename: path to SPARTN log file
+        :param str indexfile: path to index file (filename + ".idx")
+        :return: number of frames indexed
+        :rtype: int
+        """
+
+        if indexfile is None:
+            indexfile = filename + ".idx"
+        count = 0
+        rescanend = 0
+        with SPARTNArchiveReader(
+            filename, validate=VALCRC, quitonerror=ERRIGNORE, resync=True, demux=True
+        ) as spr:
+            with open(indexfile, "wb") as outfile:
+                outfile.write(INDEX_HEADER.pack(INDEX_MAGIC, *_file_stat(filename)))
+                # pylint: disable=protected-access
+                while True:
+                    try:
+                        raw_data, crcvalid = spr._read_frame(rejectcrc=False)
+                    except EOFError:
+                        break
+                    hdr = SPARTNHeader(raw_data)
+                    offset = spr.offset - hdr.length
+                    rescan = offset < rescanend
+                    if not (
+                        crcvalid and (hdr.msgType, hdr.msgSubtype) in SPARTN_MSGIDS
+                    ):  # resume search within rejected frame
+                        spr._pos = offset + 1
+                        rescanend = max(rescanend, offset + hdr.length)
+                        if rescan and not crcvalid:  # false preamble
+                            del raw_data
+                            continue
+                    outfile.write(
+                        INDEX_RECORD.pack(
+                            offset,
+                            hdr.length,
+                            hdr.msgType,
+                            hdr.msgSubtype,
+                            hdr.timeTagtype,
+                            hdr.gnssTimeTag,
+                            hdr.eaf,
+                            crcvalid,
+                        )
+                    )
+                    count += 1
+                    del raw_data
+        return count
+
+    def entry(self, frame: int) -> tuple:
+        """
+        Get index entry for frame.
+
+        :param int frame: frame number
+        :return: tuple of (offset, length, msgType, msgSubtype, timeTagtype,
+            gnssTimeTag, eaf, crcvalid)
+        :rtype: tuple
+        :raises: ParameterError if no index
+        :raises: IndexError if frame out of range
+        """
+
+        self._check_index()
+        if frame < 0:
+            frame += self._nframes
+        if not 0 <= frame < self._nframes:
+            raise IndexError(f"Frame {frame} out of range")
+        return INDEX_RECORD.unpack_from(
+            self._index, INDEX_HEADER.size + frame * INDEX_RECORD.size
+        )
+
+    def seek(self, frame: int):
+        """
+        Set next frame to be read from index.
+
+        :param int frame: frame number
+        :raises: ParameterError if no index
+        :raises: IndexError if frame out of range
+        """
+
+        self._check_index()
+        if frame == self._nframes:  # end of index
+            self._frame, self._pos = frame, len(self._buffer)
+            return
+        self._pos = self.entry(frame)[0]
+        self._frame = frame if frame >= 0 else frame + self._nframes
+        self._rescanend = 0
+
+    def seek_time(self, time: object) -> int:
+        """
+        Set next frame to be read from index to the first CRC-valid frame
+        whose gnssTimeTag, converted to UTC, is at or after the specified
+        time, and restore the 32-bit timetags which would have been
+        accumulated by reading the file sequentially up to that frame.
+
+        16-bit timetags are resolved using convert_timetag() with a running
+        basedate, i.e. the most recent 32-bit (or resolved 16-bit) timetag,
+        or the reader's basedate until a 32-bit timetag is found. Frames
+        whose timetags cannot be resolved are not matched.
+
+        :param object time: time as datetime (naive = UTC) or 32-bit gnssTimeTag
+            in UTC as integer
+        :return: frame number (`framecount` if no frame at or after time)
+        :rtype: int
+        :raises: ParameterError if no index
+        """
+
+        self._check_index()
+        if isinstance(time, datetime):
+            time = date2timetag(naive2aware(time))
+        keys, checkpoints = self._time_index()
+        frame, timetags, basedate = checkpoints[bisect_left(keys, time) - 1]
+        timetags = dict(timetags)
+        for frame in range(frame, self._nframes):
+            entry = self.entry(frame)
+            timetag, basedate = self._resolve(entry, basedate)
+            if timetag is None:
+                continue
+            if timetag >= time:
+                break
+            if entry[4]:  # 32-bit timetag
+                timetags[entry[3]] = entry[5]
+        else:
+            frame = self._nframes
+        self.seek(frame)
+        self._timetags.clear()
+        self._timetags.update(timetags)
+        return frame
+
+    def _time_index(self) -> tuple:
+        """
+        Build sparse time index from the sidecar index on first use.
+
+        Each of the `TIMEINDEX_STEP`-spaced checkpoints records the frame
+        number, the 32-bit timetags and the running basedate at that frame,
+        keyed on the latest UTC timetag of any preceding frame, so that
+        `seek_time()` can binary search to the last checkpoint preceding a
+        given time and resolve the remaining frames from there.
+
+        :return: tuple of (list of keys, list of (frame, timetags, basedate))
+        :rtype: tuple
+        """
+
+        if self._timeindex is None:
+            keys = []
+            checkpoints = []
+            timetags = dict(self._inittimetags)
+            basedate = self._basedate
+            if basedate is None or basedate == TIMEBASE:
+                basedate = None
+            elif isinstance(basedate, datetime):
+                basedate = date2timetag(naive2aware(basedate))
+            latest = -1
+            for frame, entry in enumerate(
+                INDEX_RECORD.iter_unpack(memoryview(self._index)[INDEX_HEADER.size :])
+            ):
+                if not frame % TIMEINDEX_STEP:
+                    keys.append(latest)
+                    checkpoints.append((frame, dict(timetags), basedate))
+                timetag, basedate = self._resolve(entry, basedate)
+                if timetag is None:
+                    continue
+                latest = max(latest, timetag)
+                if entry[4]:
+                    timetags[entry[3]] = entry[5]
+            if not checkpoints:  # empty index
+                keys.append(latest)
+                checkpoints.append((0, timetags, basedate))
+            self._timeindex = (keys, checkpoints)
+        return self._timeindex
+
+    @staticmethod
+    def _resolve(entry: tuple, basedate: int) -> tuple:
+        """
+        Resolve the gnssTimeTag of an index entry to a 32-bit timetag in UTC.
+
+        :param tuple entry: index entry
+        :param int basedate: running basedate as 32-bit gnssTimeTag, or None
+        :return: tuple of (32-bit timetag in UTC, or None if the entry is invalid
+            or cannot be resolved, updated basedate)
+        :rtype: tuple
+        """
+
+        _, _, msgType, msgSubtype, timeTagtype, gnssTimeTag, _, crcvalid = entry
+        if not crcvalid or (msgType, msgSubtype) not in SPARTN_MSGIDS:
+            return None, basedate
+        if not timeTagtype:
+            if basedate is None:
+                return None, basedate
+            gnssTimeTag = convert_timetag(gnssTimeTag, timetag2date(basedate))
+        return timetag2utc(gnssTimeTag, msgType, msgSubtype), gnssTimeTag
+
+    @property
+    def counts(self) -> dict:
+        """
+        Getter for number of CRC-valid frames of each message identity in index.
+
+        :return: dict of {identity: count}
+        :rtype: dict
+        :raises: ParameterError if no index
+        """
+
+        self._check_index()
+        if self._counts is None:
+            counts = {}
+            for (
+                _,
+                _,
+                msgType,
+                msgSubtype,
+                _,
+                _,
+                _,
+                crcvalid,
+            ) in INDEX_RECORD.iter_unpack(memoryview(self._index)[INDEX_HEADER.size :]):
+                if crcvalid:
+                    identity = SPARTN_MSGIDS.get((msgType, msgSubtype), "UNKNOWN")
+                    counts[identity] = counts.get(identity, 0) + 1
+            self._counts = counts
+        return dict(self._counts)
+
+    def _fill(self, size: int) -> bool:
+        """
+        The whole file is already mapped, so the framing buffer cannot
+        be topped up.
+
+        :param int size: number of bytes required
+        :return: True if size bytes available, False if end of file
+        :rtype: bool
+        """
+
+        return len(self._buffer) - self._pos >= size
+
+    def close(self):
+        """
+        Release the memory map and close the file.
+
+        If any raw frames are still referenced, the map is left for
+        garbage collection to release once they are no longer in use.
+        """
+
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if isinstance(self._mmap, mmap):
+            try:
+                self._mmap.close()
+            except BufferError:  # frames still exported
+                pass
+        self._file.close()
+
+    @property
+    def framecount(self) -> int:
+        """
+        Getter for number of frames in index.
+
+        :return: number of indexed frames
+        :rtype: int
+        :raises: ParameterError if no index
+        """
+
+        self._check_index()
+        return self._nframes
+
+    @property
+    def indexed(self) -> bool:
+        """
+        Getter for indexed status.
+
+        :return: True if frames are being read via a sidecar index
+        :rtype: bool
+        """
+
+        return self._index is not None
+
+    @property
+    def offset(self) -> int:
+        """
+        Getter for current byte offset in file, i.e. immediately after
+        the last frame read.
+
+        :return: offset
+        :rtype: int
+        """
+
+        return self._pos
+
+
+def _file_stat(filename: str) -> tuple:
+    """
+    Get size and modification time of file, used to detect a stale index.
+
+    :param str filename: path to file
+    :return: tuple of (size, modification time in ns)
+    :rtype: tuple
+    """
+
+    fst = stat(filename)
+    return fst.st_size, fst.st_mtime_ns
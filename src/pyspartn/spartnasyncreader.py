@@ -0,0 +1,282 @@
+"""
+AsyncSPARTNReader class.
+
+The AsyncSPARTNReader class will parse individual SPARTN messages
+from an asyncio.StreamReader, or any other object with an awaitable
+`read(n)` method returning up to n bytes (b"" at end of stream),
+allowing many SPARTN streams to be read concurrently on a single
+event loop.
+
+It uses the same framing, validation, error handling and decryption
+logic as SPARTNReader.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=invalid-overridden-method
+
+from pyspartn.exceptions import ParameterError
+from pyspartn.spartnreader import SPARTN_ERRORS, SPARTNReader, _NeedData
+from pyspartn.spartntypes_core import ERRLOG, ERRRAISE, VALCRC
+
+
+class AsyncSPARTNReader(SPARTNReader):
+    """
+    AsyncSPARTNReader class.
+    """
+
+    def __init__(
+        self,
+        datastream,
+        validate: int = VALCRC,
+        quitonerror: int = ERRLOG,
+        decode: bool = False,
+        key: str = None,
+        basedate: object = None,
+        errorhandler: object = None,
+        timetags: dict = None,
+        chunksize: int = 65536,
+        resync: bool = False,
+        statshandler: object = None,
+        include: object = None,
+        exclude: object = None,
+        filterraw: bool = False,
+        demux: bool = False,
+        passthrough: bool = False,
+        headeronly: bool = False,
+        zerocopy: bool = False,
+    ):
+        """Constructor.
+
+        :param datastream stream: asyncio.StreamReader or other object with
+            awaitable read(n) method
+        :param int validate: VALCRC (1) = validate frameCrc and CRC, VALMSGID (2) = validate
+            msgType and msgSubtype, VALNONE (0) = no validation (1)
+        :param int quitonerror: ERROR_IGNORE (0) = ignore,  ERROR_LOG (1) = log and continue,
+            ERROR_RAISE (2) = (re)raise (1)
+        :param bool decode: decrypt and decode payload (False)
+        :param str key: decryption key as hexadecimal string (None)
+        :param object basedate: decryption basedate as datetime or 32-bit gnssTimeTag as
+           integer (None). If basedate = TIMEBASE, SPARTNMessage will use timetags argument
+        :param int errorhandler: error handling object or function (None)
+        :param dict timetags: dict of decryption timetags in format {0: 442626332, 1: 449347321,
+            2: 412947745} where key = msgSubtype (0=GPS, 1=GLO, etc) and value = gnssTimeTag (None)
+        :param int chunksize: maximum size of each read from stream, must be
+            at least 1 (65536)
+        :param bool resync: skip non-SPARTN data and frames failing validation
+            silently, recording them in `stats` (False)
+        :param object statshandler: function called with a copy of `stats` at the
+            end of each resynchronisation event (None)
+        :param object include: collection of message identities (e.g. "SPARTN-1X-OCB-GPS")
+            and/or (msgType, msgSubtype) tuples to be parsed; all others are filtered out (None)
+        :param object exclude: collection of message identities and/or (msgType, msgSubtype)
+            tuples to be filtered out (None)
+        :param bool filterraw: return filtered-out messages as (raw_data, None) rather than
+            skipping them (False)
+        :param bool demux: recognise UBX, RTCM3 and NMEA frames in a mixed stream and
+            skip them by their declared length, rather than as unknown data (False)
+        :param bool passthrough: in demux mode, return UBX, RTCM3 and NMEA frames as
+            (raw_data, None) rather than skipping them (False)
+        :param bool headeronly: return each SPARTN message as (raw_data, SPARTNHeader),
+            without building a SPARTNMessage or copying the payload (False)
+        :param bool zerocopy: return raw_data, and SPARTNMessage transport and payload,
+            as memoryview slices of the framing buffer rather than copying them to
+            bytes (False)
+        :raises: ParameterError if chunksize is less than 1
+        """
+        # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+
+        if chunksize < 1:
+            raise ParameterError(f"Invalid chunksize {chunksize} - must be at least 1")
+        super().__init__(
+            datastream,
+            validate=validate,
+            quitonerror=quitonerror,
+            decode=decode,
+            key=key,
+            basedate=basedate,
+            errorhandler=errorhandler,
+            timetags=timetags,
+            chunksize=chunksize,
+            resync=resync,
+            statshandler=statshandler,
+            include=include,
+            exclude=exclude,
+            filterraw=filterraw,
+            demux=demux,
+            passthrough=passthrough,
+            headeronly=headeronly,
+            zerocopy=zerocopy,
+        )
+        self._eof = False
+
+    def __aiter__(self):
+        """Asynchronous iterator."""
+
+        return self
+
+    async def __anext__(self) -> tuple:
+        """
+        Return next item in asynchronous iteration.
+
+        :return: tuple of (raw_data as bytes, parsed_data as SPARTNMessage or None if error)
+        :rtype: tuple
+        :raises: StopAsyncIteration
+        """
+
+        raw_data, parsed_data = await self.read()
+        if raw_data is None and parsed_data is None:
+            raise StopAsyncIteration
+        return (raw_data, parsed_data)
+
+    def __next__(self):
+        """
+        Synchronous iteration is not supported.
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use 'async for' to iterate AsyncSPARTNReader")
+
+    def iter_threaded(
+        self, queuesize: int = 1024, dropoldest: bool = False, jointimeout: float = None
+    ):
+        """
+        Threaded reads are not supported - the event loop already
+        overlaps stream reads with parsing.
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use 'async for' to iterate AsyncSPARTNReader")
+
+    def iter_parallel(self, workers: int = None, chunkframes: int = 256):
+        """
+        Parallel reads are not supported.
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use 'async for' to iterate AsyncSPARTNReader")
+
+    async def read(self) -> tuple:
+        """
+        Read a single SPARTN message from the stream buffer
+        and return both raw and parsed data, awaiting more data
+        from the stream as required.
+
+        The 'quitonerror' flag determines whether to raise, log or ignore
+        parsing errors.
+
+        :return: tuple of (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: tuple
+        :raises: SPARTN***Error if error during parsing
+        """
+
+        while True:  # loop until end of valid message or EOF
+            try:
+                return self._parse_spartn()
+            except _NeedData:
+                await self._read_stream()
+            except EOFError:
+                self._end_resync()
+                return (None, None)
+            except SPARTN_ERRORS as err:
+                if self._quitonerror:
+                    self._do_error(err)
+                continue
+
+    async def read_many(self, n: int) -> list:
+        """
+        Read up to n SPARTN messages from the stream buffer, awaiting
+        more data from the stream as required, and return a list of raw
+        and parsed data. Fewer than n messages are returned only if the
+        stream ends.
+
+        The 'quitonerror' flag determines whether to raise, log or ignore
+        parsing errors. If quitonerror = 2 and messages have already been
+        read into the batch, the partial batch is returned and the error
+        is raised on the next call.
+
+        :param int n: maximum number of messages to read
+        :return: list of tuples of (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: list
+        :raises: SPARTN***Error if error during parsing
+        """
+
+        if self._pending is not None:  # error deferred from previous batch
+            err, self._pending = self._pending, None
+            self._do_error(err)
+        messages = []
+        while len(messages) < n:
+            try:
+                self._read_batch(n, messages)
+            except _NeedData:
+                await self._read_stream()
+            except EOFError:
+                self._end_resync()
+                break
+            except SPARTN_ERRORS as err:
+                if self._quitonerror == ERRRAISE and messages:
+                    self._pending = err  # return partial batch, raise on next read
+                    break
+                if self._quitonerror:
+                    self._do_error(err)
+        return messages
+
+    async def iter_batches(self, size: int = 256):
+        """
+        Asynchronous generator which yields lists of up to `size` SPARTN
+        messages from the stream, as returned by `read_many()`.
+
+        :param int size: number of messages in each batch (256)
+        :return: asynchronous generator of lists of tuples of
+            (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: async_generator
+        :raises: SPARTN***Error if error during parsing
+        """
+
+        while True:
+            messages = await self.read_many(size)
+            if messages:
+                yield messages
+            if len(messages) < size and self._pending is None:  # end of stream
+                return
+
+    async def _read_stream(self):
+        """
+        Await more data from the stream and add it to the framing buffer,
+        recording the end of the stream if no data is returned.
+        """
+
+        data = await self._stream.read(self._chunksize)
+        if data:
+            self._buffer = self._buffer[self._pos :] + data
+            self._pos = 0
+            if self._zerocopy:
+                self._view = memoryview(self._buffer)
+        else:
+            self._eof = True
+
+    def _fill(self, size: int) -> bool:
+        """
+        Check framing buffer holds at least the specified number of bytes
+        from the current buffer position. If not, and the stream has not
+        ended, signal to `read()` that more data must be awaited. The buffer
+        position is left at the start of the incomplete frame.
+
+        :param int size: number of bytes required
+        :return: True if size bytes available, False if stream ended prematurely
+        :rtype: bool
+        :raises: _NeedData if more data required
+        """
+
+        if len(self._buffer) - self._pos >= size:
+            return True
+        if self._eof:
+            return False
+        raise _NeedData()
@@ -0,0 +1,118 @@
+"""
+SPARTNReader batch parsing.
+
+Mixin class providing `SPARTNReader.parse_many()`, which parses a batch
+of already-framed SPARTN messages, resolving the key and basedate once
+for the whole batch.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=too-few-public-methods
+
+from datetime import datetime, timezone
+from os import getenv
+
+from pyspartn.exceptions import SPARTN_ERRORS, SPARTNMessageError, SPARTNParseError
+from pyspartn.spartnheader import SPARTNHeader
+from pyspartn.spartnhelpers import naive2aware, timetag2date, valid_crc
+from pyspartn.spartnmessage import SPARTNMessage
+from pyspartn.spartntypes_core import SPARTN_MSGIDS, VALCRC, VALMSGID
+
+
+class BatchParseMixin:
+    """
+    SPARTNReader batch parsing mixin class.
+    """
+
+    @staticmethod
+    def parse_many(
+        messages: object,
+        validate: int = VALCRC,
+        decode: bool = False,
+        key: str = None,
+        basedate: object = None,
+        timetags: dict = None,
+        zerocopy: bool = False,
+    ) -> list:
+        """
+        Parse a batch of already-framed SPARTN messages (e.g. one per MQTT
+        payload) to SPARTNMessage objects.
+
+        The key and basedate are resolved once for the whole batch, and each
+        transport header is decoded (and its CRC validated) only once. The
+        32-bit gnssTimeTag of each message with a valid CRC is accumulated in
+        `timetags`, as when reading a stream, so decryption with
+        `basedate=TIMEBASE` works across the batch (and across successive
+        batches, if the same timetags dict is passed).
+
+        :param object messages: iterable of SPARTN raw messages, each a complete frame
+        :param int validate: VALCRC (1) = validate CRC, VALMSGID (2) = validate
+            msgType and msgSubtype, VALNONE (0) = no validation (1)
+        :param bool decode: decrypt and decode payloads (False)
+        :param str key: decryption key as hexadecimal string (None)
+        :param object basedate: basedate as datetime or 32-bit gnssTimeTag as
+            integer (None = current datetime)
+        :param dict timetags: dict of accumulated gnssTimeTags, updated in place (None)
+        :param bool zerocopy: keep transport and payload of each message as
+            memoryview slices of the message buffer (False)
+        :return: list of parsed SPARTNMessage, or error, for each message, in order
+        :rtype: list
+        :raises: ParameterError if decryption is enabled and no key is available
+        """
+
+        key = getenv("MQTTKEY", None) if key is None else key
+        if key is not None:
+            key = bytes.fromhex(key)
+        if basedate is None:
+            basedate = datetime.now(timezone.utc)
+        elif isinstance(basedate, int):
+            basedate = timetag2date(basedate)
+        else:
+            basedate = naive2aware(basedate)
+        if timetags is None:
+            timetags = {}
+        tags = dict(timetags)
+        results = []
+        for message in messages:
+            try:
+                header = SPARTNHeader(message)
+                if validate & VALCRC:
+                    crclen = header.crcType + 1
+                    if not valid_crc(
+                        message[1 : header.length - crclen], header.crc, header.crcType
+                    ):
+                        raise SPARTNMessageError(f"Invalid CRC {header.crc}")
+                    header.crcvalid = True
+                if (
+                    validate & VALMSGID
+                    and (header.msgType, header.msgSubtype) not in SPARTN_MSGIDS
+                ):
+                    raise SPARTNParseError(
+                        f"Unknown message type {header.msgType} "
+                        f"subtype {header.msgSubtype}"
+                    )
+                if header.timeTagtype:
+                    timetags[header.msgSubtype] = header.gnssTimeTag
+                    # share timetags between messages until they change
+                    if tags != timetags:
+                        tags = dict(timetags)
+                results.append(
+                    SPARTNMessage(
+                        transport=message,
+                        validate=validate,
+                        decode=decode,
+                        key=key,
+                        basedate=basedate,
+                        timetags=tags,
+                        header=header,
+                        zerocopy=zerocopy,
+                    )
+                )
+            except SPARTN_ERRORS as err:
+                results.append(err)
+        return results
@@ -0,0 +1,132 @@
+"""
+SPARTNHeader class.
+
+Lightweight representation of the SPARTN transport layer header
+(framestart, payload descriptor and CRC) of a single SPARTN message,
+decoded once by SPARTNReader and passed to SPARTNMessage so the same
+fields are not decoded (and the CRC not validated) twice.
+
+It is also returned in place of a SPARTNMessage by readers in
+`headeronly` mode, e.g. for relays which route SPARTN messages without
+looking inside the payload.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=invalid-name too-many-instance-attributes
+
+from pyspartn.exceptions import SPARTNMessageError
+from pyspartn.spartntables import ALN_ENUM
+from pyspartn.spartntypes_core import SPARTN_MSGIDS
+
+
+class SPARTNHeader:
+    """
+    SPARTNHeader class.
+    """
+
+    __slots__ = (
+        "msgType",
+        "nData",
+        "eaf",
+        "crcType",
+        "frameCrc",
+        "msgSubtype",
+        "timeTagtype",
+        "gnssTimeTag",
+        "solutionId",
+        "solutionProcId",
+        "encryptionId",
+        "encryptionSeq",
+        "authInd",
+        "embAuthLen",
+        "embAuth",
+        "crc",
+        "paystart",
+        "length",
+        "crcvalid",
+    )
+
+    def __init__(self, transport: bytes, crcvalid: bool = False):
+        """
+        Constructor.
+
+        :param bytes transport: SPARTN message transport (complete frame)
+        :param bool crcvalid: CRC has already been validated (False)
+        :raises: SPARTNMessageError if transport is truncated
+        """
+
+        if len(transport) < 8:
+            raise SPARTNMessageError(f"Transport length {len(transport)} too short")
+        b1, b2, b3, b4 = transport[1:5]
+        self.msgType = b1 >> 1
+        self.nData = ((b1 & 0x01) << 9) | (b2 << 1) | (b3 >> 7)
+        self.eaf = (b3 >> 6) & 0x01
+        self.crcType = (b3 >> 4) & 0x03
+        self.frameCrc = b3 & 0x0F
+        self.msgSubtype = b4 >> 4
+        self.timeTagtype = (b4 >> 3) & 0x01
+        if self.timeTagtype:  # 32-bit gnssTimeTag
+            pos = 10
+            payDesc = int.from_bytes(transport[4:pos], "big")
+            self.gnssTimeTag = (payDesc >> 11) & 0xFFFFFFFF
+        else:  # 16-bit gnssTimeTag
+            pos = 8
+            payDesc = int.from_bytes(transport[4:pos], "big")
+            self.gnssTimeTag = (payDesc >> 11) & 0xFFFF
+        self.solutionId = (payDesc >> 4) & 0x7F
+        self.solutionProcId = payDesc & 0x0F
+        self.encryptionId = self.encryptionSeq = None
+        self.authInd = self.embAuthLen = self.embAuth = None
+        aln = 0
+        if self.eaf:  # encrypted payload
+            encDesc = int.from_bytes(transport[pos : pos + 2], "big")
+            self.encryptionId = encDesc >> 12
+            self.encryptionSeq = (encDesc >> 6) & 0x3F
+            self.authInd = (encDesc >> 3) & 0x07
+            self.embAuthLen = encDesc & 0x07
+            pos += 2
+            if self.authInd > 1:
+                aln = ALN_ENUM.get(self.embAuthLen, 0)
+        self.paystart = pos
+        pos += self.nData
+        if aln:
+            self.embAuth = int.from_bytes(transport[pos : pos + aln], "big")
+        pos += aln + self.crcType + 1
+        if len(transport) < pos:
+            raise SPARTNMessageError(
+                f"Transport length {len(transport)} less than frame length {pos}"
+            )
+        self.crc = int.from_bytes(transport[pos - self.crcType - 1 : pos], "big")
+        self.length = pos
+        self.crcvalid = crcvalid
+
+    def __str__(self) -> str:
+        """
+        Human readable representation.
+
+        :return: human readable representation
+        :rtype: str
+        """
+
+        stg = f"<SPARTNHeader({self.identity}"
+        for att in self.__slots__:
+            val = getattr(self, att)
+            if val is not None:
+                stg += f", {att}={val}"
+        return stg + ")>"
+
+    @property
+    def identity(self) -> str:
+        """
+        Return message identity.
+
+        :return: message identity e.g. "SPARTN-1X-OCB-GPS"
+        :rtype: str
+        """
+
+        return SPARTN_MSGIDS.get((self.msgType, self.msgSubtype), "UNKNOWN")
@@ -9,7 +9,9 @@ Created on 10 Feb 2023
 :license: BSD 3-Clause
 """
 
+from binascii import crc_hqx
 from datetime import datetime, timedelta, timezone
+from operator import mul
 
 try:
     from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -20,7 +22,16 @@ except (ImportError, ModuleNotFoundError):
     HASCRYPTO = False
     """HASCRYPTO boolean attribute can be used to check runtime decryption support"""
 from pyspartn.exceptions import SPARTNMessageError
-from pyspartn.spartntypes_core import FL, IN, SPARTN_DATA_FIELDS, TIMEBASE
+from pyspartn.spartntypes_core import (
+    FL,
+    IN,
+    SPARTN_DATA_FIELDS,
+    TIMEBASE,
+    TIMETAG_UTC,
+)
+
+CRC_TABLES = {}
+"""Cache of CRC lookup tables, keyed on (width, polynomial)"""
 
 
 def att2idx(att: str) -> int:
@@ -108,12 +119,40 @@ def bitsval(
     return intval
 
 
+def crc_table(n: int, poly: int) -> list:
+    """
+    Get 256-entry lookup table for MSB-first (non-reflected) CRC of given
+    width and polynomial. Tables are built on first use and cached.
+
+    :param int n: width in bits (>= 8)
+    :param int poly: polynomial feed value
+    :return: lookup table
+    :rtype: list
+    """
+
+    table = CRC_TABLES.get((n, poly), None)
+    if table is None:
+        top = 1 << (n - 1)
+        mask = (1 << n) - 1
+        table = []
+        for i in range(256):
+            crc = i << (n - 8)
+            for _ in range(8):
+                crc = ((crc << 1) ^ poly) if crc & top else crc << 1
+            table.append(crc & mask)
+        CRC_TABLES[(n, poly)] = table
+    return table
+
+
 def crc_poly(
     data: int, n: int, poly: int, crc: int = 0, ref_out: bool = False, xor_out: int = 0
 ) -> int:
     """
     Configurable CRC algorithm.
 
+    Uses a precomputed lookup table (one iteration per byte rather than
+    eight), or the C implementation in binascii.crc_hqx for CRC-16/0x1021.
+
     :param int data: data
     :param int n: width
     :param int poly: polynomial feed value
@@ -123,26 +162,48 @@ def crc_poly(
     :return: CRC
     :rtype: int
     """
-    # pylint: disable=unused-argument, too-many-arguments
+    # pylint: disable=unused-argument, too-many-arguments, too-many-positional-arguments
+
+    if n == 16 and poly == 0x1021:
+        return crc_hqx(data, crc) ^ xor_out
 
-    g = 1 << n | poly  # Generator polynomial
+    table = crc_table(n, poly)
+    if n == 8:
+        for d in data:
+            crc = table[crc ^ d]
+        return crc ^ xor_out
 
-    # Loop over the data
+    shift = n - 8
+    mask = (1 << n) - 1
     for d in data:
-        # XOR the top byte in the CRC with the input byte
-        crc ^= d << (n - 8)
+        crc = ((crc << 8) & mask) ^ table[((crc >> shift) ^ d) & 0xFF]
 
-        # Loop over all the bits in the byte
-        for _ in range(8):
-            # Start by shifting the CRC, so we can check for the top bit
-            crc <<= 1
+    return crc ^ xor_out
 
-            # XOR the CRC if the top bit is 1
-            if crc & (1 << n):
-                crc ^= g
 
-    # Return the CRC value
-    return crc ^ xor_out
+def frame_crc(framestart: bytes) -> int:
+    """
+    Calculate 4-bit frameCrc over the first 20 bits of the 3-byte
+    framestart (msgType, nData, eaf and crcType).
+
+    CRC-4 with polynomial 0x09, processed least significant bit
+    first, using a cached 256-entry lookup table.
+
+    :param bytes framestart: framestart (frameCrc bits are ignored)
+    :return: frameCrc
+    :rtype: int
+    """
+
+    table = CRC_TABLES.get((4, 0x09), None)
+    if table is None:
+        table = []
+        for i in range(256):
+            crc = i
+            for _ in range(8):
+                crc = (crc >> 1) ^ 0x09 if crc & 0x01 else crc >> 1
+            table.append(crc)
+        CRC_TABLES[(4, 0x09)] = table
+    return table[table[table[framestart[0]] ^ framestart[1]] ^ (framestart[2] & 0xF0)]
 
 
 def valid_crc(msg: bytes, crc: int, crctype: int) -> bool:
@@ -157,7 +218,7 @@ def valid_crc(msg: bytes, crc: int, crctype: int) -> bool:
     if crctype == 0:
         crcchk = crc_poly(msg, 8, 0x07)
     elif crctype == 1:
-        crcchk = crc_poly(msg, 16, 0x1021)
+        crcchk = crc_hqx(msg, 0)
     elif crctype == 2:
         crcchk = crc_poly(msg, 24, 0x864CFB)
     elif crctype == 3:
@@ -167,6 +228,25 @@ def valid_crc(msg: bytes, crc: int, crctype: int) -> bool:
     return crc == crcchk
 
 
+def ubx_checksum(data: bytes) -> bytes:
+    """
+    Calculate UBX 8-bit Fletcher checksum (ck_a, ck_b) over the class, id,
+    length and payload of a UBX message.
+
+    ck_b is the sum of the running ck_a values, i.e. each byte weighted by
+    its distance from the end of the data, so both sums are computed
+    without a per-byte Python loop.
+
+    :param bytes data: UBX message class, id, length and payload
+    :return: 2-byte checksum
+    :rtype: bytes
+    """
+
+    cka = sum(data) & 0xFF
+    ckb = sum(map(mul, data, range(len(data), 0, -1))) & 0xFF
+    return bytes((cka, ckb))
+
+
 def encrypt(pt: bytes, key: bytes, iv: bytes, mode: str = "CTR") -> tuple:
     """
     Encrypt payload
@@ -310,6 +390,24 @@ def convert_timetag(
     return closest_time_tag
 
 
+def timetag2utc(timetag32: int, msgtype: int, msgsubtype: int) -> int:
+    """
+    Convert 32-bit gnssTimeTag, in the GNSS constellation time of the
+    message, to UTC. OCB and HPAC timetags are in the time of their
+    constellation (msgSubtype), all other timetags in GPS time.
+
+    :param int timetag32: 32-bit gnssTimeTag
+    :param int msgtype: message type (msgType)
+    :param int msgsubtype: message subtype (msgSubtype)
+    :return: 32-bit gnssTimeTag in UTC
+    :rtype: int
+    """
+
+    if msgtype > 1:
+        msgsubtype = 0
+    return timetag32 + TIMETAG_UTC.get(msgsubtype, 0)
+
+
 def naive2aware(dt: datetime, tz: timezone = timezone.utc) -> datetime:
     """
     Convert naive datetime to aware.
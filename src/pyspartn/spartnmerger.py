@@ -0,0 +1,325 @@
+"""
+SPARTNMerger class.
+
+Merges SPARTN messages received from several redundant sources (e.g.
+the same corrections received via IP/MQTT and L-Band, or from more than
+one MQTT broker), returning each unique message once.
+
+Duplicates are identified either by their complete frame bytes (which
+include the frame CRC), or by their header fields (msgType, msgSubtype,
+gnssTimeTag, solutionId and, for encrypted messages, encryptionSeq or,
+for unencrypted messages, nData and message CRC), within a window of
+arrival times. The first arrival of each message is returned; later arrivals
+are discarded but recorded in per-source statistics. An optional
+reorder buffer returns messages in gnssTimeTag (UTC) order.
+
+Messages are returned as (source_id, raw_data, parsed_data) tuples,
+as for SPARTNMultiplexer.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=too-many-arguments, too-many-instance-attributes
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from heapq import heappop, heappush
+from queue import Full, Queue
+from threading import Event, Thread
+from time import monotonic
+
+from pyspartn.spartnheader import SPARTNHeader
+from pyspartn.spartnhelpers import (
+    convert_timetag,
+    date2timetag,
+    naive2aware,
+    timetag2date,
+    timetag2utc,
+)
+from pyspartn.spartntypes_core import SPARTN_PRE
+
+
+class SPARTNMerger:
+    """
+    SPARTNMerger class.
+    """
+
+    def __init__(
+        self,
+        readers: dict = None,
+        byheader: bool = False,
+        window: float = 10.0,
+        reorder: int = 0,
+        basedate: object = None,
+        queuesize: int = 1024,
+    ):
+        """
+        Constructor.
+
+        :param dict readers: dict of {source_id: reader}, where reader is a
+            SPARTNReader or other iterable of (raw_data, parsed_data) tuples,
+            each of which is read in its own thread when iterating (None)
+        :param bool byheader: identify duplicates by msgType, msgSubtype,
+            gnssTimeTag, solutionId and encryptionSeq (or nData and CRC if
+            unencrypted) (True) or by complete frame bytes (False) (False)
+        :param float window: time in seconds after the first arrival of a
+            message during which later arrivals are discarded as duplicates (10.0)
+        :param int reorder: number of messages held in reorder buffer, so
+            that messages are returned in gnssTimeTag order (0 = no reordering)
+        :param object basedate: basedate as datetime or 32-bit gnssTimeTag as
+            integer, used to resolve 16-bit timetags for reordering until a
+            32-bit timetag is received (None = current datetime)
+        :param int queuesize: maximum number of messages queued from reader
+            threads (1024)
+        """
+
+        self._readers = {} if readers is None else readers
+        self._byheader = byheader
+        self._window = window
+        self._reorder = reorder
+        if basedate is None:
+            basedate = datetime.now(timezone.utc)
+        if isinstance(basedate, datetime):
+            basedate = date2timetag(naive2aware(basedate))
+        self._basedate = basedate
+        self._queuesize = queuesize
+        self._seen = OrderedDict()  # {key: (first arrival, sources)}
+        self._buffer = []  # reorder heap of (timetag, sequence, message)
+        self._seq = 0
+        self._unique = 0
+        self._stats = {}
+
+    def __iter__(self):
+        """
+        Iterator - reads all readers in background threads until they
+        end, yielding each unique message once.
+
+        An exception raised by any reader is re-raised in the calling thread.
+
+        :return: generator of tuples of (source_id, raw_data as bytes,
+            parsed_data as SPARTNMessage)
+        :rtype: generator
+        """
+
+        messages = Queue(self._queuesize)
+        stop = Event()
+        for source, reader in self._readers.items():
+            Thread(
+                target=self._produce,
+                args=(source, reader, messages, stop),
+                daemon=True,
+            ).start()
+        active = len(self._readers)
+        try:
+            while active:
+                source, raw_data, parsed_data, arrival = messages.get()
+                if raw_data is None:  # end of reader or error
+                    if parsed_data is not None:
+                        raise parsed_data
+                    active -= 1
+                    continue
+                yield from self.push(source, raw_data, parsed_data, arrival)
+            yield from self.flush()
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _produce(source: object, reader: object, messages: Queue, stop: Event):
+        """
+        Read messages from reader and place them on the queue with their
+        arrival time, until the reader ends or the consumer stops.
+
+        Queue items are tuples of (source_id, raw_data, parsed_data, arrival).
+        Reader errors are queued as (source_id, None, error, None) and end of
+        reader as (source_id, None, None, None).
+
+        :param object source: source identifier
+        :param object reader: iterable of (raw_data, parsed_data) tuples
+        :param Queue messages: bounded message queue
+        :param Event stop: set by the consumer when iteration ends
+        """
+
+        try:
+            for raw_data, parsed_data in reader:
+                item = (source, raw_data, parsed_data, monotonic())
+                while not stop.is_set():
+                    try:  # block, checking periodically for consumer stop
+                        messages.put(item, timeout=0.1)
+                        break
+                    except Full:
+                        pass
+                if stop.is_set():
+                    return
+            item = (source, None, None, None)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            item = (source, None, err, None)
+        while not stop.is_set():
+            try:
+                messages.put(item, timeout=0.1)
+                return
+            except Full:
+                pass
+
+    def merge(self, messages: object):
+        """
+        Generator which merges an iterable of (source_id, raw_data,
+        parsed_data) tuples, e.g. a SPARTNMultiplexer, yielding each
+        unique message once.
+
+        :param object messages: iterable of (source_id, raw_data, parsed_data)
+        :return: generator of tuples of (source_id, raw_data, parsed_data)
+        :rtype: generator
+        """
+
+        for source, raw_data, parsed_data in messages:
+            yield from self.push(source, raw_data, parsed_data)
+        yield from self.flush()
+
+    def push(
+        self,
+        source: object,
+        raw_data: bytes,
+        parsed_data: object,
+        arrival: float = None,
+    ) -> list:
+        """
+        Add a message received from a source, and return any messages
+        ready for output.
+
+        Non-SPARTN data (e.g. UBX, RTCM3 or NMEA passthrough frames) is
+        returned immediately, without deduplication or reordering.
+
+        :param object source: source identifier
+        :param bytes raw_data: raw message
+        :param object parsed_data: parsed message (may be None)
+        :param float arrival: arrival time in seconds (None = time.monotonic())
+        :return: list of tuples of (source_id, raw_data, parsed_data), which
+            may be empty
+        :rtype: list
+        """
+
+        if arrival is None:
+            arrival = monotonic()
+        stats = self._stats.get(source)
+        if stats is None:
+            stats = self._stats[source] = {
+                "received": 0,
+                "first": 0,
+                "duplicates": 0,
+                "distinct": 0,
+                "latency": 0.0,
+                "maxlatency": 0.0,
+            }
+        stats["received"] += 1
+        message = (source, raw_data, parsed_data)
+        if raw_data[0] != SPARTN_PRE:
+            return [message]
+        hdr = SPARTNHeader(raw_data)
+        if self._byheader:
+            key = (
+                hdr.msgType,
+                hdr.msgSubtype,
+                hdr.gnssTimeTag,
+                hdr.solutionId,
+            )
+            if hdr.eaf:
+                key += (hdr.encryptionSeq,)
+            else:  # no encryptionSeq to distinguish messages in same epoch
+                key += (hdr.nData, hdr.crc)
+        else:
+            key = bytes(raw_data)
+
+        # discard keys whose window has expired
+        seen = self._seen
+        while seen:
+            oldest = next(iter(seen.values()))
+            if arrival - oldest[0] <= self._window:
+                break
+            seen.popitem(last=False)
+
+        first = seen.get(key)
+        if first is not None:  # duplicate
+            latency = arrival - first[0]
+            stats["duplicates"] += 1
+            stats["latency"] += latency
+            stats["maxlatency"] = max(stats["maxlatency"], latency)
+            if source not in first[1]:
+                first[1].add(source)
+                stats["distinct"] += 1
+            return []
+        seen[key] = (arrival, {source})
+        stats["first"] += 1
+        stats["distinct"] += 1
+        self._unique += 1
+        if not self._reorder:
+            return [message]
+
+        if hdr.timeTagtype:
+            timetag = self._basedate = hdr.gnssTimeTag
+        else:
+            timetag = convert_timetag(hdr.gnssTimeTag, timetag2date(self._basedate))
+        timetag = timetag2utc(timetag, hdr.msgType, hdr.msgSubtype)
+        heappush(self._buffer, (timetag, self._seq, message))
+        self._seq += 1
+        messages = []
+        while len(self._buffer) > self._reorder:
+            messages.append(heappop(self._buffer)[2])
+        return messages
+
+    def flush(self) -> list:
+        """
+        Return all messages held in the reorder buffer.
+
+        :return: list of tuples of (source_id, raw_data, parsed_data)
+        :rtype: list
+        """
+
+        messages = []
+        while self._buffer:
+            messages.append(heappop(self._buffer)[2])
+        return messages
+
+    @property
+    def stats(self) -> dict:
+        """
+        Getter for per-source statistics:
+
+        - received - number of messages received
+        - first - number of unique messages received first from this source
+        - duplicates - number of messages discarded as duplicates
+        - coverage - proportion of all unique messages received from this source
+        - latency - mean delay in seconds of duplicates behind the first arrival
+        - maxlatency - maximum delay in seconds behind the first arrival
+
+        :return: dict of {source_id: dict of statistics}
+        :rtype: dict
+        """
+
+        stats = {}
+        for source, sst in self._stats.items():
+            stats[source] = {
+                "received": sst["received"],
+                "first": sst["first"],
+                "duplicates": sst["duplicates"],
+                "coverage": sst["distinct"] / self._unique if self._unique else 0.0,
+                "latency": (
+                    sst["latency"] / sst["duplicates"] if sst["duplicates"] else 0.0
+                ),
+                "maxlatency": sst["maxlatency"],
+            }
+        return stats
+
+    @property
+    def unique(self) -> int:
+        """
+        Getter for number of unique messages.
+
+        :return: number of unique messages
+        :rtype: int
+        """
+
+        return self._unique
@@ -14,7 +14,6 @@ Created on 10 Feb 2023
 # pylint: disable=invalid-name too-many-instance-attributes, logging-fstring-interpolation
 
 from datetime import datetime, timezone
-from logging import getLogger
 from os import getenv
 
 from pyspartn.exceptions import (
@@ -23,6 +22,7 @@ from pyspartn.exceptions import (
     SPARTNMessageError,
     SPARTNParseError,
 )
+from pyspartn.spartnheader import SPARTNHeader
 from pyspartn.spartnhelpers import (
     HASCRYPTO,
     bitsval,
@@ -75,6 +75,8 @@ class SPARTNMessage:
         key: str = DEFAULTKEY,
         basedate: object = None,
         timetags: dict = None,
+        header: SPARTNHeader = None,
+        zerocopy: bool = False,
     ):
         """
         Constructor.
@@ -82,11 +84,18 @@ class SPARTNMessage:
         :param bytes transport: SPARTN message transport (None)
         :param bool validate: validate CRC (True)
         :param bool decode: decrypt and decode payloads (False)
-        :param str key: decryption key as hexadecimal string (Nominal)
+        :param str key: decryption key as hexadecimal string, or as bytes (Nominal)
         :param object basedate: decryption basedate as datetime or 32-bit gnssTimeTag as
            integer (None). If basedate = TIMEBASE, timetags argument will be used
         :param dict timetags: dict of decryption timetags in format {0: 442626332, 1: 449347321,
             2: 412947745} where key = msgSubtype (0=GPS, 1=GLO, etc) and value = gnssTimeTag (None)
+        :param SPARTNHeader header: transport header already decoded from this
+            transport e.g. by SPARTNReader. If header.crcvalid is True, the CRC
+            is not validated again (None)
+        :param bool zerocopy: keep transport and (unencrypted) payload as memoryview
+            slices of the transport buffer, rather than copying them to bytes; use
+            `serialize()` or `bytes(payload)` to obtain bytes. The buffer must not
+            be modified while the message is in use (False)
         :raises: ParameterError if invalid parameters
         :raises: SPARTNDecryptionError if unable to decrypt message
             using key and basedate/timetags provided
@@ -97,17 +106,20 @@ class SPARTNMessage:
         # object is mutable during initialisation only
         super().__setattr__("_immutable", False)
 
-        self._logger = getLogger(__name__)
-        self._transport = transport
-        if self._transport is None:
+        if transport is None:
             raise SPARTNMessageError("Transport must be provided")
+        if zerocopy and not isinstance(transport, memoryview):
+            transport = memoryview(transport)
+        self._transport = transport
+        self._zerocopy = zerocopy
 
-        self._preamble = bitsval(self._transport, 0, 8)
+        self._preamble = bitsval(self._transport[0:1], 0, 8)
         if self._preamble != SPARTN_PRE:  # not SPARTN
             raise SPARTNParseError(f"Unknown message preamble {self._preamble}")
 
         self._validate = validate
         self._decode = decode
+        self._header = header
         self._padding = 0
         self._timetags = {} if timetags is None else timetags
         self._prnmap = []  # maps group index to satellite PRN
@@ -121,8 +133,11 @@ class SPARTNMessage:
             else:  # datetime
                 self._basedate = naive2aware(basedate)
 
-        key = getenv("MQTTKEY", None) if key is None else key
-        self._key = None if key is None else bytes.fromhex(key)
+        if isinstance(key, bytes):  # already converted from hexadecimal string
+            self._key = key
+        else:
+            key = getenv("MQTTKEY", None) if key is None else key
+            self._key = None if key is None else bytes.fromhex(key)
         self._iv = None
 
         self._do_attributes()
@@ -136,12 +151,10 @@ class SPARTNMessage:
         :raises: SPARTNMessageError, SPARTNDecryptionError
         """
 
-        # start of framestart
-        self.msgType = bitsval(self._transport, 8, 7)
-        self.nData = bitsval(self._transport, 15, 10)
-        self.eaf = bitsval(self._transport, 25, 1)  # 1 = encrypted
-        self.crcType = bitsval(self._transport, 26, 2)
-        self.frameCrc = bitsval(self._transport, 28, 4)
+        if self._header is None:
+            payload = self._do_transport()
+        else:
+            payload = self._do_header()
 
         # check if decryption available
         if self._decode and self.eaf:
@@ -152,6 +165,68 @@ class SPARTNMessage:
                     "Decryption not available - cryptography library is not installed"
                 )
 
+        offset = 0  # payload offset in bits
+        index = []  # array of (nested) group indices
+
+        # decrypt payload if encrypted
+        if self.eaf and self._decode:
+            iv = self._get_iv()
+            self._payload = decrypt(payload, self._key, iv)
+        else:
+            self._payload = payload
+
+        anam = ""
+        try:
+            if self._decode:
+                self._paylenb = len(self._payload) * 8  # payload length in bits
+                self._payloadi = int.from_bytes(self._payload, "big")  # payload as int
+                pdict = (
+                    self._get_dict()
+                )  # get payload definition dict for this message identity
+                if pdict is None:  # unknown (or not yet implemented) message identity
+                    self._do_unknown()
+                    return
+                for anam in pdict:  # process each attribute in dict
+                    offset, index = self._set_attribute(anam, pdict, offset, index)
+                self._padding = self.nData * 8 - offset  # byte alignment padding
+                if not 0 <= self._padding <= 8:
+                    if self.eaf:
+                        raise SPARTNDecryptionError()
+                    raise SPARTNParseError()
+
+        except Exception as err:
+            if self.eaf:
+                raise SPARTNDecryptionError(
+                    (
+                        f"Message type {self.identity} timetag {self.gnssTimeTag} not "
+                        "successfully decrypted - check key and basedate"
+                    )
+                ) from err
+            raise SPARTNParseError(
+                (
+                    f"Message type {self.identity} timetag {self.gnssTimeTag} not "
+                    "successfully parsed - check definition"
+                )
+            ) from err
+
+    def _do_transport(self) -> bytes:
+        """
+        Populate transport layer attributes by decoding transport
+        and validate CRC.
+
+        :return: payload
+        :rtype: bytes
+        :raises: SPARTNMessageError if CRC invalid
+        """
+        # pylint: disable=attribute-defined-outside-init
+
+        # start of framestart
+        self.msgType = bitsval(self._transport, 8, 7)
+        self.nData = bitsval(self._transport, 15, 10)
+        self.eaf = bitsval(self._transport, 25, 1)  # 1 = encrypted
+        self.crcType = bitsval(self._transport, 26, 2)
+        self.frameCrc = bitsval(self._transport, 28, 4)
+
         # start of payDesc
         self.msgSubtype = bitsval(self._transport, 32, 4)
         self.timeTagtype = bitsval(self._transport, 36, 1)
@@ -179,7 +254,7 @@ class SPARTNMessage:
                 if self.embAuthLen == 0:
                     aln = 64
                 elif self.embAuthLen == 1:
-                    aln = 94
+                    aln = 96
                 elif self.embAuthLen == 2:
                     aln = 128
                 elif self.embAuthLen == 3:
@@ -198,49 +273,46 @@ class SPARTNMessage:
             if not valid_crc(core, self.crc, self.crcType):
                 raise SPARTNMessageError(f"Invalid CRC {self.crc}")
 
-        offset = 0  # payload offset in bits
-        index = []  # array of (nested) group indices
+        return payload
 
-        # decrypt payload if encrypted
-        if self.eaf and self._decode:
-            iv = self._get_iv()
-            self._payload = decrypt(payload, self._key, iv)
-        else:
-            self._payload = payload
+    def _do_header(self) -> bytes:
+        """
+        Populate transport layer attributes from header already decoded
+        by SPARTNReader, and validate CRC unless already validated.
 
-        anam = ""
-        try:
-            if self._decode:
-                self._paylenb = len(self._payload) * 8  # payload length in bits
-                self._payloadi = int.from_bytes(self._payload, "big")  # payload as int
-                pdict = (
-                    self._get_dict()
-                )  # get payload definition dict for this message identity
-                if pdict is None:  # unknown (or not yet implemented) message identity
-                    self._do_unknown()
-                    return
-                for anam in pdict:  # process each attribute in dict
-                    offset, index = self._set_attribute(anam, pdict, offset, index)
-                self._padding = self.nData * 8 - offset  # byte alignment padding
-                if not 0 <= self._padding <= 8:
-                    if self.eaf:
-                        raise SPARTNDecryptionError()
-                    raise SPARTNParseError()
+        :return: payload
+        :rtype: bytes
+        :raises: SPARTNMessageError if CRC invalid
+        """
+        # pylint: disable=attribute-defined-outside-init
+
+        hdr = self._header
+        self.msgType = hdr.msgType
+        self.nData = hdr.nData
+        self.eaf = hdr.eaf
+        self.crcType = hdr.crcType
+        self.frameCrc = hdr.frameCrc
+        self.msgSubtype = hdr.msgSubtype
+        self.timeTagtype = hdr.timeTagtype
+        self.gnssTimeTag = hdr.gnssTimeTag
+        self.solutionId = hdr.solutionId
+        self.solutionProcId = hdr.solutionProcId
+        if self.eaf:  # encrypted payload
+            self.encryptionId = hdr.encryptionId
+            self.encryptionSeq = hdr.encryptionSeq
+            self.authInd = hdr.authInd
+            self.embAuthLen = hdr.embAuthLen
+            if hdr.embAuth is not None:
+                self.embAuth = hdr.embAuth
+        self.crc = hdr.crc
 
-        except Exception as err:
-            if self.eaf:
-                raise SPARTNDecryptionError(
-                    (
-                        f"Message type {self.identity} timetag {self.gnssTimeTag} not "
-                        "successfully decrypted - check key and basedate"
-                    )
-                ) from err
-            raise SPARTNParseError(
-                (
-                    f"Message type {self.identity} timetag {self.gnssTimeTag} not "
-                    "successfully parsed - check definition"
-                )
-            ) from err
+        # validate CRC
+        if self._validate & VALCRC and not hdr.crcvalid:
+            core = self._transport[1 : hdr.length - self.crcType - 1]
+            if not valid_crc(core, self.crc, self.crcType):
+                raise SPARTNMessageError(f"Invalid CRC {self.crc}")
+
+        return self._transport[hdr.paystart : hdr.paystart + self.nData]
 
     def _get_iv(self) -> bytes:
         """
@@ -584,7 +656,21 @@ class SPARTNMessage:
         :rtype: str
         """
 
-        return f"SPARTNMessage(transport={self._transport})"
+        return f"SPARTNMessage(transport={bytes(self._transport)})"
+
+    def __getstate__(self) -> dict:
+        """
+        Get state for pickling, converting any memoryview slices to bytes.
+
+        :return: object state
+        :rtype: dict
+        """
+
+        state = self.__dict__.copy()
+        for att in ("_transport", "_payload"):
+            if isinstance(state.get(att), memoryview):
+                state[att] = bytes(state[att])
+        return state
 
     def __setattr__(self, name, value):
         """
@@ -610,7 +696,7 @@ class SPARTNMessage:
         :rtype: bytes
         """
 
-        return self._transport
+        return bytes(self._transport)
 
     @property
     def identity(self) -> str:
@@ -626,10 +712,13 @@ class SPARTNMessage:
     @property
     def payload(self) -> bytes:
         """
-        Return payload.
+        Return payload. If zerocopy is True, an unencrypted (or undecrypted)
+        payload is returned as a memoryview slice of the transport buffer.
 
         :return: payload
         :rtype: bytes
         """
 
-        return self._payload
+        if self._zerocopy:
+            return self._payload
+        return bytes(self._payload)
@@ -0,0 +1,190 @@
+"""
+SPARTNMultiplexer class.
+
+Reads SPARTN messages from many sockets (e.g. NTRIP mountpoints for
+different regions or providers, or a local TCP bridge for L-Band data)
+in a single thread, using the stdlib `selectors` module.
+
+Each socket is set to non-blocking and has its own SPARTNParser, and
+hence its own framing buffer, 32-bit timetags and statistics. Messages
+are returned as (stream_id, raw_data, parsed_data) tuples.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from selectors import EVENT_READ, DefaultSelector
+from socket import socket
+
+from pyspartn.exceptions import ParameterError
+from pyspartn.spartnparser import SPARTNParser
+from pyspartn.spartnreader import SPARTN_ERRORS
+
+
+class SPARTNMultiplexer:
+    """
+    SPARTNMultiplexer class.
+    """
+
+    def __init__(self, bufsize: int = 65536, **kwargs):
+        """
+        Constructor.
+
+        :param int bufsize: maximum size of each socket receive (65536)
+        :param kwargs: default SPARTNParser keyword arguments (validate, quitonerror,
+            decode, key, basedate, errorhandler, resync, statshandler, include,
+            exclude, filterraw, demux, passthrough, headeronly, zerocopy) for each
+            stream
+        """
+
+        self._bufsize = bufsize
+        self._kwargs = kwargs
+        self._selector = DefaultSelector()
+        self._parsers = {}
+        self._sockets = {}
+        self._pending = None  # error to raise on next read
+
+    def __enter__(self):
+        """
+        Context manager enter routine.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Context manager exit routine.
+        """
+
+        self.close()
+
+    def __iter__(self):
+        """
+        Iterator - yields messages until all streams have been closed.
+
+        :return: generator of tuples of (stream_id, raw_data as bytes,
+            parsed_data as SPARTNMessage)
+        :rtype: generator
+        """
+
+        while self._parsers:
+            yield from self.read()
+
+    def __getitem__(self, stream_id: object) -> SPARTNParser:
+        """
+        Get the parser for a stream, e.g. to access its `timetags`
+        or `stats` properties.
+
+        :param object stream_id: stream identifier
+        :return: parser for stream
+        :rtype: SPARTNParser
+        :raises: KeyError if unknown stream
+        """
+
+        return self._parsers[stream_id]
+
+    def add(self, stream_id: object, sock: socket, **kwargs):
+        """
+        Add socket to multiplexer.
+
+        :param object stream_id: unique hashable stream identifier e.g. "EU"
+        :param socket sock: connected socket, which will be set to non-blocking
+        :param kwargs: SPARTNParser keyword arguments for this stream, overriding
+            the multiplexer defaults (e.g. key, timetags)
+        :raises: ParameterError if stream_id already in use
+        """
+
+        if stream_id in self._parsers:
+            raise ParameterError(f"Stream {stream_id} already added")
+        kwargs = {**self._kwargs, **kwargs}
+        if kwargs.get("timetags") is not None:  # each stream has its own timetags
+            kwargs["timetags"] = dict(kwargs["timetags"])
+        sock.setblocking(False)
+        self._parsers[stream_id] = SPARTNParser(**kwargs)
+        self._sockets[stream_id] = sock
+        self._selector.register(sock, EVENT_READ, stream_id)
+
+    def remove(self, stream_id: object) -> socket:
+        """
+        Remove stream from multiplexer, discarding any incomplete frame.
+        The socket is not closed.
+
+        :param object stream_id: stream identifier
+        :return: socket
+        :rtype: socket
+        :raises: KeyError if unknown stream
+        """
+
+        sock = self._sockets.pop(stream_id)
+        del self._parsers[stream_id]
+        self._selector.unregister(sock)
+        return sock
+
+    def read(self, timeout: float = None) -> list:
+        """
+        Wait until at least one socket has data (or timeout), receive it,
+        and return any SPARTN messages completed.
+
+        A stream whose socket is closed by the peer, or fails, is removed
+        and its socket closed. If quitonerror = 2 and a stream raises an
+        error after messages have been received from other streams, those
+        messages are returned and the error is raised on the next read.
+
+        :param float timeout: maximum wait in seconds (None = indefinite)
+        :return: list of tuples of (stream_id, raw_data as bytes,
+            parsed_data as SPARTNMessage), which may be empty
+        :rtype: list
+        :raises: SPARTN***Error if error during parsing and quitonerror = 2
+        """
+
+        if self._pending is not None:  # error deferred from previous read
+            err, self._pending = self._pending, None
+            raise err
+        messages = []
+        if not self._parsers:
+            return messages
+        for key, _ in self._selector.select(timeout):
+            stream_id = key.data
+            try:
+                data = key.fileobj.recv(self._bufsize)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                data = b""
+            if not data:  # socket closed
+                self.remove(stream_id).close()
+                continue
+            try:
+                parsed = self._parsers[stream_id].feed(data)
+            except SPARTN_ERRORS as err:
+                if not messages:
+                    raise
+                self._pending = err  # return messages, raise on next read
+                break
+            messages += [
+                (stream_id, raw_data, parsed_data) for raw_data, parsed_data in parsed
+            ]
+        return messages
+
+    def close(self):
+        """
+        Close all sockets and the selector.
+        """
+
+        for stream_id in self.streams:
+            self.remove(stream_id).close()
+        self._selector.close()
+
+    @property
+    def streams(self) -> list:
+        """
+        Getter for active stream identifiers.
+
+        :return: list of stream identifiers
+        :rtype: list
+        """
+
+        return list(self._parsers)
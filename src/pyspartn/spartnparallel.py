@@ -0,0 +1,146 @@
+"""
+SPARTNReader parallel parsing.
+
+Mixin class providing `SPARTNReader.iter_parallel()`, which frames
+SPARTN messages from the stream in the calling process, but parses them
+in a pool of worker processes.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=too-few-public-methods
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+
+from pyspartn.exceptions import SPARTN_ERRORS
+from pyspartn.spartnheader import SPARTNHeader
+from pyspartn.spartnmessage import SPARTNMessage
+
+
+class ParallelReadMixin:
+    """
+    SPARTNReader parallel parsing mixin class.
+    """
+
+    def iter_parallel(self, workers: int = None, chunkframes: int = 256):
+        """
+        Generator which frames SPARTN messages from the stream in this process,
+        but parses (and decrypts and decodes, if `decode` is True) them in a
+        pool of worker processes, yielding results in stream order.
+
+        Messages are sent to the workers in chunks of `chunkframes` frames.
+        The accumulated 32-bit timetags are sent with each frame, so decryption
+        with `basedate=TIMEBASE` gives the same results as sequential reading.
+
+        Errors are handled according to the `quitonerror` setting, in
+        stream order. Raw data is always yielded as bytes.
+
+        :param int workers: number of worker processes (None = number of CPUs)
+        :param int chunkframes: number of frames sent to a worker at a time (256)
+        :return: generator of tuple (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: generator
+        :raises: SPARTN***Error if error during parsing and quitonerror = 2
+        """
+
+        if self._headeronly:  # nothing to parse in worker processes
+            for raw_data, parsed_data in self:
+                yield (bytes(raw_data), parsed_data)
+            return
+        workers = workers or cpu_count() or 1
+        maxpending = 2 * workers  # chunks in progress
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            eof = False
+            while not eof:
+                items = []  # frames and framing errors in stream order
+                frames = []
+                timetags = None
+                while len(frames) < chunkframes:
+                    try:
+                        raw_data, crcvalid = self._read_frame()
+                    except EOFError:
+                        self._end_resync()
+                        eof = True
+                        break
+                    except SPARTN_ERRORS as err:
+                        items.append((None, err))
+                        continue
+                    raw_data = bytes(raw_data)
+                    if crcvalid is None or (
+                        self._filtering and self._filtered(raw_data)
+                    ):
+                        if crcvalid is None or self._filterraw:
+                            items.append((raw_data, None))
+                        continue
+                    # share timetags between frames until they change
+                    if timetags != self._timetags:
+                        timetags = dict(self._timetags)
+                    items.append((raw_data, len(frames)))
+                    frames.append((raw_data, crcvalid, timetags))
+                pending.append(
+                    (
+                        items,
+                        pool.submit(
+                            _parse_chunk,
+                            frames,
+                            self._validate,
+                            self._decode,
+                            self._key,
+                            self._basedate,
+                        ),
+                    )
+                )
+                while pending and (eof or len(pending) >= maxpending):
+                    items, future = pending.popleft()
+                    results = future.result()
+                    for raw_data, res in items:
+                        if raw_data is not None:
+                            if res is None:  # filtered out
+                                yield (raw_data, None)
+                                continue
+                            res = results[res]
+                            if not isinstance(res, Exception):
+                                yield (raw_data, res)
+                                continue
+                        if self._quitonerror:
+                            self._do_error(res)
+
+
+def _parse_chunk(
+    frames: list, validate: int, decode: bool, key: str, basedate: object
+) -> list:
+    """
+    Parse chunk of framed SPARTN messages in a worker process.
+
+    :param list frames: list of tuples of (raw_data, crcvalid, timetags)
+    :param int validate: validation flags
+    :param bool decode: decode payload True/False
+    :param str key: decryption key
+    :param object basedate: basedate as datetime or 32-bit gnssTimeTag as integer
+    :return: list of parsed SPARTNMessage, or error, for each frame
+    :rtype: list
+    """
+
+    results = []
+    for raw_data, crcvalid, timetags in frames:
+        try:
+            results.append(
+                SPARTNMessage(
+                    transport=raw_data,
+                    validate=validate,
+                    decode=decode,
+                    key=key,
+                    basedate=basedate,
+                    timetags=timetags,
+                    header=SPARTNHeader(raw_data, crcvalid),
+                )
+            )
+        except SPARTN_ERRORS as err:
+            results.append(err)
+    return results
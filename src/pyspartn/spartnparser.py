@@ -0,0 +1,229 @@
+"""
+SPARTNParser class.
+
+Push-style (incremental) SPARTN parser for callback-driven transports
+such as MQTT, which deliver data as a series of byte chunks rather
+than a readable stream.
+
+Each call to `feed(data)` returns any SPARTN messages completed by
+the new data. Incomplete frames and accumulated 32-bit timetags are
+retained between calls.
+
+It uses the same framing, validation, error handling and decryption
+logic as SPARTNReader.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from sys import maxsize
+
+from pyspartn.spartnreader import SPARTN_ERRORS, SPARTNReader, _NeedData
+from pyspartn.spartntypes_core import ERRLOG, ERRRAISE, VALCRC
+
+
+class SPARTNParser(SPARTNReader):
+    """
+    SPARTNParser class.
+    """
+
+    def __init__(
+        self,
+        validate: int = VALCRC,
+        quitonerror: int = ERRLOG,
+        decode: bool = False,
+        key: str = None,
+        basedate: object = None,
+        errorhandler: object = None,
+        timetags: dict = None,
+        resync: bool = False,
+        statshandler: object = None,
+        include: object = None,
+        exclude: object = None,
+        filterraw: bool = False,
+        demux: bool = False,
+        passthrough: bool = False,
+        headeronly: bool = False,
+        zerocopy: bool = False,
+    ):
+        """Constructor.
+
+        :param int validate: VALCRC (1) = validate frameCrc and CRC, VALMSGID (2) = validate
+            msgType and msgSubtype, VALNONE (0) = no validation (1)
+        :param int quitonerror: ERROR_IGNORE (0) = ignore,  ERROR_LOG (1) = log and continue,
+            ERROR_RAISE (2) = (re)raise (1)
+        :param bool decode: decrypt and decode payload (False)
+        :param str key: decryption key as hexadecimal string (None)
+        :param object basedate: decryption basedate as datetime or 32-bit gnssTimeTag as
+           integer (None). If basedate = TIMEBASE, SPARTNMessage will use timetags argument
+        :param int errorhandler: error handling object or function (None)
+        :param dict timetags: dict of decryption timetags in format {0: 442626332, 1: 449347321,
+            2: 412947745} where key = msgSubtype (0=GPS, 1=GLO, etc) and value = gnssTimeTag (None)
+        :param bool resync: skip non-SPARTN data and frames failing validation
+            silently, recording them in `stats` (False)
+        :param object statshandler: function called with a copy of `stats` at the
+            end of each resynchronisation event (None)
+        :param object include: collection of message identities (e.g. "SPARTN-1X-OCB-GPS")
+            and/or (msgType, msgSubtype) tuples to be parsed; all others are filtered out (None)
+        :param object exclude: collection of message identities and/or (msgType, msgSubtype)
+            tuples to be filtered out (None)
+        :param bool filterraw: return filtered-out messages as (raw_data, None) rather than
+            skipping them (False)
+        :param bool demux: recognise UBX, RTCM3 and NMEA frames in a mixed stream and
+            skip them by their declared length, rather than as unknown data (False)
+        :param bool passthrough: in demux mode, return UBX, RTCM3 and NMEA frames as
+            (raw_data, None) rather than skipping them (False)
+        :param bool headeronly: return each SPARTN message as (raw_data, SPARTNHeader),
+            without building a SPARTNMessage or copying the payload (False)
+        :param bool zerocopy: return raw_data, and SPARTNMessage transport and payload,
+            as memoryview slices of the framing buffer rather than copying them to
+            bytes (False)
+        """
+        # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+
+        super().__init__(
+            None,
+            validate=validate,
+            quitonerror=quitonerror,
+            decode=decode,
+            key=key,
+            basedate=basedate,
+            errorhandler=errorhandler,
+            timetags=timetags,
+            chunksize=0,
+            resync=resync,
+            statshandler=statshandler,
+            include=include,
+            exclude=exclude,
+            filterraw=filterraw,
+            demux=demux,
+            passthrough=passthrough,
+            headeronly=headeronly,
+            zerocopy=zerocopy,
+        )
+
+    def __next__(self):
+        """
+        Iteration is not supported - use feed().
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use feed() to parse data with SPARTNParser")
+
+    def read(self) -> tuple:
+        """
+        Reads are not supported - use feed().
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use feed() to parse data with SPARTNParser")
+
+    def read_many(self, n: int) -> list:
+        """
+        Batched reads are not supported - use feed(), which returns
+        all messages completed by the data fed.
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use feed() to parse data with SPARTNParser")
+
+    def iter_batches(self, size: int = 256):
+        """
+        Batched reads are not supported - use feed().
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use feed() to parse data with SPARTNParser")
+
+    def iter_threaded(
+        self, queuesize: int = 1024, dropoldest: bool = False, jointimeout: float = None
+    ):
+        """
+        Threaded reads are not supported - use feed().
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use feed() to parse data with SPARTNParser")
+
+    def iter_parallel(self, workers: int = None, chunkframes: int = 256):
+        """
+        Parallel reads are not supported - use feed().
+
+        :raises: TypeError
+        """
+
+        raise TypeError("Use feed() to parse data with SPARTNParser")
+
+    def feed(self, data: bytes) -> list:
+        """
+        Add data to the framing buffer and parse any complete SPARTN
+        messages, retaining any incomplete frame for the next call.
+
+        The 'quitonerror' flag determines whether to raise, log or ignore
+        parsing errors. If quitonerror = 2 and an error follows messages
+        completed in this call, those messages are returned and the error
+        is raised on the next call, after its data has been buffered.
+        Call `feed(b"")` to continue parsing data already buffered.
+
+        :param bytes data: data received from transport
+        :return: list of tuples of (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: list
+        :raises: SPARTN***Error if error during parsing and quitonerror = 2
+        """
+
+        if data:
+            self._buffer = self._buffer[self._pos :] + bytes(data)
+            self._pos = 0
+            if self._zerocopy:
+                self._view = memoryview(self._buffer)
+        if self._pending is not None:  # error deferred from previous call
+            err, self._pending = self._pending, None
+            self._do_error(err)
+        messages = []
+        while True:
+            try:
+                self._read_batch(maxsize, messages)
+            except _NeedData:
+                return messages
+            except SPARTN_ERRORS as err:
+                if self._quitonerror == ERRRAISE and messages:
+                    self._pending = err  # return messages, raise on next call
+                    return messages
+                if self._quitonerror:
+                    self._do_error(err)
+
+    def _fill(self, size: int) -> bool:
+        """
+        Check framing buffer holds at least the specified number of bytes
+        from the current buffer position. If not, signal to `feed()` that
+        the frame is incomplete. The buffer position is left at the start
+        of the incomplete frame.
+
+        :param int size: number of bytes required
+        :return: True if size bytes available
+        :rtype: bool
+        :raises: _NeedData if more data required
+        """
+
+        if len(self._buffer) - self._pos >= size:
+            return True
+        raise _NeedData()
+
+    @property
+    def buffered(self) -> int:
+        """
+        Getter for number of bytes held in framing buffer awaiting more data.
+
+        :return: number of bytes
+        :rtype: int
+        """
+
+        return len(self._buffer) - self._pos
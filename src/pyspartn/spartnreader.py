@@ -45,24 +45,55 @@ Created on 10 Feb 2023
 
 from logging import getLogger
 from os import getenv
+from re import compile as recompile
 from socket import socket
 
+from pyspartn.compressed_wrapper import CompressedWrapper, compression
 from pyspartn.exceptions import (
+    SPARTN_ERRORS,
     ParameterError,
-    SPARTNDecryptionError,
-    SPARTNMessageError,
     SPARTNParseError,
     SPARTNStreamError,
-    SPARTNTypeError,
 )
 from pyspartn.socket_wrapper import SocketWrapper
-from pyspartn.spartnhelpers import bitsval, valid_crc
+from pyspartn.spartnbatch import BatchParseMixin
+from pyspartn.spartnheader import SPARTNHeader
+from pyspartn.spartnhelpers import (
+    frame_crc,
+    timetag2date,
+    ubx_checksum,
+    valid_crc,
+)
 from pyspartn.spartnmessage import SPARTNMessage
+from pyspartn.spartnparallel import ParallelReadMixin
 from pyspartn.spartntables import ALN_ENUM
-from pyspartn.spartntypes_core import ERRLOG, ERRRAISE, SPARTN_PREB, VALCRC
+from pyspartn.spartnthreaded import ThreadedReadMixin
+from pyspartn.spartntypes_core import (
+    ERRLOG,
+    ERRRAISE,
+    NMEA_MAXLEN,
+    NMEA_PRE,
+    RTCM3_PRE,
+    SPARTN_MSGIDS,
+    SPARTN_PRE,
+    SPARTN_PREB,
+    UBX_HDR,
+    VALCRC,
+    VALMSGID,
+)
+
+# SPARTN preamble or start of frame recognised in demux mode
+DEMUX_PRE = recompile(b"[s\xb5\xd3$]")
+
+
+class _NeedData(Exception):
+    """
+    Raised internally by non-blocking readers when the framing buffer
+    holds only part of a frame.
+    """
 
 
-class SPARTNReader:
+class SPARTNReader(ParallelReadMixin, ThreadedReadMixin, BatchParseMixin):
     """
     SPARTNReader class.
     """
@@ -78,11 +109,26 @@ class SPARTNReader:
         bufsize: int = 4096,
         errorhandler: object = None,
         timetags: dict = None,
+        chunksize: int = 262144,
+        resync: bool = False,
+        statshandler: object = None,
+        include: object = None,
+        exclude: object = None,
+        filterraw: bool = False,
+        demux: bool = False,
+        passthrough: bool = False,
+        headeronly: bool = False,
+        raisetimeout: bool = False,
+        reconnect: object = None,
+        zerocopy: bool = False,
     ):
         """Constructor.
 
-        :param datastream stream: input data stream
-        :param int validate: VALCRC (1) = validate CRC, VALNONE (1) = ignore invalid CRC (1)
+        :param datastream stream: input data stream. A seekable buffered binary file
+            (e.g. from `open(filename, "rb")`) is decompressed if gzip, bz2 or xz
+            compressed. Other streams (e.g. pipes) are read unchanged
+        :param int validate: VALCRC (1) = validate frameCrc and CRC, VALMSGID (2) = validate
+            msgType and msgSubtype, VALNONE (0) = no validation (1)
         :param int quitonerror: ERROR_IGNORE (0) = ignore,  ERROR_LOG (1) = log and continue,
             ERROR_RAISE (2) = (re)raise (1)
         :param bool decode: decrypt and decode payload (False)
@@ -93,6 +139,35 @@ class SPARTNReader:
         :param int errorhandler: error handling object or function (None)
         :param dict timetags: dict of decryption timetags in format {0: 442626332, 1: 449347321,
             2: 412947745} where key = msgSubtype (0=GPS, 1=GLO, etc) and value = gnssTimeTag (None)
+        :param int chunksize: maximum size of each read from streams which support
+            read1(), 0 = read only the bytes required for each frame field (262144)
+        :param bool resync: skip non-SPARTN data and frames failing validation
+            silently, recording them in `stats` rather than raising or reporting
+            an error for each discarded byte or frame (False)
+        :param object statshandler: function called with a copy of `stats` at the
+            end of each resynchronisation event, i.e. once per contiguous run of
+            discarded data rather than once per discarded byte (None)
+        :param object include: collection of message identities (e.g. "SPARTN-1X-OCB-GPS")
+            and/or (msgType, msgSubtype) tuples to be parsed; all others are filtered out (None)
+        :param object exclude: collection of message identities and/or (msgType, msgSubtype)
+            tuples to be filtered out (None)
+        :param bool filterraw: return filtered-out messages as (raw_data, None) rather than
+            skipping them (False)
+        :param bool demux: recognise UBX, RTCM3 and NMEA frames in a mixed stream and
+            skip them by their declared length, rather than as unknown data (False)
+        :param bool passthrough: in demux mode, return UBX, RTCM3 and NMEA frames as
+            (raw_data, None) rather than skipping them (False)
+        :param bool headeronly: return each SPARTN message as (raw_data, SPARTNHeader),
+            without building a SPARTNMessage or copying the payload (False)
+        :param bool raisetimeout: raise TimeoutError if a socket stream times out
+            with no data, rather than treating it as end of stream. The framing
+            buffer and timetags are retained, so reading can be resumed (False)
+        :param object reconnect: function called with no arguments if a socket
+            stream is closed by the peer or fails, returning a new connected socket
+            from which to continue reading, or None to end the stream (None)
+        :param bool zerocopy: return raw_data, and SPARTNMessage transport and payload,
+            as memoryview slices of the framing buffer rather than copying them to
+            bytes (False)
         :raises: ParameterError if invalid parameters
         :raises: SPARTNDecryptionError if unable to decrypt message
             using key and basedate/timetags provided
@@ -102,7 +177,14 @@ class SPARTNReader:
 
         self._logger = getLogger(__name__)
         if isinstance(datastream, socket):
-            self._stream = SocketWrapper(datastream, bufsize=bufsize)
+            self._stream = SocketWrapper(
+                datastream,
+                bufsize=bufsize,
+                raisetimeout=raisetimeout,
+                reconnect=reconnect,
+            )
+        elif self._compressed(datastream):
+            self._stream = CompressedWrapper(datastream)
         else:
             self._stream = datastream
         self.key = getenv("MQTTKEY", None) if key is None else key
@@ -114,10 +196,60 @@ class SPARTNReader:
         self._basedate = basedate
         # accumlated array of 32-bit gnssTimeTag from datastream
         self._timetags = {} if timetags is None else timetags
+        # framing buffer and current position within it
+        self._buffer = b""
+        self._pos = 0
+        self._chunksize = chunksize
+        self._read1 = getattr(self._stream, "read1", None) if chunksize else None
+        # memoryview of framing buffer, if frames are returned as zero-copy views
+        self._view = None
+        self._zerocopy = zerocopy
+        self._resync = resync
+        self._statshandler = statshandler
+        self._stats = {
+            "frames": 0,
+            "discarded": 0,
+            "resyncs": 0,
+            "headerfailures": 0,
+            "crcfailures": 0,
+            "recovered": 0,
+            "demuxed": 0,
+        }
+        self._queuestats = {"highwater": 0, "dropped": 0}
+        self._skipped = 0  # bytes discarded in current resync event
+        self._rescan = 0  # value of _skipped at end of rejected frame(s)
+        self._include = None if include is None else self._msgids(include)
+        self._exclude = None if exclude is None else self._msgids(exclude)
+        self._filterraw = filterraw
+        self._filtering = include is not None or exclude is not None
+        self._demux = demux
+        self._passthrough = passthrough
+        self._headeronly = headeronly
+        self._idle = False  # last batch ended by socket timeout
+        self._pending = None  # error to raise at start of next batch
 
         # if self._decode and self._key is None:
         #     raise ParameterError("Key must be provided if decoding is enabled")
 
+    @staticmethod
+    def _compressed(datastream: object) -> bool:
+        """
+        Check if stream is a compressed file. Only seekable buffered files
+        are checked, as peeking into a live stream (e.g. a pipe or socket
+        file) would block until data arrives.
+
+        :param object datastream: input data stream
+        :return: True if compressed
+        :rtype: bool
+        """
+
+        if not hasattr(datastream, "peek"):
+            return False
+        seekable = getattr(datastream, "seekable", None)
+        if seekable is None or not seekable():
+            return False
+        return compression(datastream.peek(6)[:6]) is not None
+
     def __iter__(self):
         """Iterator."""
 
@@ -149,92 +281,165 @@ class SPARTNReader:
         :return: tuple of (raw_data as bytes, parsed_data as SPARTNMessage)
         :rtype: tuple
         :raises: SPARTN***Error if error during parsing
+        :raises: TimeoutError if socket stream idle and raisetimeout = True
         """
 
-        parsing = True
-        raw_data = parsed_data = None
-
-        while parsing:  # loop until end of valid message or EOF
+        while True:  # loop until end of valid message or EOF
             try:
-                raw_data = None
-                parsed_data = None
-                byte1 = self._read_bytes(1)  # read the first byte
-                # if not SPARTN, discard and continue
-                if byte1 != SPARTN_PREB:
-                    raise SPARTNParseError(f"Unknown protocol {byte1}")
-                raw_data, parsed_data = self._parse_spartn(byte1)
-                parsing = False
+                return self._parse_spartn()
 
             except EOFError:
+                self._end_resync()
                 return (None, None)
-            except (
-                SPARTNParseError,
-                SPARTNMessageError,
-                SPARTNTypeError,
-                SPARTNStreamError,
-                SPARTNDecryptionError,
-            ) as err:
+            except SPARTN_ERRORS as err:
                 if self._quitonerror:
                     self._do_error(err)
                 continue
 
-        return (raw_data, parsed_data)
+    def read_many(self, n: int) -> list:
+        """
+        Read up to n SPARTN messages from the stream buffer and return
+        a list of raw and parsed data. Fewer than n messages are returned
+        only if the stream ends or, if raisetimeout = True, a socket stream
+        times out after at least one message has been read.
+
+        The 'quitonerror' flag determines whether to raise, log or ignore
+        parsing errors. If quitonerror = 2 and messages have already been
+        read into the batch, the partial batch is returned and the error
+        is raised on the next call.
+
+        :param int n: maximum number of messages to read
+        :return: list of tuples of (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: list
+        :raises: SPARTN***Error if error during parsing
+        :raises: TimeoutError if socket stream idle before any message is read
+            and raisetimeout = True
+        """
+
+        if self._pending is not None:  # error deferred from previous batch
+            err, self._pending = self._pending, None
+            self._do_error(err)
+        messages = []
+        self._idle = False
+        while len(messages) < n:
+            try:
+                self._read_batch(n, messages)
+            except TimeoutError:
+                if not messages:
+                    raise
+                self._idle = True  # return partial batch without waiting
+                break
+            except EOFError:
+                self._end_resync()
+                break
+            except SPARTN_ERRORS as err:
+                if self._quitonerror == ERRRAISE and messages:
+                    self._pending = err  # return partial batch, raise on next read
+                    break
+                if self._quitonerror:
+                    self._do_error(err)
+        return messages
+
+    def iter_batches(self, size: int = 256):
+        """
+        Generator which yields lists of up to `size` SPARTN messages
+        from the stream, as returned by `read_many()`. If a socket stream
+        times out with raisetimeout = True, any partial batch is yielded
+        immediately and the TimeoutError is raised on the next read.
+        Likewise, if quitonerror = 2, messages read before an error are
+        yielded before the error is raised.
+
+        :param int size: number of messages in each batch (256)
+        :return: generator of lists of tuples of (raw_data as bytes,
+            parsed_data as SPARTNMessage)
+        :rtype: generator
+        :raises: SPARTN***Error if error during parsing
+        """
+
+        while True:
+            messages = self.read_many(size)
+            if messages:
+                yield messages
+            if len(messages) < size and not self._idle and self._pending is None:
+                return  # end of stream
 
-    def _parse_spartn(self, preamble: bytes) -> tuple:
+    def _read_batch(self, n: int, messages: list):
+        """
+        Frame and parse SPARTN messages, appending them to a list until
+        it holds n messages. Reader state is bound to local variables, and
+        the key and basedate converted, once per batch rather than for
+        every message.
+
+        :param int n: required number of messages in list
+        :param list messages: list of tuples of (raw_data, parsed_data)
+        :raises: EOFError if stream ends
+        :raises: SPARTN...Error if CRC invalid or other parsing error
         """
-        Parse any SPARTN data in the stream. The structure of the transport layer
-        depends on encryption type, GNSS timetag format and CRC format.
 
-        :param preamble hdr: preamble of SPARTN message
+        append = messages.append
+        read_frame = self._read_frame
+        filtered = self._filtered if self._filtering else None
+        filterraw = self._filterraw
+        headeronly = self._headeronly
+        validate = self._validate
+        decode = self._decode
+        key = getenv("MQTTKEY", None) if self._key is None else self._key
+        if key is not None:
+            key = bytes.fromhex(key)
+        basedate = self._basedate
+        if isinstance(basedate, int):
+            basedate = timetag2date(basedate)
+        timetags = self._timetags
+        zerocopy = self._zerocopy
+        while len(messages) < n:
+            raw_data, crcvalid = read_frame()
+            if crcvalid is None:  # UBX, RTCM3 or NMEA passthrough
+                append((raw_data, None))
+                continue
+            if filtered is not None and filtered(raw_data):
+                if filterraw:
+                    append((raw_data, None))
+                continue
+            if headeronly:
+                append((raw_data, SPARTNHeader(raw_data, crcvalid)))
+                continue
+            append(
+                (
+                    raw_data,
+                    SPARTNMessage(
+                        transport=raw_data,
+                        validate=validate,
+                        decode=decode,
+                        key=key,
+                        basedate=basedate,
+                        timetags=timetags,
+                        header=SPARTNHeader(raw_data, crcvalid),
+                        zerocopy=zerocopy,
+                    ),
+                )
+            )
+
+    def _parse_spartn(self) -> tuple:
+        """
+        Frame the next SPARTN message in the framing buffer and parse it.
+
         :return: tuple of (raw_data as bytes, parsed_stub as SPARTNMessage)
         :rtype: tuple
+        :raises: EOFError if stream ends
         :raises: SPARTN...Error if CRC invalid or other parsing error
         """
-        # pylint: disable=unused-variable
-
-        framestart = self._read_bytes(3)
-        # msgType = bitsval(framestart, 0, 7)
-        nData = bitsval(framestart, 7, 10)
-        eaf = bitsval(framestart, 17, 1)
-        crcType = bitsval(framestart, 18, 2)
-        # frameCrc = bitsval(framestart, 20, 4)
-
-        payDesc = self._read_bytes(4)
-        # msgSubtype denotes constellation - GPS, GLO, GAL, etc.
-        msgSubtype = bitsval(payDesc, 0, 4)
-        timeTagtype = bitsval(payDesc, 4, 1)
-        if timeTagtype:
-            payDesc += self._read_bytes(2)
-        gtlen = 32 if timeTagtype else 16
-        gnssTimeTag = bitsval(payDesc, 5, gtlen)
-        # store 32-bit timetag for this subtype for later use in decryption
-        if timeTagtype == 1:
-            self._timetags[msgSubtype] = gnssTimeTag
-        # solutionId = bitsval(payDesc, gtlen + 5, 7)
-        # solutionProcId = bitsval(payDesc, gtlen + 12, 4)
-        authInd = 0
-        embAuthLen = 0
-        if eaf:
-            payDesc += self._read_bytes(2)
-            # encryptionId = bitsval(payDesc, gtlen + 16, 4)
-            # encryptionSeq = bitsval(payDesc, gtlen + 20, 6)
-            authInd = bitsval(payDesc, gtlen + 26, 3)
-            embAuthLen = bitsval(payDesc, gtlen + 29, 3)
-        payload = self._read_bytes(nData)
-        embAuth = b""
-        if authInd > 1:
-            aln = ALN_ENUM.get(embAuthLen, 0)
-            embAuth = self._read_bytes(aln)
-        crcb = self._read_bytes(crcType + 1)
-        crc = int.from_bytes(crcb, "big")
-
-        # validate CRC
-        core = framestart + payDesc + payload + embAuth
-        raw_data = preamble + core + crcb
-        if self._validate & VALCRC:
-            if not valid_crc(core, crc, crcType):
-                raise SPARTNParseError(f"Invalid CRC {crc}")
 
+        raw_data, crcvalid = self._read_frame()
+        # frames filtered out by identity are not decrypted or decoded
+        while self._filtering and crcvalid is not None and self._filtered(raw_data):
+            if self._filterraw:
+                return (raw_data, None)
+            raw_data, crcvalid = self._read_frame()
+        if crcvalid is None:  # UBX, RTCM3 or NMEA passthrough
+            return (raw_data, None)
+        header = SPARTNHeader(raw_data, crcvalid)
+        if self._headeronly:
+            return (raw_data, header)
         parsed_data = self.parse(
             raw_data,
             validate=self._validate,
@@ -242,28 +447,342 @@ class SPARTNReader:
             key=self._key,
             basedate=self._basedate,
             timetags=self.timetags,
+            header=header,
+            zerocopy=self._zerocopy,
         )
         return (raw_data, parsed_data)
 
-    def _read_bytes(self, size: int) -> bytes:
+    def _filtered(self, raw_data: bytes) -> bool:
+        """
+        Check if frame is to be filtered out by message identity.
+
+        :param bytes raw_data: raw SPARTN frame
+        :return: True if filtered out
+        :rtype: bool
+        """
+
+        msgid = (raw_data[1] >> 1, raw_data[4] >> 4)
+        if self._include is not None and msgid not in self._include:
+            return True
+        return self._exclude is not None and msgid in self._exclude
+
+    @staticmethod
+    def _msgids(msgs: object) -> frozenset:
+        """
+        Convert collection of message identities and/or (msgType, msgSubtype)
+        tuples to set of (msgType, msgSubtype) tuples.
+
+        :param object msgs: collection of message identities and/or tuples
+        :return: set of (msgType, msgSubtype) tuples
+        :rtype: frozenset
+        :raises: ParameterError if unknown message identity
+        """
+
+        msgids = set()
+        for msg in msgs:
+            if isinstance(msg, str):
+                ids = [
+                    key
+                    for key, val in SPARTN_MSGIDS.items()
+                    if val == msg and isinstance(key, tuple)
+                ]
+                if not ids:
+                    raise ParameterError(f"Unknown message identity {msg}")
+                msgids.update(ids)
+            else:
+                msgids.add(tuple(msg))
+        return frozenset(msgids)
+
+    def _read_frame(self, rejectcrc: bool = True) -> tuple:
+        """
+        Frame the next SPARTN message in the framing buffer.
+        The structure of the transport layer depends on encryption type,
+        GNSS timetag format and CRC format.
+
+        Header fields are decoded directly from the buffer, so a complete
+        frame is extracted with a single slice rather than a sequence of
+        small stream reads.
+
+        :param bool rejectcrc: reject frames with invalid CRC (True)
+        :return: tuple of (raw_data as bytes, crcvalid as bool), or
+            (raw_data, None) for UBX, RTCM3 or NMEA frame if passthrough
+        :rtype: tuple
+        :raises: EOFError if stream ends
+        :raises: SPARTNParseError if CRC invalid or false preamble
+        """
+        # pylint: disable=too-many-locals, too-many-branches
+
+        while True:
+            buf = self._buffer
+            pos = self._pos
+            buflen = len(buf)
+            # searching within the bytes of a rejected frame, whose
+            # rejection has already been reported
+            rescan = self._skipped < self._rescan
+
+            # hunt for preamble
+            if pos >= buflen:
+                if not self._fill(1):
+                    raise EOFError()
+                continue
+            if buf[pos] != SPARTN_PRE:
+                if self._demux:  # skip UBX, RTCM3 or NMEA frame by length
+                    size = self._demux_frame(buf, pos)
+                    if size < 0:  # incomplete frame
+                        if self._fill(-size):
+                            continue
+                        buf = self._buffer
+                        pos = self._pos
+                        buflen = len(buf)
+                    elif size:
+                        end = pos + size
+                        self._pos = end
+                        self._stats["demuxed"] += 1
+                        if self._skipped:
+                            self._end_resync()
+                        if self._passthrough:
+                            return (
+                                (
+                                    buf[pos:end]
+                                    if self._view is None
+                                    else self._view[pos:end]
+                                ),
+                                None,
+                            )
+                        continue
+                # report each byte
+                if self._quitonerror and not (self._resync or rescan):
+                    self._pos = pos + 1
+                    self._skipped += 1
+                    raise SPARTNParseError(f"Unknown protocol {buf[pos:pos + 1]}")
+                if self._demux:
+                    match = DEMUX_PRE.search(buf, pos + 1)
+                    idx = -1 if match is None else match.start()
+                else:
+                    idx = buf.find(SPARTN_PREB, pos)
+                self._pos = buflen if idx == -1 else idx
+                self._skipped += self._pos - pos
+                continue
+
+            # framestart and fixed part of payDesc
+            if pos + 8 > buflen:
+                if not self._fill(8):
+                    self._truncated(((1, 3), (4, 4)))
+                continue
+            b1, b2, b3, b4 = buf[pos + 1 : pos + 5]
+            # reject false preamble on 4-bit frameCrc or unknown message
+            # identity, and resume search at next byte
+            if self._validate & VALCRC:
+                frameCrc = frame_crc(buf[pos + 1 : pos + 4])
+                if frameCrc != b3 & 0x0F:
+                    self._pos = pos + 1
+                    self._skipped += 1
+                    self._stats["headerfailures"] += 1
+                    if self._resync or rescan:
+                        continue
+                    raise SPARTNParseError(f"Invalid frameCrc {b3 & 0x0F}")
+            # msgSubtype denotes constellation - GPS, GLO, GAL, etc.
+            msgSubtype = b4 >> 4
+            if self._validate & VALMSGID:
+                if (b1 >> 1, msgSubtype) not in SPARTN_MSGIDS:
+                    self._pos = pos + 1
+                    self._skipped += 1
+                    self._stats["headerfailures"] += 1
+                    if self._resync or rescan:
+                        continue
+                    raise SPARTNParseError(
+                        f"Unknown message type {b1 >> 1} subtype {msgSubtype}"
+                    )
+            nData = ((b1 & 0x01) << 9) | (b2 << 1) | (b3 >> 7)
+            eaf = (b3 >> 6) & 0x01
+            crcType = (b3 >> 4) & 0x03
+            timeTagtype = (b4 >> 3) & 0x01
+
+            # variable part of payDesc
+            hdrlen = 8 + (2 if timeTagtype else 0) + (2 if eaf else 0)
+            if pos + hdrlen > buflen:
+                if not self._fill(hdrlen):
+                    self._truncated(
+                        ((8, 2), (10, 2)) if timeTagtype and eaf else ((8, 2),)
+                    )
+                continue
+            aln = 0
+            if eaf:
+                authInd = (buf[pos + hdrlen - 1] >> 3) & 0x07
+                if authInd > 1:
+                    aln = ALN_ENUM.get(buf[pos + hdrlen - 1] & 0x07, 0)
+            crclen = crcType + 1
+            end = pos + hdrlen + nData + aln + crclen
+            if end > buflen:
+                if not self._fill(end - pos):
+                    self._truncated(
+                        (
+                            (hdrlen, nData),
+                            (hdrlen + nData, aln),
+                            (end - pos - crclen, crclen),
+                        )
+                    )
+                continue
+
+            raw_data = buf[pos:end] if self._view is None else self._view[pos:end]
+
+            # validate CRC
+            crcvalid = False
+            if self._validate & VALCRC:
+                crc = int.from_bytes(raw_data[-crclen:], "big")
+                crcvalid = valid_crc(raw_data[1:-crclen], crc, crcType)
+                if not crcvalid and rejectcrc:
+                    # resume search at next byte, as a genuine frame may
+                    # start within the rejected frame
+                    self._pos = pos + 1
+                    self._skipped += 1
+                    self._rescan = max(self._rescan, self._skipped + end - pos - 1)
+                    self._stats["crcfailures"] += 1
+                    if self._resync or rescan:
+                        continue
+                    raise SPARTNParseError(f"Invalid CRC {crc}")
+            self._pos = end
+            # store 32-bit timetag for this subtype for later use in decryption
+            if timeTagtype:
+                self._timetags[msgSubtype] = (
+                    int.from_bytes(buf[pos + 4 : pos + 9], "big") >> 3
+                ) & 0xFFFFFFFF
+            self._stats["frames"] += 1
+            if rescan:
+                self._stats["recovered"] += 1
+            if self._skipped:
+                self._end_resync()
+            return (raw_data, crcvalid)
+
+    def _demux_frame(self, buf: bytes, pos: int) -> int:
+        """
+        Check for a UBX, RTCM3 or NMEA frame at the specified buffer position.
+        If CRC validation is enabled, the frame's checksum must also be valid.
+
+        :param bytes buf: framing buffer
+        :param int pos: buffer position
+        :return: length of frame, 0 if not a frame, or -(number of bytes
+            required from pos) if more data is required to check frame
+        :rtype: int
+        """
+
+        avail = len(buf) - pos
+        pre = buf[pos]
+        if pre == UBX_HDR[0]:  # 0xb5 0x62 class id length(2) payload ck_a ck_b
+            if avail < 6:
+                return -6
+            if buf[pos + 1] != UBX_HDR[1]:
+                return 0
+            size = 8 + int.from_bytes(buf[pos + 4 : pos + 6], "little")
+            if avail < size:
+                return -size
+            if self._validate & VALCRC:
+                ubx = buf[pos + 2 : pos + size]
+                if ubx_checksum(ubx[:-2]) != ubx[-2:]:
+                    return 0
+            return size
+        if pre == RTCM3_PRE:  # 0xd3 6 reserved bits 10-bit length payload crc(3)
+            if avail < 3:
+                return -3
+            if buf[pos + 1] & 0xFC:
+                return 0
+            size = 6 + (((buf[pos + 1] & 0x03) << 8) | buf[pos + 2])
+            if avail < size:
+                return -size
+            if self._validate & VALCRC:
+                crc = int.from_bytes(buf[pos + size - 3 : pos + size], "big")
+                if not valid_crc(buf[pos : pos + size - 3], crc, 2):  # CRC-24Q
+                    return 0
+            return size
+        if pre == NMEA_PRE:  # $ talker sentence *hh CRLF
+            end = buf.find(b"\r\n", pos, pos + NMEA_MAXLEN)
+            if end == -1:
+                return -(avail + 1) if avail < NMEA_MAXLEN else 0
+            sentence = bytes(buf[pos + 1 : end])
+            if len(sentence) < 4 or sentence[-3] != 0x2A or not sentence.isascii():
+                return 0
+            if self._validate & VALCRC:
+                chk = 0
+                for b in sentence[:-3]:
+                    chk ^= b
+                if sentence[-2:].upper() != f"{chk:02X}".encode():
+                    return 0
+            return end + 2 - pos
+        return 0
+
+    def _fill(self, size: int) -> bool:
+        """
+        Top up framing buffer from stream until at least the specified number
+        of bytes are available from the current buffer position.
+
+        If the stream supports `read1()` (e.g. buffered files, BytesIO, compressed
+        files), data is read in large chunks of up to `chunksize` bytes; otherwise
+        (e.g. serial or socket streams) only the bytes required are read.
+
+        If the stream raises an exception (e.g. a socket TimeoutError), any
+        data already read is retained in the framing buffer.
+
+        :param int size: number of bytes required
+        :return: True if size bytes available, False if stream ended prematurely
+        :rtype: bool
         """
-        Read a specified number of bytes from stream.
 
-        :param int size: number of bytes to read
-        :return: bytes
-        :rtype: bytes
-        :raises: EOFError if stream ends prematurely
+        buf = self._buffer[self._pos :]
+        self._pos = 0
+        try:
+            while len(buf) < size:
+                if self._read1 is None:
+                    data = self._stream.read(size - len(buf))
+                else:
+                    data = self._read1(max(self._chunksize, size - len(buf)))
+                if not data:  # EOF
+                    break
+                buf += data
+        finally:
+            self._buffer = buf
+            if self._zerocopy:  # buffer is never modified, so views remain valid
+                self._view = memoryview(buf)
+        return len(buf) >= size
+
+    def _truncated(self, fields: tuple):
         """
+        Handle stream which ends part way through a frame, discarding
+        the partial frame.
 
-        data = self._stream.read(size)
-        if len(data) == 0:  # EOF
+        :param tuple fields: tuple of (offset, size) of each outstanding frame
+            field, relative to the preamble
+        :raises: EOFError if stream ended on a field boundary or resync enabled
+        :raises: SPARTNStreamError if stream ended part way through a field
+        """
+
+        avail = len(self._buffer) - self._pos
+        self._pos = len(self._buffer)
+        self._skipped += avail
+        if self._resync:
             raise EOFError()
-        if 0 < len(data) < size:  # truncated stream
-            raise SPARTNStreamError(
-                "Serial stream terminated unexpectedly. "
-                f"{size} bytes requested, {len(data)} bytes returned."
-            )
-        return data
+        for offset, size in fields:
+            if avail <= offset:
+                break
+            if avail < offset + size:
+                raise SPARTNStreamError(
+                    "Serial stream terminated unexpectedly. "
+                    f"{size} bytes requested, {avail - offset} bytes returned."
+                )
+        raise EOFError()
+
+    def _end_resync(self):
+        """
+        Record the end of a run of discarded data (if any) and pass
+        the aggregated statistics to the stats handler.
+        """
+
+        if not self._skipped:
+            return
+        self._stats["discarded"] += self._skipped
+        self._stats["resyncs"] += 1
+        self._skipped = self._rescan = 0
+        if self._statshandler is not None:
+            self._statshandler(self.stats)
 
     def _do_error(self, err: Exception):
         """
@@ -293,6 +812,45 @@ class SPARTNReader:
 
         return self._stream
 
+    @property
+    def stats(self) -> dict:
+        """
+        Getter for framing statistics.
+
+        - frames: number of frames successfully framed (and CRC validated)
+        - discarded: number of bytes discarded while resynchronising
+        - resyncs: number of resynchronisation events (contiguous runs of
+          discarded data ended by a valid frame or end of stream)
+        - headerfailures: number of false preambles rejected on frameCrc
+          or message identity
+        - crcfailures: number of frames rejected on CRC
+        - recovered: number of frames found within the bytes of a frame
+          rejected on CRC, as the search resumes at the byte following
+          the rejected preamble
+
+        :return: dict of framing statistics
+        :rtype: dict
+        """
+
+        stats = dict(self._stats)
+        stats["discarded"] += self._skipped
+        return stats
+
+    @property
+    def queuestats(self) -> dict:
+        """
+        Getter for `iter_threaded()` queue metrics.
+
+        - highwater: maximum number of frames queued
+        - dropped: number of frames dropped when the queue was full,
+          if `dropoldest` is True
+
+        :return: dict of queue metrics
+        :rtype: dict
+        """
+
+        return dict(self._queuestats)
+
     @property
     def timetags(self) -> dict:
         """
@@ -316,6 +874,8 @@ class SPARTNReader:
         key: str = None,
         basedate: object = None,
         timetags: dict = None,
+        header: SPARTNHeader = None,
+        zerocopy: bool = False,
     ) -> SPARTNMessage:
         """
         Parse SPARTN message to SPARTNMessage object.
@@ -326,6 +886,8 @@ class SPARTNReader:
         :param str key: decryption key (required if decode = 1)
         :param object basedate: basedate as datetime or 32-bit gnssTimeTag as integer (None)
         :param dict timetags: dict of accumulated gnssTimeTags from data stream (None)
+        :param SPARTNHeader header: transport header already decoded from message (None)
+        :param bool zerocopy: keep transport and payload as memoryview slices (False)
         :return: SPARTNMessage object
         :rtype: SPARTNMessage
         :raises: SPARTN...Error (if data stream contains invalid data or unknown message type)
@@ -342,4 +904,6 @@ class SPARTNReader:
             key=key,
             basedate=basedate,
             timetags=timetags,
+            header=header,
+            zerocopy=zerocopy,
         )
@@ -0,0 +1,188 @@
+"""
+SPARTNReader threaded I/O.
+
+Mixin class providing `SPARTNReader.iter_threaded()`, which frames
+SPARTN messages from the stream in a background I/O thread, but parses
+them in the calling thread.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=too-few-public-methods
+
+from queue import Full, Queue
+from threading import Event, Thread
+
+from pyspartn.exceptions import SPARTN_ERRORS
+from pyspartn.spartnheader import SPARTNHeader
+
+
+class ThreadedReadMixin:
+    """
+    SPARTNReader threaded I/O mixin class.
+    """
+
+    def iter_threaded(
+        self, queuesize: int = 1024, dropoldest: bool = False, jointimeout: float = None
+    ):
+        """
+        Generator which frames SPARTN messages from the stream in a
+        background I/O thread, placing them on a bounded queue, but parses
+        (and decrypts and decodes, if `decode` is True) them in the calling
+        thread. Stream reads can therefore continue while messages are
+        being decoded, e.g. during bursts of HPAC messages.
+
+        The accumulated 32-bit timetags are queued with each frame, so
+        decryption with `basedate=TIMEBASE` gives the same results as
+        sequential reading. Errors are handled according to the `quitonerror`
+        setting, in the calling thread and in stream order. Any statshandler
+        is called from the I/O thread. Queue metrics are available via
+        the `queuestats` property. Socket timeouts with raisetimeout = True
+        are retried in the I/O thread, which stops promptly when iteration ends.
+
+        When iteration ends (or the generator is closed), the I/O thread is
+        stopped and joined before control returns to the caller, so the
+        reader can safely be used again. The thread can only stop once any
+        stream read in progress returns.
+
+        :param int queuesize: maximum number of frames queued (1024)
+        :param bool dropoldest: if queue is full, drop the oldest queued frame
+            (True) or block the I/O thread until there is room (False)
+        :param float jointimeout: maximum time in seconds to wait for the I/O
+            thread to stop when iteration ends (None = wait indefinitely)
+        :return: generator of tuple (raw_data as bytes, parsed_data as SPARTNMessage)
+        :rtype: generator
+        :raises: SPARTN***Error if error during parsing and quitonerror = 2
+        :raises: RuntimeError if I/O thread has not stopped within jointimeout
+        """
+
+        frames = Queue(queuesize)
+        stop = Event()
+        self._queuestats = {"highwater": 0, "dropped": 0}
+        producer = Thread(
+            target=self._produce, args=(frames, stop, dropoldest), daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                raw_data, crcvalid, timetags = frames.get()
+                if raw_data is None:  # end of stream or error
+                    if crcvalid is None:
+                        return
+                    if not isinstance(crcvalid, SPARTN_ERRORS):
+                        raise crcvalid
+                    if self._quitonerror:
+                        self._do_error(crcvalid)
+                    continue
+                if timetags is None:  # filtered out
+                    yield (raw_data, None)
+                    continue
+                if self._headeronly:
+                    yield (raw_data, SPARTNHeader(raw_data, crcvalid))
+                    continue
+                try:
+                    parsed_data = self.parse(
+                        raw_data,
+                        validate=self._validate,
+                        decode=self._decode,
+                        key=self._key,
+                        basedate=self._basedate,
+                        timetags=timetags,
+                        header=SPARTNHeader(raw_data, crcvalid),
+                    )
+                except SPARTN_ERRORS as err:
+                    if self._quitonerror:
+                        self._do_error(err)
+                    continue
+                yield (raw_data, parsed_data)
+        finally:
+            stop.set()
+            producer.join(jointimeout)
+            if producer.is_alive():
+                raise RuntimeError("I/O thread still reading from stream")
+
+    def _produce(self, frames: Queue, stop: Event, dropoldest: bool):
+        """
+        Frame SPARTN messages from the stream and place them on the queue,
+        with a snapshot of the accumulated timetags, until the stream ends
+        or the consumer stops. Runs in the I/O thread of `iter_threaded()`.
+
+        Queue items are tuples of (raw_data, crcvalid, timetags). Framing
+        errors are queued as (None, error, None) and end of stream as
+        (None, None, None). With dropoldest, only queued frames are dropped,
+        never errors.
+
+        :param Queue frames: bounded frame queue
+        :param Event stop: set by the consumer when iteration ends
+        :param bool dropoldest: drop oldest frame (True) or block (False) if queue full
+        """
+
+        timetags = None
+        while not stop.is_set():
+            try:
+                raw_data, crcvalid = self._read_frame()
+                raw_data = bytes(raw_data)
+                if crcvalid is None:  # UBX, RTCM3 or NMEA passthrough
+                    item = (raw_data, None, None)
+                elif self._filtering and self._filtered(raw_data):
+                    if not self._filterraw:
+                        continue
+                    item = (raw_data, crcvalid, None)
+                else:
+                    # share timetags between frames until they change
+                    if timetags != self._timetags:
+                        timetags = dict(self._timetags)
+                    item = (raw_data, crcvalid, timetags)
+            except EOFError:
+                self._end_resync()
+                item = (None, None, None)
+            except SPARTN_ERRORS as err:
+                if not self._quitonerror:
+                    continue
+                item = (None, err, None)
+            except TimeoutError:  # socket idle, check for consumer stop
+                continue
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                item = (None, err, None)
+            evict = dropoldest and item[0] is not None
+            while not stop.is_set():
+                try:
+                    if evict:
+                        frames.put_nowait(item)
+                    else:  # block, checking periodically for consumer stop
+                        frames.put(item, timeout=0.1)
+                    break
+                except Full:
+                    if evict:
+                        if _evict_frame(frames):
+                            self._queuestats["dropped"] += 1
+                        else:  # only errors queued, wait for room
+                            evict = False
+            self._queuestats["highwater"] = max(
+                self._queuestats["highwater"], frames.qsize()
+            )
+            if item[0] is None and not isinstance(item[1], SPARTN_ERRORS):
+                return  # end of stream or stream error
+
+
+def _evict_frame(frames: Queue) -> bool:
+    """
+    Remove the oldest queued frame, leaving any queued errors or
+    end of stream marker in place.
+
+    :param Queue frames: bounded frame queue
+    :return: True if a frame was removed, False if none queued
+    :rtype: bool
+    """
+
+    with frames.mutex:
+        for i, item in enumerate(frames.queue):
+            if item[0] is not None:
+                del frames.queue[i]
+                frames.not_full.notify()
+                return True
+    return False
@@ -19,6 +19,8 @@ TIMEBASE = datetime(2010, 1, 1, 0, 0, tzinfo=timezone.utc)
 """ Initial epoch for SPARTN protocol. """
 DEFAULTKEY = "abcd1234abcd1234abcd1234abcd1234"  # nominal 32-char hex key
 """ Nominal 32-char hex key. """
+TIMETAG_UTC = {0: -18, 1: -10800, 2: -18, 3: -4, 4: -18}
+""" Offset in seconds from GNSS constellation time to UTC, by OCB/HPAC msgSubtype. """
 ERRRAISE = 2
 """ (Re)raise errors """
 ERRLOG = 1
@@ -34,6 +36,14 @@ VALMSGID = 2
 SPARTN_PRE = 0x73
 SPARTN_PREB = b"s"
 """ SPARTN preamble byte """
+UBX_HDR = b"\xb5\x62"
+""" UBX header bytes """
+RTCM3_PRE = 0xD3
+""" RTCM3 preamble byte """
+NMEA_PRE = 0x24
+""" NMEA start character '$' """
+NMEA_MAXLEN = 512
+""" Maximum length of NMEA sentence recognised in demux mode """
 NA = "N/A"
 
 # Attribute types
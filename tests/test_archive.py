@@ -0,0 +1,220 @@
+"""
+Created on 18 Oct 2026
+Archive tests for pyspartn.spartnarchive
+
+@author: semuadmin
+"""
+
+import os
+import shutil
+import unittest
+from datetime import datetime
+from tempfile import TemporaryDirectory
+
+from pyspartn.exceptions import ParameterError, SPARTNParseError
+from pyspartn.spartnarchive import INDEX_HEADER, INDEX_RECORD, SPARTNArchiveReader
+from pyspartn.spartnhelpers import timetag2date
+from pyspartn.spartnreader import SPARTNReader
+from pyspartn.spartntypes_core import ERRIGNORE, ERRRAISE, VALCRC, VALMSGID, VALNONE
+
+DIRNAME = os.path.dirname(__file__)
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = None
+
+    def tearDown(self):
+        pass
+
+    def testarchive(self):  # test archive reader output matches SPARTNReader
+        for logfile in ("spartnMIXED.log", "spartn_badpreamble.log"):
+            fname = os.path.join(DIRNAME, logfile)
+            with open(fname, "rb") as stream:
+                expected = [
+                    (raw, str(parsed))
+                    for raw, parsed in SPARTNReader(stream, validate=VALCRC | VALMSGID)
+                ]
+            with SPARTNArchiveReader(fname, validate=VALCRC | VALMSGID) as spr:
+                actual = []
+                for raw, parsed in spr:
+                    self.assertIsInstance(raw, memoryview)
+                    self.assertEqual(parsed.serialize(), raw)
+                    actual.append((bytes(raw), str(parsed)))
+                self.assertEqual(spr.offset, os.path.getsize(fname))
+            self.assertEqual(actual, expected)
+
+    def testarchiveerror(self):  # test archive reader error handling
+        fname = os.path.join(DIRNAME, "spartn_badcrc.log")
+        with SPARTNArchiveReader(fname, quitonerror=ERRRAISE) as spr:
+            with self.assertRaisesRegex(SPARTNParseError, "Invalid CRC 15632804"):
+                for _ in spr:
+                    pass
+        errors = []
+        with SPARTNArchiveReader(fname, errorhandler=errors.append) as spr:
+            frames = list(spr)
+            self.assertEqual(spr.stats["crcfailures"], 1)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(repr(frames[0][1])[:31], "SPARTNMessage(transport=b's\\x00")
+
+    def testarchiveempty(self):  # test empty archive
+        with TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "empty.log")
+            open(fname, "wb").close()
+            with SPARTNArchiveReader(fname) as spr:
+                self.assertEqual(spr.read(), (None, None))
+
+    def testindex(self):  # test sidecar index output matches framed output
+        with TemporaryDirectory() as tmpdir:
+            for logfile in ("spartnMIXED.log", "spartn_badcrc.log"):
+                fname = os.path.join(tmpdir, logfile)
+                shutil.copy(os.path.join(DIRNAME, logfile), fname)
+                for validate in (VALCRC, VALCRC | VALMSGID):
+                    errors1 = []
+                    errors2 = []
+                    with SPARTNArchiveReader(
+                        fname, validate=validate, errorhandler=errors1.append
+                    ) as spr:
+                        self.assertFalse(spr.indexed)
+                        expected = [(bytes(raw), str(parsed)) for raw, parsed in spr]
+                    with SPARTNArchiveReader(
+                        fname,
+                        validate=validate,
+                        errorhandler=errors2.append,
+                        indexfile=True,
+                    ) as spr:
+                        self.assertTrue(spr.indexed)
+                        actual = [(bytes(raw), str(parsed)) for raw, parsed in spr]
+                    self.assertEqual(actual, expected)
+                    self.assertEqual(
+                        [str(err) for err in errors2], [str(err) for err in errors1]
+                    )
+            # resync mode skips frames with invalid CRC silently
+            with SPARTNArchiveReader(fname, indexfile=True, resync=True) as spr:
+                self.assertEqual(len(list(spr)), 34)
+                self.assertEqual(spr.stats["crcfailures"], 1)
+
+    def testindexrescan(self):  # test frames recovered within rejected frames
+        with open(os.path.join(DIRNAME, "spartnMIXED.log"), "rb") as stream:
+            raw1, _ = SPARTNReader(stream).read()
+        with TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "rescan.log")
+            with open(fname, "wb") as outfile:
+                outfile.write(raw1[:20] + raw1 * 2 + raw1[:30] + raw1)
+            for indexfile in (None, True):
+                errors = []
+                with SPARTNArchiveReader(
+                    fname, errorhandler=errors.append, indexfile=indexfile
+                ) as spr:
+                    self.assertEqual([bytes(raw) for raw, _ in spr], [raw1] * 3)
+                    self.assertEqual(spr.stats["crcfailures"], 2)
+                    self.assertEqual(spr.stats["recovered"], 2)
+                self.assertEqual(len(errors), 2)
+            with SPARTNArchiveReader(fname, indexfile=True) as spr:
+                self.assertEqual(spr.framecount, 5)
+            # frames within returned frames are skipped if CRC not validated
+            with SPARTNArchiveReader(
+                fname, validate=VALNONE, quitonerror=ERRIGNORE, indexfile=True
+            ) as spr:
+                self.assertEqual(
+                    [spr.offset - len(raw) for raw, _ in spr], [0, 63, 106]
+                )
+
+    def testindexaccess(self):  # test random access via sidecar index
+        with TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "spartn_badcrc.log")
+            iname = os.path.join(tmpdir, "index.idx")
+            shutil.copy(os.path.join(DIRNAME, "spartn_badcrc.log"), fname)
+            self.assertEqual(SPARTNArchiveReader.create_index(fname, iname), 35)
+            self.assertEqual(
+                os.path.getsize(iname), INDEX_HEADER.size + 35 * INDEX_RECORD.size
+            )
+            mtime = os.path.getmtime(iname)
+            with SPARTNArchiveReader(fname, indexfile=iname) as spr:
+                self.assertEqual(os.path.getmtime(iname), mtime)  # not re-created
+                self.assertEqual(spr.framecount, 35)
+                self.assertEqual(
+                    spr.counts,
+                    {
+                        "SPARTN-1X-OCB-GPS": 7,
+                        "SPARTN-1X-OCB-GLO": 7,
+                        "SPARTN-1X-OCB-GAL": 6,
+                        "SPARTN-1X-GAD": 2,
+                        "SPARTN-1X-HPAC-GPS": 4,
+                        "SPARTN-1X-HPAC-GLO": 4,
+                        "SPARTN-1X-HPAC-GAL": 4,
+                    },
+                )
+                frames = [bytes(raw) for raw, _ in spr]
+                offset, length, msgType, msgSubtype, _, _, eaf, crcvalid = spr.entry(-1)
+                self.assertEqual((msgType, msgSubtype, eaf, crcvalid), (0, 2, 1, 0))
+                self.assertEqual(offset + length, os.path.getsize(fname))
+                raw, parsed = spr[3]
+                self.assertEqual(bytes(raw), frames[3])
+                self.assertEqual(parsed.identity, "SPARTN-1X-OCB-GPS")
+                spr.seek(-2)
+                self.assertEqual(bytes(spr.read()[0]), frames[33])
+                spr.seek(35)
+                self.assertEqual(spr.read(), (None, None))
+                with self.assertRaisesRegex(IndexError, "Frame 35 out of range"):
+                    spr.entry(35)
+            # stale index is re-created
+            with open(fname, "ab") as outfile:
+                outfile.write(b"\x00")
+            with SPARTNArchiveReader(fname, indexfile=iname) as spr:
+                self.assertEqual(spr.framecount, 35)
+            self.assertNotEqual(os.path.getmtime(iname), mtime)
+            with SPARTNArchiveReader(fname) as spr:
+                with self.assertRaisesRegex(ParameterError, "No index"):
+                    spr.framecount
+
+    def testseektime(self):  # test time-based seek via sidecar index
+        with TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "spartn_rollover.log")
+            shutil.copy(
+                os.path.join(DIRNAME, "spartn_rollover_32and16_20240428235040.log"),
+                fname,
+            )
+            with open(fname, "rb") as stream:
+                spr = SPARTNReader(stream)
+                frames = []
+                timetags = [{}]  # timetags before each frame
+                for raw, _ in spr:
+                    frames.append(raw)
+                    timetags.append(dict(spr.timetags))
+            with SPARTNArchiveReader(fname, indexfile=True) as spr:
+                for time, frame in (
+                    (0, 0),
+                    (452044782, 27),
+                    (timetag2date(452044782).replace(tzinfo=None), 27),
+                    (452044797, 61),
+                    (452044802, 65),  # 16-bit timetag after rollover
+                    (10**10, 99),
+                ):
+                    self.assertEqual(spr.seek_time(time), frame)
+                    if frame < 99:
+                        self.assertEqual(spr.timetags, timetags[frame])
+                        self.assertEqual(bytes(spr.read()[0]), frames[frame])
+                    else:
+                        self.assertEqual(spr.read(), (None, None))
+            # 16-bit timetags preceding first 32-bit timetag need basedate
+            fname = os.path.join(DIRNAME, "spartn_mqtt.log")
+            iname = os.path.join(tmpdir, "spartn_mqtt.idx")
+            for basedate, frame in (
+                (None, 3),
+                (413903145, 0),
+                (timetag2date(413903145), 0),
+            ):
+                with SPARTNArchiveReader(
+                    fname, indexfile=iname, basedate=basedate, timetags={0: 1}
+                ) as spr:
+                    self.assertEqual(spr.seek_time(413903107), frame)
+                    self.assertEqual(spr.timetags, {0: 1})
+            with SPARTNArchiveReader(fname) as spr:
+                with self.assertRaisesRegex(ParameterError, "No index"):
+                    spr.seek_time(datetime(2024, 4, 28, 23, 50))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
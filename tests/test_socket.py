@@ -9,10 +9,17 @@ Created on 11 May 2022
 :author: semuadmin (Steve Smith)
 """
 
+import threading
 import unittest
-from socket import socket
+from socket import SHUT_WR, create_connection, create_server, socket, socketpair
 
+from pyspartn.exceptions import ParameterError, SPARTNParseError
+from pyspartn.socket_wrapper import SocketWrapper
+from pyspartn.spartnmultiplexer import SPARTNMultiplexer
 from pyspartn.spartnreader import SPARTNReader
+from pyspartn.spartntypes_core import ERRRAISE, VALNONE
+
+SPARTNMSG = b"s\x00\x12\xe2\x00|\x10[\x12H\xf5\t\xa0\xb4+\x99\x02\x15\xe2\x05\x85\xb7\x83\xc5\xfd\x0f\xfe\xdf\x18\xbe\x7fv \xc3`\x82\x98\x10\x07\xdc\xeb\x82\x7f\xcf\xf8\x9e\xa3ta\xad"
 
 
 class DummySocket(socket):
@@ -61,6 +68,70 @@ class DummySocket(socket):
         self._buffer = self._buffer[num:]
         return buff
 
+    def recv_into(self, buffer, nbytes: int = 0) -> int:
+        buff = self.recv(nbytes or len(buffer))
+        buffer[: len(buff)] = buff
+        return len(buff)
+
+
+class LegacySocketWrapper:
+    """
+    Previous SocketWrapper implementation, which copies the remainder
+    of the buffer on every read, for comparison.
+    """
+
+    def __init__(self, sock: socket, bufsize: int = 4096):
+        self._socket = sock
+        self._bufsize = bufsize
+        self._buffer = bytearray()
+        self._recv()
+
+    def _recv(self) -> bool:
+        try:
+            self._buffer += self._socket.recv(self._bufsize)
+        except (OSError, TimeoutError):
+            return False
+        return True
+
+    def read(self, num: int) -> bytes:
+        while len(self._buffer) < num:
+            if not self._recv():
+                return b""
+        data = self._buffer[:num]
+        self._buffer = self._buffer[num:]
+        return bytes(data)
+
+
+def loopback_read(wrapper: object, count: int, **kwargs) -> tuple:
+    """
+    Send count SPARTN messages over a loopback TCP connection as fast
+    as possible and read them using SPARTNReader via the specified
+    socket wrapper class.
+
+    :return: tuple of (list of raw messages received, socket wrapper)
+    """
+
+    with create_server(("127.0.0.1", 0)) as server:
+
+        def send():
+            conn, _ = server.accept()
+            with conn:
+                conn.sendall(SPARTNMSG * count)
+
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        with create_connection(server.getsockname()) as sock:
+            sock.settimeout(5)
+            stream = wrapper(sock, **kwargs)
+            spr = SPARTNReader(stream, validate=VALNONE)
+            received = []
+            for raw, _ in spr:
+                received.append(raw)
+                if len(received) == count:
+                    break
+        sender.join()
+    return received, stream
+
 
 class SocketTest(unittest.TestCase):
     def setUp(self):
@@ -118,6 +189,159 @@ class SocketTest(unittest.TestCase):
                     break
         self.assertEqual(i, 0)
 
+    def testSocketWrapperBuffer(self):  # test buffer compaction and growth
+        with DummySocket() as stream:
+            sw = SocketWrapper(stream, bufsize=64, maxbufsize=256)
+            self.assertEqual(len(sw.buffer), 64)
+            self.assertEqual(len(sw._buffer), 128)  # filled, so grown
+            self.assertEqual(sw.read(50), SPARTNMSG)
+            with self.assertRaisesRegex(
+                ParameterError, "Read of 300 bytes exceeds maximum buffer size 256"
+            ):
+                sw.read(300)
+            self.assertEqual(sw.read(250), SPARTNMSG * 5)  # grown to fit
+            self.assertEqual(len(sw._buffer), 256)  # limited to maxbufsize
+            data = b""
+            while len(data) < 5000:
+                chunk = sw.read1(37)
+                self.assertTrue(0 < len(chunk) <= 37)
+                data += chunk
+            self.assertEqual(data, (SPARTNMSG * 200)[: len(data)])
+
+    def testSocketClosed(self):  # test socket closed by peer
+        with DummySocket() as stream:
+            stream._buffer = stream._stream = b""
+            sw = SocketWrapper(stream)
+            self.assertEqual(sw.read(1), b"")
+            self.assertEqual(sw.read1(1), b"")
+
+    def testSocketTimeout(self):  # test idle timeout distinct from end of stream
+        sender, receiver = socketpair()
+        receiver.settimeout(0.05)
+        with sender, receiver:
+            spr = SPARTNReader(receiver, raisetimeout=True, timetags={1: 123})
+            with self.assertRaisesRegex(TimeoutError, "No data received"):
+                spr.read()
+            sender.sendall(SPARTNMSG + SPARTNMSG[:20])
+            self.assertEqual(spr.read()[0], SPARTNMSG)
+            with self.assertRaises(TimeoutError):  # partial frame retained
+                spr.read()
+            sender.sendall(SPARTNMSG[20:] + SPARTNMSG * 2)
+            batches = []
+            with self.assertRaises(TimeoutError):
+                for batch in spr.iter_batches(5):
+                    batches.append(batch)
+            self.assertEqual([len(batch) for batch in batches], [3])
+            self.assertEqual(batches[0][0][0], SPARTNMSG)
+            self.assertEqual(spr.timetags, {1: 123})
+            sender.sendall(SPARTNMSG * 2)
+            msgs = []
+            gen = spr.iter_threaded()
+            msgs.append(next(gen))
+            msgs.append(next(gen))
+            sender.sendall(SPARTNMSG)  # after I/O thread timeout(s)
+            msgs.append(next(gen))
+            gen.close()
+            self.assertEqual([raw for raw, _ in msgs], [SPARTNMSG] * 3)
+            sender.shutdown(SHUT_WR)
+            self.assertEqual(spr.read(), (None, None))
+
+    def testSocketReconnect(self):  # test framing state retained over reconnect
+        sender1, receiver1 = socketpair()
+        sender2, receiver2 = socketpair()
+        sockets = [receiver2]
+
+        def reconnect():
+            return sockets.pop() if sockets else None
+
+        with receiver1, receiver2:
+            sender1.sendall(SPARTNMSG + SPARTNMSG[:20])
+            sender1.close()
+            sender2.sendall(SPARTNMSG[20:] + SPARTNMSG)
+            sender2.close()
+            timetags = {1: 123}
+            spr = SPARTNReader(receiver1, reconnect=reconnect, timetags=timetags)
+            self.assertEqual([raw for raw, _ in spr], [SPARTNMSG] * 3)
+            self.assertEqual(spr._stream.reconnects, 1)
+            self.assertIs(spr.timetags, timetags)
+        stream = socket()
+        stream.close()  # socket error
+        sw = SocketWrapper(stream, reconnect=lambda: None)
+        self.assertEqual(sw.read1(1), b"")
+        self.assertEqual(sw.reconnects, 0)
+
+    def testLoopback(
+        self,
+    ):  # test ring buffer matches legacy wrapper on loopback socket
+        count = 10000
+        legacy, _ = loopback_read(LegacySocketWrapper, count, bufsize=65536)
+        ring, stream = loopback_read(
+            SocketWrapper, count, bufsize=4096, maxbufsize=16384
+        )
+        self.assertEqual(legacy, [SPARTNMSG] * count)
+        self.assertEqual(ring, legacy)
+        # stream much larger than buffer, so unread data has been compacted
+        self.assertLessEqual(len(stream._buffer), 16384)
+
+    def testMultiplexer(self):  # test reading several sockets in one thread
+        errors = []
+        with SPARTNMultiplexer(
+            bufsize=50, errorhandler=errors.append, timetags={1: 123}
+        ) as mux:
+            senders = {}
+            for stream_id in ("EU", "US", "AU"):
+                sender, receiver = socketpair()
+                senders[stream_id] = sender
+                mux.add(stream_id, receiver)
+            with self.assertRaisesRegex(ParameterError, "Stream EU already added"):
+                mux.add("EU", senders["EU"])
+            self.assertEqual(mux.read(0), [])  # nothing received yet
+            senders["EU"].sendall(b"junk" + SPARTNMSG * 3 + SPARTNMSG[:10])
+            senders["US"].sendall(SPARTNMSG * 2)
+            msgs = []
+            while len(msgs) < 5:
+                msgs += mux.read(1)
+            self.assertEqual(mux["EU"].buffered, 10)
+            self.assertEqual(mux["EU"].timetags, {1: 123})
+            self.assertIsNot(mux["EU"].timetags, mux["US"].timetags)
+            senders["EU"].sendall(SPARTNMSG[10:])
+            mux.remove("AU").close()
+            senders["AU"].close()
+            for sender in senders.values():
+                sender.close()
+            msgs += list(mux)
+            self.assertEqual(mux.streams, [])
+        self.assertEqual(
+            sorted((stream_id, raw) for stream_id, raw, _ in msgs),
+            [("EU", SPARTNMSG)] * 4 + [("US", SPARTNMSG)] * 2,
+        )
+        self.assertEqual(
+            {parsed.identity for _, _, parsed in msgs}, {"SPARTN-1X-OCB-GPS"}
+        )
+        self.assertEqual(len(errors), 4)
+        # messages from other streams are returned before an error is raised
+        with SPARTNMultiplexer(quitonerror=ERRRAISE) as mux:
+            senders = {}
+            for stream_id in ("EU", "US"):
+                sender, receiver = socketpair()
+                senders[stream_id] = sender
+                mux.add(stream_id, receiver)
+            senders["EU"].sendall(SPARTNMSG * 3)
+            senders["US"].sendall(b"j")
+            msgs = []
+            errors = []
+            for _ in range(20):
+                try:
+                    msgs += mux.read(0.1)
+                except SPARTNParseError as err:
+                    errors.append(str(err))
+                if len(msgs) == 3 and errors:
+                    break
+            for sender in senders.values():
+                sender.close()
+        self.assertEqual([raw for _, raw, _ in msgs], [SPARTNMSG] * 3)
+        self.assertEqual(errors, ["Unknown protocol b'j'"])
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
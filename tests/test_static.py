@@ -25,17 +25,19 @@ from pyspartn.spartnhelpers import (
     att2name,
     bitsval,
     convert_timetag,
+    crc_poly,
+    crc_table,
     datadesc,
     date2timetag,
     decrypt,
     enc2float,
     encrypt,
     escapeall,
+    frame_crc,
     naive2aware,
     timetag2date,
     valid_crc,
 )
-from pyspartn.spartntypes_core import SPARTN_DATA_FIELDS, FL
 from pyspartn.spartntables import (
     SF015_ENUM,
     SF022_ENUM,
@@ -61,6 +63,7 @@ from pyspartn.spartntables import (
     SF097_ENUM,
     SF098_ENUM,
 )
+from pyspartn.spartntypes_core import FL, SPARTN_DATA_FIELDS
 
 
 class StaticTest(unittest.TestCase):
@@ -109,6 +112,37 @@ class StaticTest(unittest.TestCase):
         self.assertFalse(valid_crc(msg, 0x33220F, 2))
         self.assertFalse(valid_crc(msg, 0x9523B4B4, 3))
 
+    def testCRCtable(self):  # check table-driven CRC against bitwise algorithm
+        def crc_bitwise(data, n, poly, crc=0, xor_out=0):
+            g = 1 << n | poly
+            for d in data:
+                crc ^= d << (n - 8)
+                for _ in range(8):
+                    crc <<= 1
+                    if crc & (1 << n):
+                        crc ^= g
+            return crc ^ xor_out
+
+        msg = bytes(range(256)) + os.urandom(256)
+        for n, poly, init, xor_out in (
+            (8, 0x07, 0, 0),
+            (16, 0x1021, 0, 0),
+            (16, 0x1021, 0xFFFF, 0),
+            (24, 0x864CFB, 0, 0),
+            (32, 0x04C11DB7, 0xFFFFFFFF, 0xFFFFFFFF),
+        ):
+            self.assertEqual(
+                crc_poly(msg, n, poly, crc=init, xor_out=xor_out),
+                crc_bitwise(msg, n, poly, crc=init, xor_out=xor_out),
+            )
+        self.assertEqual(len(crc_table(24, 0x864CFB)), 256)
+        self.assertIs(crc_table(24, 0x864CFB), crc_table(24, 0x864CFB))
+
+    def testframecrc(self):  # test 4-bit frameCrc
+        self.assertEqual(frame_crc(b"\x00\x12\xe2"), 2)
+        self.assertEqual(frame_crc(b"\x02\xf7\xeb"), 11)
+        self.assertEqual(frame_crc(b"\x00\x00\x00"), 0)
+
     def testCRCfail(self):  # test invalid crcType
         EXPECTED_ERROR = "Invalid crcType: 4 - should be 0-3"
         with self.assertRaisesRegex(ValueError, EXPECTED_ERROR):
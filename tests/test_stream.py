@@ -5,12 +5,20 @@ Stream tests for pygpsclient.spartnreader
 @author: semuadmin 
 """
 
+import asyncio
+import bz2
+import gzip
+import lzma
 import os
+import pickle
 import sys
+import threading
+import time
 import unittest
-from io import StringIO
+from io import BytesIO, StringIO
 from datetime import datetime, timezone
 from logging import ERROR
+from tempfile import TemporaryDirectory
 
 try:
     from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -19,6 +27,7 @@ try:
 except (ImportError, ModuleNotFoundError):
     HASCRYPTO = False
 
+from pyspartn.compressed_wrapper import CompressedWrapper
 from pyspartn.exceptions import (
     SPARTNMessageError,
     SPARTNParseError,
@@ -27,9 +36,28 @@ from pyspartn.exceptions import (
     SPARTNStreamError,
     SPARTNDecryptionError,
 )
+from pyspartn.spartnarchive import SPARTNArchiveReader
+from pyspartn.spartnasyncreader import AsyncSPARTNReader
+from pyspartn.spartnheader import SPARTNHeader
+from pyspartn.spartnmerger import SPARTNMerger
+from pyspartn.spartnparser import SPARTNParser
+from pyspartn.rxmpmp_wrapper import RXMPMPWrapper
 from pyspartn.spartnreader import SPARTNReader, SPARTNMessage
-from pyspartn.spartnhelpers import date2timetag
-from pyspartn.spartntypes_core import ERRRAISE, ERRIGNORE, ERRLOG, TIMEBASE
+from pyspartn.spartnhelpers import (
+    crc_poly,
+    date2timetag,
+    timetag2utc,
+    ubx_checksum,
+)
+from pyspartn.spartntypes_core import (
+    ERRRAISE,
+    ERRIGNORE,
+    ERRLOG,
+    TIMEBASE,
+    VALCRC,
+    VALMSGID,
+    VALNONE,
+)
 
 SPARTN_KEY = "930d847b779b126863c8b3b2766ae7cc"
 SPARTN_BASEDATE = datetime(2024, 4, 18, 20, 48, 29, 977255, tzinfo=timezone.utc)
@@ -38,6 +66,15 @@ SPARTN_BASEDATE_INT = date2timetag(SPARTN_BASEDATE)
 DIRNAME = os.path.dirname(__file__)
 
 
+def ubx(msgid: bytes, payload: bytes) -> bytes:
+    """
+    Build UBX message from message class and id and payload.
+    """
+
+    msg = msgid + len(payload).to_bytes(2, "little") + payload
+    return b"\xb5\x62" + msg + ubx_checksum(msg)
+
+
 class StreamTest(unittest.TestCase):
     def setUp(self):
         self.maxDiff = None
@@ -168,6 +205,919 @@ class StreamTest(unittest.TestCase):
         output = self.restoreio()
         self.assertEqual(output, EXPECTED_OUTPUT)
 
+    def testchunksize(self):  # test buffered framing matches unbuffered framing
+        for logfile, count in (("spartn_badpreamble.log", 12), ("spartnMIXED.log", 422)):
+            results = []
+            for chunksize in (0, 7, 262144):
+                with open(os.path.join(DIRNAME, logfile), "rb") as stream:
+                    spr = SPARTNReader(
+                        stream, quitonerror=ERRIGNORE, chunksize=chunksize
+                    )
+                    results.append([raw for raw, _ in spr])
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(results[0], results[2])
+            self.assertEqual(len(results[0]), count)
+
+    def testtruncated(self):  # test stream terminating part way through frame
+        for trunc, err in (
+            (2, "3 bytes requested, 1 bytes returned"),
+            (6, "4 bytes requested, 2 bytes returned"),
+            (20, "37 bytes requested, 10 bytes returned"),
+            (48, "3 bytes requested, 1 bytes returned"),
+        ):
+            stream = BytesIO(self.spartntransport[:trunc])
+            spr = SPARTNReader(stream, quitonerror=ERRRAISE)
+            with self.assertRaisesRegex(SPARTNStreamError, err):
+                spr.read()
+        for trunc in (1, 4, 8, 10, 47):  # truncated on field boundary
+            stream = BytesIO(self.spartntransport[:trunc])
+            spr = SPARTNReader(stream, quitonerror=ERRRAISE)
+            self.assertEqual(spr.read(), (None, None))
+
+    def testheader(self):  # test SPARTNHeader and SPARTNMessage from header
+        EXPECTED_RESULT = "<SPARTNHeader(SPARTN-1X-OCB-GPS, msgType=0, nData=37, eaf=1, crcType=2, frameCrc=2, msgSubtype=0, timeTagtype=0, gnssTimeTag=3970, solutionId=5, solutionProcId=11, encryptionId=1, encryptionSeq=9, authInd=1, embAuthLen=0, crc=7627181, paystart=10, length=50, crcvalid=False)>"
+        hdr = SPARTNHeader(self.spartntransport)
+        self.assertEqual(str(hdr), EXPECTED_RESULT)
+        msg1 = SPARTNMessage(transport=self.spartntransport, header=hdr)
+        msg2 = SPARTNMessage(transport=self.spartntransport)
+        self.assertEqual(str(msg1), str(msg2))
+        self.assertEqual(msg1.payload, msg2.payload)
+        hdr = SPARTNHeader(self.spartnbadcrc)
+        with self.assertRaisesRegex(SPARTNMessageError, "Invalid CRC 7627169"):
+            SPARTNMessage(transport=self.spartnbadcrc, header=hdr)
+        hdr = SPARTNHeader(self.spartnbadcrc, crcvalid=True)  # trusted
+        msg = SPARTNMessage(transport=self.spartnbadcrc, header=hdr)
+        self.assertEqual(msg.crc, 7627169)
+        with self.assertRaisesRegex(SPARTNMessageError, "Transport length 7 too short"):
+            SPARTNHeader(self.spartntransport[0:7])
+        with self.assertRaisesRegex(
+            SPARTNMessageError, "Transport length 40 less than frame length 50"
+        ):
+            SPARTNHeader(self.spartntransport[0:40])
+
+    def testheaderembauth(self):  # test header with embedded authentication data
+        transport = (
+            b"s\x00\x12\xe2\x00|\x10[\x12\x50"
+            + bytes(37)
+            + bytes(range(1, 13))
+            + b"\x00\x00\x00"
+        )
+        hdr = SPARTNHeader(transport)
+        self.assertEqual(hdr.authInd, 2)
+        self.assertEqual(hdr.embAuthLen, 0)
+        self.assertEqual(hdr.embAuth, 0x0102030405060708)
+        self.assertEqual(hdr.length, 58)
+        self.assertEqual(hdr.crc, 0x090A0B)
+        msg = SPARTNMessage(transport=transport[0:58], header=hdr, validate=0)
+        self.assertEqual(msg.embAuth, hdr.embAuth)
+
+    def testframecrc(self):  # test false preamble rejected on frameCrc
+        badframecrc = b"s\x00\x12\xe3" + self.spartntransport[4:]
+        spr = SPARTNReader(BytesIO(badframecrc), quitonerror=ERRRAISE)
+        with self.assertRaisesRegex(SPARTNParseError, "Invalid frameCrc 3"):
+            spr.read()
+        self.assertEqual(spr._pos, 1)  # search resumes after preamble
+        # valid frame following false preamble is found
+        spr = SPARTNReader(BytesIO(b"s\x00\x12\xe3" + self.spartntransport))
+        raw, _ = spr.read()
+        self.assertEqual(raw, self.spartntransport)
+
+    def testvalmsgid(self):  # test false preamble rejected on message identity
+        badmsgid = b"s\x20" + self.spartntransport[2:]  # msgType 16
+        for validate, err in (
+            (VALCRC, "Invalid frameCrc 2"),
+            (VALMSGID, "Unknown message type 16 subtype 0"),
+        ):
+            spr = SPARTNReader(BytesIO(badmsgid), quitonerror=ERRRAISE, validate=validate)
+            with self.assertRaisesRegex(SPARTNParseError, err):
+                spr.read()
+        spr = SPARTNReader(
+            BytesIO(badmsgid + self.spartntransport), validate=VALCRC | VALMSGID
+        )
+        raw, _ = spr.read()
+        self.assertEqual(raw, self.spartntransport)
+
+    def testresync(self):  # test exception-free resync with counters
+        events = []
+        errors = []
+        badcrc = self.spartntransport[:-1] + b"\x00"
+        data = (
+            b"junk" + self.spartntransport + badcrc + self.spartntransport + b"s\x20"
+        )
+        spr = SPARTNReader(
+            BytesIO(data),
+            quitonerror=ERRRAISE,
+            resync=True,
+            errorhandler=errors.append,
+            statshandler=events.append,
+        )
+        frames = [raw for raw, _ in spr]
+        self.assertEqual(frames, [self.spartntransport] * 2)
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            spr.stats,
+            {
+                "frames": 2,
+                "discarded": 56,
+                "resyncs": 3,
+                "headerfailures": 0,
+                "crcfailures": 1,
+                "recovered": 0,
+                "demuxed": 0,
+            },
+        )
+        self.assertEqual([e["discarded"] for e in events], [4, 54, 56])
+        # same counters when each discarded byte is reported as an error
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append)
+        frames = [raw for raw, _ in spr]
+        self.assertEqual(len(errors), 6)
+        self.assertEqual(spr.stats["discarded"], 56)
+        self.assertEqual(spr.stats["resyncs"], 3)
+
+    def testrescan(self):  # test frame recovered from within rejected frame
+        # truncated frame whose nData spans the start of the next genuine frame
+        data = self.spartntransport[:20] + self.spartntransport * 2
+        for resync in (False, True):
+            errors = []
+            spr = SPARTNReader(
+                BytesIO(data), resync=resync, errorhandler=errors.append
+            )
+            frames = [raw for raw, _ in spr]
+            self.assertEqual(frames, [self.spartntransport] * 2)
+            self.assertEqual(len(errors), 0 if resync else 1)
+            self.assertEqual(spr.stats["discarded"], 20)
+            self.assertEqual(spr.stats["crcfailures"], 1)
+            self.assertEqual(spr.stats["recovered"], 1)
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRRAISE)
+        with self.assertRaisesRegex(SPARTNParseError, "Invalid CRC"):
+            spr.read()
+        self.assertEqual(spr.read()[0], self.spartntransport)
+
+    def testiterparallel(self):  # test parallel decode matches sequential decode
+        if not HASCRYPTO:
+            return
+
+        def run(parallel: bool, **kwargs) -> tuple:
+            errors = []
+            with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+                spr = SPARTNReader(
+                    BytesIO(b"junk" + stream.read()),
+                    decode=True,
+                    key="660b74bd4551a48e97b44f61f6545c54",
+                    basedate=TIMEBASE,
+                    errorhandler=errors.append,
+                    **kwargs,
+                )
+                msgs = spr.iter_parallel(2, 25) if parallel else spr
+                res = [(raw, str(parsed)) for raw, parsed in msgs]
+            return res, [str(err) for err in errors], spr.timetags, spr.stats
+
+        expected = run(False)
+        self.assertEqual(len(expected[0]), 418)
+        self.assertEqual(len(expected[1]), 8)
+        self.assertEqual(run(True), expected)
+        spr = SPARTNReader(BytesIO(self.spartnbadcrc), quitonerror=ERRRAISE)
+        with self.assertRaisesRegex(SPARTNParseError, "Invalid CRC 7627169"):
+            list(spr.iter_parallel(1))
+
+    def testasyncreader(self):  # test asyncio reader matches SPARTNReader
+        with open(os.path.join(self.dirname, "spartn_badcrc.log"), "rb") as stream:
+            data = b"junk" + stream.read() + self.spartntransport[:20]
+        errors = []
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append)
+        expected = [(raw, str(parsed)) for raw, parsed in spr]
+        expected_errors = [str(err) for err in errors]
+
+        async def run(chunksize: int) -> list:
+            stream = asyncio.StreamReader()
+            for i in range(0, len(data), 100):  # deliver data in small pieces
+                stream.feed_data(data[i : i + 100])
+            stream.feed_eof()
+            spr = AsyncSPARTNReader(
+                stream, errorhandler=errors.append, chunksize=chunksize
+            )
+            return [(raw, str(parsed)) async for raw, parsed in spr]
+
+        for chunksize in (7, 65536):
+            errors = []
+            self.assertEqual(asyncio.run(run(chunksize)), expected)
+            self.assertEqual([str(err) for err in errors], expected_errors)
+        self.assertEqual(len(expected_errors), 6)
+        with self.assertRaisesRegex(TypeError, "Use 'async for'"):
+            next(AsyncSPARTNReader(None))
+        with self.assertRaisesRegex(TypeError, "Use 'async for'"):
+            AsyncSPARTNReader(None).iter_threaded()
+        with self.assertRaisesRegex(TypeError, "Use 'async for'"):
+            AsyncSPARTNReader(None).iter_parallel()
+        with self.assertRaisesRegex(ParameterError, "Invalid chunksize 0"):
+            AsyncSPARTNReader(None, chunksize=0)
+
+    def testreadmany(self):  # test batched reads match single reads
+        with open(os.path.join(self.dirname, "spartn_badcrc.log"), "rb") as stream:
+            data = b"junk" + stream.read() + self.spartntransport[:20]
+        errors = []
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append)
+        expected = [(raw, str(parsed)) for raw, parsed in spr]
+        expected_errors = [str(err) for err in errors]
+        errors = []
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append)
+        batches = list(spr.iter_batches(10))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 10, 4])
+        self.assertEqual(
+            [(raw, str(parsed)) for batch in batches for raw, parsed in batch], expected
+        )
+        self.assertEqual([str(err) for err in errors], expected_errors)
+        self.assertEqual(spr.read_many(10), [])
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRRAISE)
+        with self.assertRaisesRegex(SPARTNParseError, "Unknown protocol"):
+            spr.read_many(10)
+        # partial batch returned before error is raised
+        data2 = b"".join(raw for raw, _ in expected[:3]) + b"junk" + data
+        spr = SPARTNReader(BytesIO(data2), quitonerror=ERRRAISE)
+        self.assertEqual(
+            [(raw, str(parsed)) for raw, parsed in spr.read_many(10)], expected[:3]
+        )
+        with self.assertRaisesRegex(SPARTNParseError, "Unknown protocol b'j'"):
+            spr.read_many(10)
+        spr = SPARTNReader(BytesIO(data2), quitonerror=ERRRAISE)
+        batches = spr.iter_batches(10)
+        self.assertEqual(len(next(batches)), 3)
+        with self.assertRaisesRegex(SPARTNParseError, "Unknown protocol b'j'"):
+            next(batches)
+        spr = SPARTNReader(BytesIO(data), include=["SPARTN-1X-GAD"], filterraw=True)
+        self.assertEqual(
+            [parsed is None for _, parsed in spr.read_many(34)],
+            [not msg.startswith("<SPARTN(SPARTN-1X-GAD,") for _, msg in expected],
+        )
+
+        async def run(size: int) -> list:
+            stream = asyncio.StreamReader()
+            for i in range(0, len(data), 100):  # deliver data in small pieces
+                stream.feed_data(data[i : i + 100])
+            stream.feed_eof()
+            spr = AsyncSPARTNReader(stream, errorhandler=errors.append, chunksize=7)
+            return [
+                (raw, str(parsed))
+                async for batch in spr.iter_batches(size)
+                for raw, parsed in batch
+            ]
+
+        for size in (1, 10, 100):
+            errors = []
+            self.assertEqual(asyncio.run(run(size)), expected)
+            self.assertEqual([str(err) for err in errors], expected_errors)
+
+        async def runraise() -> list:
+            stream = asyncio.StreamReader()
+            stream.feed_data(data2)
+            stream.feed_eof()
+            spr = AsyncSPARTNReader(stream, quitonerror=ERRRAISE)
+            batches = []
+            try:
+                async for batch in spr.iter_batches(10):
+                    batches.append(batch)
+            except SPARTNParseError as err:
+                batches.append(err)
+            return batches
+
+        batches = asyncio.run(runraise())
+        self.assertEqual(len(batches[0]), 3)
+        self.assertEqual(str(batches[1]), "Unknown protocol b'j'")
+        with self.assertRaisesRegex(TypeError, "Use feed()"):
+            SPARTNParser().read_many(10)
+
+    def testiterthreaded(self):  # test threaded I/O matches sequential reads
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = b"junk" + stream.read() + self.spartntransport[:20]
+        kwargs = {}
+        if HASCRYPTO:
+            kwargs = {
+                "decode": True,
+                "key": "660b74bd4551a48e97b44f61f6545c54",
+                "basedate": TIMEBASE,
+            }
+        errors = []
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append, **kwargs)
+        expected = [(raw, str(parsed)) for raw, parsed in spr]
+        expected_errors = [str(err) for err in errors]
+        errors = []
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append, **kwargs)
+        actual = [(raw, str(parsed)) for raw, parsed in spr.iter_threaded(16)]
+        self.assertEqual(actual, expected)
+        self.assertEqual([str(err) for err in errors], expected_errors)
+        self.assertLessEqual(spr.queuestats["highwater"], 16)
+        self.assertEqual(spr.queuestats["dropped"], 0)
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRRAISE)
+        with self.assertRaisesRegex(SPARTNParseError, "Unknown protocol"):
+            list(spr.iter_threaded())
+        # slow consumer with drop-oldest policy
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRIGNORE)
+        received = 0
+        for _ in spr.iter_threaded(2, dropoldest=True):
+            if not received:
+                while spr.queuestats["dropped"] < 10:
+                    time.sleep(0.01)
+            received += 1
+        self.assertEqual(
+            received + spr.queuestats["dropped"],
+            len(list(SPARTNReader(BytesIO(data), quitonerror=ERRIGNORE))),
+        )
+        self.assertEqual(spr.queuestats["highwater"], 2)
+        # queued errors are never dropped
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append)
+        frames = [raw for raw, _ in spr]
+        data2 = b"".join(frames[:20]) + b"junk" + b"".join(frames[20:])
+        errors = []
+        spr = SPARTNReader(BytesIO(data2), errorhandler=errors.append)
+        received = 0
+        for _ in spr.iter_threaded(2, dropoldest=True):
+            if not received:
+                while spr.queuestats["dropped"] < 10:
+                    time.sleep(0.01)
+            received += 1
+        self.assertEqual(received + spr.queuestats["dropped"], len(frames))
+        self.assertEqual(
+            [str(err) for err in errors],
+            [f"Unknown protocol {bytes([c])}" for c in b"junk"],
+        )
+
+        class BadStream(BytesIO):
+            def read1(self, size=-1):
+                raise OSError("stream failed")
+
+        spr = SPARTNReader(BadStream(data))
+        with self.assertRaisesRegex(OSError, "stream failed"):
+            list(spr.iter_threaded())
+        threads = threading.active_count()
+        spr = SPARTNReader(
+            BytesIO(data * 10), include=["SPARTN-1X-GAD"], filterraw=True
+        )
+        gen = spr.iter_threaded(4)
+        for i, (_, parsed) in enumerate(gen):
+            if i == 50:
+                break
+        self.assertEqual(parsed, None)
+        gen.close()
+        self.assertEqual(threading.active_count(), threads)  # I/O thread joined
+        pos = spr._pos
+        self.assertEqual(spr.read()[0], bytes(spr._buffer[pos : spr._pos]))
+        # I/O thread blocked in stream read
+        release = threading.Event()
+
+        class SlowStream(BytesIO):
+            def read1(self, size=-1):
+                if self.tell():
+                    release.wait()
+                return super().read1(size)
+
+        gen = SPARTNReader(SlowStream(self.spartntransport * 2)).iter_threaded(
+            jointimeout=0.05
+        )
+        self.assertEqual(next(gen)[0], self.spartntransport)
+        with self.assertRaisesRegex(RuntimeError, "I/O thread still reading"):
+            gen.close()
+        release.set()
+
+    def testcompressed(self):  # test compressed archive input
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = stream.read()
+        expected = [(raw, str(parsed)) for raw, parsed in SPARTNReader(BytesIO(data))]
+        with TemporaryDirectory() as tmpdir:
+            for codec, compress in (
+                ("gzip", gzip.compress),
+                ("bz2", bz2.compress),
+                ("lzma", lzma.compress),
+                (None, bytes),
+            ):
+                fname = os.path.join(tmpdir, f"spartn.{codec}")
+                with open(fname, "wb") as outfile:  # multi-member file
+                    outfile.write(compress(data[:5000]) + compress(data[5000:]))
+                for blocksize in (100, 1048576):
+                    with CompressedWrapper(fname, blocksize) as stream:
+                        self.assertEqual(stream.codec, codec)
+                        actual = [
+                            (raw, str(parsed)) for raw, parsed in SPARTNReader(stream)
+                        ]
+                        self.assertEqual(actual, expected)
+                with open(fname, "rb") as stream:  # codec detected by SPARTNReader
+                    actual = [
+                        (raw, str(parsed)) for raw, parsed in SPARTNReader(stream)
+                    ]
+                    self.assertEqual(actual, expected)
+            with open(os.path.join(tmpdir, "spartn.gzip"), "rb") as infile:
+                truncated = infile.read()[:-100]
+            # memory-mapped archive cannot be compressed
+            with self.assertRaisesRegex(ParameterError, "gzip compressed file"):
+                SPARTNArchiveReader(os.path.join(tmpdir, "spartn.gzip"))
+        # live (non-seekable) streams are not peeked or decompressed
+        rfd, wfd = os.pipe()
+        with open(rfd, "rb") as stream:
+            spr = SPARTNReader(stream)  # no data yet, so must not block
+            self.assertIs(spr._stream, stream)
+            os.write(wfd, data[:4000])  # within pipe buffer
+            os.close(wfd)
+            self.assertEqual(
+                [raw for raw, _ in spr],
+                [raw for raw, _ in SPARTNReader(BytesIO(data[:4000]))],
+            )
+        stream = CompressedWrapper(BytesIO(gzip.compress(data)), 1000)
+        self.assertEqual(stream.read(3000), data[:3000])
+        self.assertEqual(stream.read(len(data)), data[3000:])
+        self.assertEqual(stream.read(10), b"")
+        stream = CompressedWrapper(BytesIO(truncated))
+        self.assertLess(len(stream.read(len(data))), len(data))
+        self.assertEqual(stream.read1(10), b"")
+
+    def testdemux(self):  # test mixed UBX/RTCM3/NMEA/SPARTN stream
+        spartn = self.spartntransport
+
+        def rtcm(payload: bytes) -> bytes:
+            msg = b"\xd3" + len(payload).to_bytes(2, "big") + payload
+            return msg + crc_poly(msg, 24, 0x864CFB).to_bytes(3, "big")
+
+        def nmea(body: bytes, chk: int = 0) -> bytes:
+            for b in body:
+                chk ^= b
+            return b"$" + body + f"*{chk:02X}\r\n".encode()
+
+        nmeamsg = nmea(b"GNGGA,123519,4807.038,N,01131.000,E")
+        ubxmsg = ubx(b"\x02\x32", spartn)  # contains SPARTN preamble
+        rtcmmsg = rtcm(b"\x3e\xd0" + spartn)
+        badnmea = nmea(b"GNGLL,4916.45,N,12311.12,W", 1)
+        data = nmeamsg + ubxmsg + spartn + rtcmmsg + b"$xx" + spartn + badnmea
+        # without demux, SPARTN preambles within UBX and RTCM3 frames false-trigger
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRIGNORE)
+        self.assertEqual(len(list(spr)), 4)
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRIGNORE, demux=True)
+        self.assertEqual([raw for raw, _ in spr], [spartn] * 2)
+        self.assertEqual(spr.stats["demuxed"], 3)
+        self.assertEqual(spr.stats["discarded"], 3 + len(badnmea))
+        expected = [nmeamsg, ubxmsg, spartn, rtcmmsg, spartn]
+        spr = SPARTNReader(
+            BytesIO(data), quitonerror=ERRIGNORE, demux=True, passthrough=True
+        )
+        actual = spr.read_many(10)
+        self.assertEqual([raw for raw, _ in actual], expected)
+        self.assertEqual(
+            [parsed is None for _, parsed in actual], [True, True, False, True, False]
+        )
+        spr = SPARTNReader(
+            BytesIO(data), quitonerror=ERRIGNORE, demux=True, passthrough=True
+        )
+        self.assertEqual([raw for raw, _ in spr.iter_threaded()], expected)
+        spp = SPARTNParser(quitonerror=ERRIGNORE, demux=True, passthrough=True)
+        actual = []
+        for i in range(len(data)):  # incomplete frames
+            actual += spp.feed(data[i : i + 1])
+        self.assertEqual([raw for raw, _ in actual], expected)
+        # frames truncated at end of stream are discarded
+        data = spartn + ubx(b"\x02\x32", b"\x00" * 20)[:-1]
+        spr = SPARTNReader(BytesIO(data), quitonerror=ERRIGNORE, demux=True)
+        self.assertEqual([raw for raw, _ in spr], [spartn])
+        self.assertEqual(spr.stats["discarded"], 27)
+
+    def testrxmpmp(self):  # test SPARTN extraction from UBX RXM-PMP messages
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = stream.read()
+        expected = [(raw, str(parsed)) for raw, parsed in SPARTNReader(BytesIO(data))]
+
+        def pmp(userdata: bytes, version: int) -> bytes:
+            if version:
+                hdr = bytes((version, 0)) + len(userdata).to_bytes(2, "little")
+                return ubx(b"\x02\x72", hdr + b"\x00" * 20 + userdata)
+            return ubx(b"\x02\x72", b"\x00" * 20 + userdata + b"\x00" * 4)
+
+        ubxdata = b"junk\xb5"
+        for i, pos in enumerate(range(0, len(data), 504)):
+            userdata = data[pos : pos + 504]
+            ubxdata += pmp(userdata, 1 if i % 2 or len(userdata) < 504 else 0)
+            ubxdata += ubx(b"\x01\x07", b"\x73" * 92)  # NAV-PVT
+        ubxdata += b"$GNGLL,4916.45,N,12311.12,W*00\r\n"
+        ubxdata += pmp(b"s" * 100, 2)  # unknown version
+        for blocksize in (50, 65536):
+            stream = RXMPMPWrapper(BytesIO(ubxdata), blocksize)
+            actual = [(raw, str(parsed)) for raw, parsed in SPARTNReader(stream)]
+            self.assertEqual(actual, expected)
+            self.assertEqual(stream.pmpcount, (len(data) + 503) // 504)
+        stream = RXMPMPWrapper(BytesIO(ubxdata))
+        self.assertEqual(stream.read(len(data) + 100), data)
+        self.assertEqual(stream.read1(10), b"")
+        # invalid checksum
+        baddata = bytearray(pmp(data[:504], 0) + pmp(data[504:1008], 1))
+        baddata[100] ^= 0xFF
+        stream = RXMPMPWrapper(BytesIO(baddata))
+        self.assertEqual(stream.read(1008), data[504:1008])
+        stream = RXMPMPWrapper(BytesIO(baddata), validate=VALNONE)
+        self.assertEqual(len(stream.read(1008)), 1008)
+
+        class SerialStream:  # no read1(), read() waits for requested bytes
+            def __init__(self, data):
+                self.data = data
+                self.pos = self.requested = 0
+
+            def read(self, size):
+                self.requested = max(self.requested, self.pos + size)
+                data = self.data[self.pos : self.pos + size]
+                self.pos += len(data)
+                return data
+
+        stream = RXMPMPWrapper(SerialStream(ubxdata))
+        actual = [(raw, str(parsed)) for raw, parsed in SPARTNReader(stream)]
+        self.assertEqual(actual, expected)
+        # reads go no further than the end of each UBX message
+        serial = SerialStream(b"\xb5junk" + pmp(data[:504], 0))
+        stream = RXMPMPWrapper(serial)
+        self.assertEqual(stream.read(504), data[:504])
+        self.assertEqual(serial.requested, len(serial.data))
+
+    def testmerger(self):  # test merge and deduplication of redundant sources
+        with open(
+            os.path.join(self.dirname, "spartn_rollover_32and16_20240428235040.log"),
+            "rb",
+        ) as stream:
+            data = stream.read()
+        frames = [raw for raw, _ in SPARTNReader(BytesIO(data))]
+        merger = SPARTNMerger(
+            {
+                "mqtt": SPARTNReader(BytesIO(data)),
+                "lband": SPARTNReader(BytesIO(data[: len(data) // 2])),
+            },
+            reorder=8,
+        )
+        merged = list(merger)
+        self.assertEqual(sorted(raw for _, raw, _ in merged), sorted(frames))
+        self.assertEqual(merger.unique, 99)
+        stats = merger.stats
+        self.assertEqual(stats["mqtt"]["received"], 99)
+        self.assertEqual(stats["mqtt"]["coverage"], 1.0)
+        self.assertLess(stats["lband"]["coverage"], 1.0)
+        self.assertEqual(
+            stats["mqtt"]["first"] + stats["lband"]["first"], merger.unique
+        )
+        # first arrival wins within window
+        merger = SPARTNMerger(window=1.0)
+        self.assertEqual(merger.stats, {})
+        self.assertEqual(
+            merger.push("a", frames[0], None, 0.0), [("a", frames[0], None)]
+        )
+        self.assertEqual(merger.push("b", frames[0], None, 0.5), [])
+        self.assertEqual(
+            merger.push("b", frames[1], None, 0.5), [("b", frames[1], None)]
+        )
+        self.assertEqual(merger.push("a", frames[1], None, 0.75), [])
+        self.assertEqual(merger.push("b", frames[0], None, 1.0), [])
+        self.assertEqual(
+            merger.push("b", frames[0], None, 1.6), [("b", frames[0], None)]
+        )
+        nmea = b"$GNGLL,4916.45,N,12311.12,W*00\r\n"
+        self.assertEqual(merger.push("a", nmea, None, 2.0), [("a", nmea, None)])
+        self.assertEqual(
+            merger.stats,
+            {
+                "a": {
+                    "received": 3,
+                    "first": 1,
+                    "duplicates": 1,
+                    "coverage": 2 / 3,
+                    "latency": 0.25,
+                    "maxlatency": 0.25,
+                },
+                "b": {
+                    "received": 4,
+                    "first": 2,
+                    "duplicates": 2,
+                    "coverage": 1.0,
+                    "latency": 1.5 / 2,
+                    "maxlatency": 1.0,
+                },
+            },
+        )
+        # duplicates by header fields
+        hdr = bytearray(frames[0])
+        hdr[-1] ^= 0xFF  # different CRC
+        merger = SPARTNMerger()
+        self.assertEqual(len(merger.push("a", frames[0], None)), 1)
+        self.assertEqual(len(merger.push("b", bytes(hdr), None)), 1)
+        merger = SPARTNMerger(byheader=True)
+        self.assertEqual(len(merger.push("a", frames[0], None)), 1)
+        self.assertEqual(merger.push("b", bytes(hdr), None), [])
+        self.assertEqual(merger.stats["a"]["latency"], 0.0)
+        # unencrypted messages in the same epoch are distinguished by header
+        with open(
+            os.path.join(self.dirname, "spartnntrip_20240430192807.log"), "rb"
+        ) as stream:
+            plain = [raw for raw, _ in SPARTNReader(stream)]
+        self.assertEqual(len(plain), 10)
+        self.assertFalse(any(SPARTNHeader(raw).eaf for raw in plain))
+        merger = SPARTNMerger(byheader=True)
+        merged = merger.merge(
+            [("a", raw, None) for raw in plain] + [("b", raw, None) for raw in plain]
+        )
+        self.assertEqual([raw for _, raw, _ in merged], plain)
+        self.assertEqual(merger.stats["b"]["duplicates"], 10)
+        # reorder buffer returns messages in UTC timetag order
+        tagged = []
+        for raw in frames:
+            hdr = SPARTNHeader(raw)
+            if hdr.timeTagtype:
+                tagged.append(
+                    (timetag2utc(hdr.gnssTimeTag, hdr.msgType, hdr.msgSubtype), raw)
+                )
+        tagged.reverse()
+        expected = [raw for _, raw in sorted(tagged, key=lambda x: x[0])]
+        merger = SPARTNMerger(reorder=len(tagged), basedate=TIMEBASE)
+        merged = merger.merge(("a", raw, None) for _, raw in tagged)
+        self.assertEqual([raw for _, raw, _ in merged], expected)
+        merger = SPARTNMerger(reorder=4, basedate=452044770)
+        merged = [raw for _, raw, _ in merger.merge(("a", raw, None) for raw in frames)]
+        self.assertEqual(sorted(merged), sorted(frames))
+        self.assertEqual(merged[:3], frames[:3])
+        # reader errors are re-raised
+
+        def badreader():
+            yield (frames[0], None)
+            raise ValueError("bad reader")
+
+        with self.assertRaisesRegex(ValueError, "bad reader"):
+            list(SPARTNMerger({"a": badreader()}))
+
+    def testfilter(self):  # test framing-level message identity filter
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = stream.read()
+        sprall = SPARTNReader(BytesIO(data))
+        allmsgs = list(sprall)
+        idents = [parsed.identity for _, parsed in allmsgs]
+        wanted = ("SPARTN-1X-OCB-GPS", "SPARTN-1X-GAD")
+        spr = SPARTNReader(BytesIO(data), include=wanted)
+        actual = [(raw, str(parsed)) for raw, parsed in spr]
+        expected = [
+            (raw, str(parsed)) for raw, parsed in allmsgs if parsed.identity in wanted
+        ]
+        self.assertEqual(actual, expected)
+        # skipped frames still update the decryption timetags
+        self.assertEqual(spr.timetags, sprall.timetags)
+        spr = SPARTNReader(BytesIO(data), exclude=["SPARTN-1X-OCB-GPS", (2, 0)])
+        self.assertEqual(
+            [parsed.identity for _, parsed in spr],
+            [ident for ident in idents if ident not in wanted],
+        )
+        spr = SPARTNReader(BytesIO(data), include=[(0, 0)], filterraw=True)
+        actual = list(spr)
+        self.assertEqual([raw for raw, _ in actual], [raw for raw, _ in allmsgs])
+        self.assertEqual(
+            [parsed is None for _, parsed in actual],
+            [ident != "SPARTN-1X-OCB-GPS" for ident in idents],
+        )
+        spr = SPARTNReader(BytesIO(data), include=[(0, 0)], filterraw=True)
+        self.assertEqual(
+            [(raw, str(parsed)) for raw, parsed in spr.iter_parallel(workers=1)],
+            [(raw, str(parsed)) for raw, parsed in actual],
+        )
+        with self.assertRaisesRegex(ParameterError, "Unknown message identity XXX"):
+            SPARTNReader(BytesIO(data), include=["XXX"])
+
+    def testparser(self):  # test push parser matches SPARTNReader
+        if not HASCRYPTO:
+            return
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = b"junk" + stream.read()
+        kwargs = {
+            "decode": True,
+            "key": "660b74bd4551a48e97b44f61f6545c54",
+            "basedate": TIMEBASE,
+        }
+        errors = []
+        spr = SPARTNReader(BytesIO(data), errorhandler=errors.append, **kwargs)
+        expected = [(raw, str(parsed)) for raw, parsed in spr]
+        expected_errors = [str(err) for err in errors]
+        for size in (1, 333):
+            errors = []
+            spp = SPARTNParser(errorhandler=errors.append, **kwargs)
+            actual = []
+            for i in range(0, len(data), size):
+                actual += [
+                    (raw, str(parsed)) for raw, parsed in spp.feed(data[i : i + size])
+                ]
+            self.assertEqual(actual, expected)
+            self.assertEqual([str(err) for err in errors], expected_errors)
+            self.assertEqual(spp.timetags, spr.timetags)
+        spp = SPARTNParser()
+        self.assertEqual(spp.feed(self.spartntransport[:20]), [])
+        self.assertEqual(spp.buffered, 20)
+        raw, parsed = spp.feed(self.spartntransport[20:] + self.spartntransport[:1])[0]
+        self.assertEqual(raw, self.spartntransport)
+        self.assertEqual(parsed.identity, "SPARTN-1X-OCB-GPS")
+        self.assertEqual(spp.buffered, 1)
+        with self.assertRaisesRegex(TypeError, "Use feed()"):
+            next(spp)
+        # inherited pull-style reads are not supported
+        for read in (
+            spp.read,
+            lambda: spp.read_many(10),
+            spp.iter_batches,
+            spp.iter_threaded,
+            spp.iter_parallel,
+        ):
+            with self.assertRaisesRegex(TypeError, "Use feed()"):
+                read()
+        self.assertEqual(spp.buffered, 1)
+        # messages completed before an error are returned before it is raised
+        spp = SPARTNParser(quitonerror=ERRRAISE)
+        transport = self.spartntransport
+        self.assertEqual(len(spp.feed(transport * 2 + b"j" + transport)), 2)
+        with self.assertRaisesRegex(SPARTNParseError, "Unknown protocol b'j'"):
+            spp.feed(transport[:10])
+        self.assertEqual(spp.buffered, len(transport) + 10)
+        self.assertEqual([raw for raw, _ in spp.feed(transport[10:])], [transport] * 2)
+
+    def testheaderonly(self):  # test raw passthrough with lightweight headers
+        fields = (
+            "msgType",
+            "msgSubtype",
+            "nData",
+            "eaf",
+            "crcType",
+            "timeTagtype",
+            "gnssTimeTag",
+            "solutionId",
+            "solutionProcId",
+            "identity",
+        )
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = stream.read()
+        expected = [
+            (raw, tuple(getattr(parsed, att) for att in fields))
+            for raw, parsed in SPARTNReader(BytesIO(data))
+        ]
+
+        def check(messages):
+            actual = []
+            for raw, hdr in messages:
+                self.assertIsInstance(hdr, SPARTNHeader)
+                self.assertTrue(hdr.crcvalid)
+                actual.append((bytes(raw), tuple(getattr(hdr, att) for att in fields)))
+            self.assertEqual(actual, expected)
+
+        check(SPARTNReader(BytesIO(data), headeronly=True))
+        spr = SPARTNReader(BytesIO(data), headeronly=True)
+        check([msg for batch in spr.iter_batches(100) for msg in batch])
+        check(SPARTNReader(BytesIO(data), headeronly=True).iter_threaded())
+        check(SPARTNReader(BytesIO(data), headeronly=True).iter_parallel())
+        check(SPARTNParser(headeronly=True).feed(data))
+        with TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "spartnMIXED.log")
+            with open(fname, "wb") as outfile:
+                outfile.write(data)
+            with SPARTNArchiveReader(fname, headeronly=True, indexfile=True) as spr:
+                check(spr)
+                self.assertIsInstance(spr[5][1], SPARTNHeader)
+                self.assertEqual(bytes(spr[5][0]), expected[5][0])
+
+    def testparsemany(self):  # test batch parse of pre-framed messages
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            frames = [raw for raw, _ in SPARTNReader(stream)]
+        parsed = SPARTNReader.parse_many(frames)
+        self.assertEqual(
+            [str(msg) for msg in parsed],
+            [str(SPARTNReader.parse(raw)) for raw in frames],
+        )
+        # errors are returned in order
+        badcrc = bytearray(frames[1])
+        badcrc[-1] ^= 0xFF
+        unknown = bytearray(frames[2])
+        unknown[1] = 0x60 | (unknown[1] & 0x01)  # msgType 48
+        unknown[-3:] = crc_poly(bytes(unknown[1:-3]), 24, 0x864CFB).to_bytes(3, "big")
+        batch = [frames[0], bytes(badcrc), bytes(unknown), frames[3][:6], frames[3]]
+        parsed = SPARTNReader.parse_many(batch, validate=VALCRC | VALMSGID)
+        self.assertEqual(parsed[0].identity, "SPARTN-1X-OCB-GPS")
+        self.assertIsInstance(parsed[1], SPARTNMessageError)
+        self.assertIsInstance(parsed[2], SPARTNParseError)
+        self.assertIsInstance(parsed[3], SPARTNMessageError)
+        self.assertEqual(str(parsed[4]), str(SPARTNReader.parse(frames[3])))
+        parsed = SPARTNReader.parse_many(
+            [bytes(badcrc)], validate=VALNONE, basedate=469573995
+        )
+        self.assertEqual(parsed[0].identity, "SPARTN-1X-OCB-GLO")
+        # key and basedate are converted once for the whole batch
+        parsed = SPARTNReader.parse_many(
+            frames[:20], key="660b74bd4551a48e97b44f61f6545c54", basedate=469573995
+        )
+        self.assertEqual(
+            parsed[0]._key, bytes.fromhex("660b74bd4551a48e97b44f61f6545c54")
+        )
+        for msg in parsed:
+            self.assertIs(msg._key, parsed[0]._key)
+            self.assertIs(msg._basedate, parsed[0]._basedate)
+        if not HASCRYPTO:
+            return
+        # timetags accumulated across batches
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            spr = SPARTNReader(
+                stream,
+                quitonerror=ERRIGNORE,
+                decode=True,
+                key="660b74bd4551a48e97b44f61f6545c54",
+                basedate=TIMEBASE,
+            )
+            expected = [str(msg) for _, msg in spr]
+            timetags = spr.timetags
+        tags = {}
+        parsed = []
+        for i in range(0, len(frames), 100):
+            parsed += SPARTNReader.parse_many(
+                frames[i : i + 100],
+                decode=True,
+                key="660b74bd4551a48e97b44f61f6545c54",
+                basedate=TIMEBASE,
+                timetags=tags,
+            )
+        self.assertEqual(
+            [str(msg) for msg in parsed if isinstance(msg, SPARTNMessage)], expected
+        )
+        self.assertEqual(
+            len([err for err in parsed if isinstance(err, SPARTNDecryptionError)]), 4
+        )
+        self.assertEqual(tags, timetags)
+        parsed = SPARTNReader.parse_many(
+            frames[8:9],  # 16-bit timetag
+            decode=True,
+            key="660b74bd4551a48e97b44f61f6545c54",
+            basedate=datetime(2024, 11, 17, 21, 0),
+        )
+        self.assertEqual(str(parsed[0]), expected[4])
+
+    def testzerocopy(self):  # test raw data and payloads as memoryview slices
+        with open(os.path.join(self.dirname, "spartnMIXED.log"), "rb") as stream:
+            data = stream.read()
+        expected = [
+            (raw, parsed.payload, str(parsed))
+            for raw, parsed in SPARTNReader(BytesIO(data))
+        ]
+        self.assertIsInstance(expected[0][1], bytes)
+
+        def check(messages):
+            actual = []
+            for raw, parsed in messages:  # views retained until all read
+                self.assertIsInstance(raw, memoryview)
+                self.assertIsInstance(parsed.payload, memoryview)
+                actual.append((raw, parsed))
+            self.assertEqual(
+                [
+                    (bytes(raw), bytes(parsed.payload), str(parsed))
+                    for raw, parsed in actual
+                ],
+                expected,
+            )
+            self.assertEqual(actual[0][1].serialize(), expected[0][0])
+
+        check(SPARTNReader(BytesIO(data), chunksize=100, zerocopy=True))
+        spr = SPARTNReader(BytesIO(data), chunksize=100, zerocopy=True)
+        check([msg for batch in spr.iter_batches(50) for msg in batch])
+        spp = SPARTNParser(zerocopy=True)
+        check(
+            [msg for i in range(0, len(data), 99) for msg in spp.feed(data[i : i + 99])]
+        )
+        frames = [raw for raw, _, _ in expected]
+        check(
+            zip(
+                [memoryview(raw) for raw in frames],
+                SPARTNReader.parse_many(frames, zerocopy=True),
+            )
+        )
+        with TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "spartnMIXED.log")
+            with open(fname, "wb") as outfile:
+                outfile.write(data)
+            with SPARTNArchiveReader(fname) as spr:
+                self.assertIsInstance(next(spr)[1].payload, bytes)
+            with SPARTNArchiveReader(fname, zerocopy=True, indexfile=True) as spr:
+                check(spr)
+                self.assertIsInstance(spr[5][1].payload, memoryview)
+        # views are converted to bytes when pickled
+        msg = SPARTNMessage(transport=expected[3][0], zerocopy=True)
+        msg2 = pickle.loads(pickle.dumps(msg))
+        self.assertIsInstance(msg2.payload, bytes)
+        self.assertEqual(msg2.payload, expected[3][1])
+        self.assertEqual(str(msg2), expected[3][2])
+        if not HASCRYPTO:
+            return
+        kwargs = {
+            "decode": True,
+            "key": "660b74bd4551a48e97b44f61f6545c54",
+            "basedate": TIMEBASE,
+            "quitonerror": ERRIGNORE,
+        }
+        self.assertEqual(
+            [
+                (bytes(raw), parsed.payload, str(parsed))
+                for raw, parsed in SPARTNReader(BytesIO(data), zerocopy=True, **kwargs)
+            ],
+            [
+                (raw, parsed.payload, str(parsed))
+                for raw, parsed in SPARTNReader(BytesIO(data), **kwargs)
+            ],
+        )
+
     def testHPACLOGnodecode(
         self,
     ):  # test SPARTN HPAC message no decode